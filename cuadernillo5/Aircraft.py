@@ -9,6 +9,8 @@ Módulo que define la clase base Aircraft y sus subclases Airbus y Boeing,
 utilizadas para representar diferentes tipos de aviones.
 """
 
+from SeatLayout import SeatLayout
+
 class Aircraft:
     """
     Representa una aeronave genérica con un número de registro, modelo,
@@ -19,6 +21,11 @@ class Aircraft:
         __model (str): Modelo de la aeronave (ej. 'Airbus A319').
         __num_rows (int): Número de filas que contiene la aeronave.
         __num_seats_per_row (int): Número de asientos en cada fila.
+        __layout (SeatLayout): Distribución inmutable de asientos: la plantilla
+                               registrada del modelo (ver SeatLayout.register_template)
+                               o, si no la hay, la compartida por dimensiones.
+        __overbooking_ratio (float): Fracción de reservas que se admiten por
+                                     encima de la capacidad (0.05 = 5% más).
     """
 
     def __init__(self, registration, model, num_rows, num_seats_per_row):
@@ -53,6 +60,32 @@ class Aircraft:
         self.__model = model
         self.__num_rows = num_rows
         self.__num_seats_per_row = num_seats_per_row
+        # Si el modelo tiene plantilla con estas dimensiones se comparte esa
+        layout = SeatLayout.template(model)
+        if layout is None or (layout.get_num_rows(), layout.width()) != (num_rows, num_seats_per_row):
+            layout = SeatLayout.for_dimensions(num_rows, num_seats_per_row)
+        self.__layout = layout
+        self.__overbooking_ratio = 0.0
+
+    @classmethod
+    def from_template(cls, registration, model):
+        """
+        Crea una aeronave con la plantilla de asientos registrada de su modelo.
+
+        Args:
+            registration (str): Número de registro de la aeronave.
+            model (str): Modelo con plantilla registrada (ej. 'Boeing 777').
+
+        Returns:
+            Aircraft: La aeronave.
+
+        Raises:
+            ValueError: Si el modelo no tiene plantilla o registration está vacío.
+        """
+        layout = SeatLayout.template(model)
+        if layout is None:
+            raise ValueError(f"El modelo '{model}' no tiene plantilla de asientos registrada.")
+        return cls(registration, model, layout.get_num_rows(), layout.width())
 
     def get_registration(self):
         """
@@ -90,6 +123,48 @@ class Aircraft:
         """
         return self.__num_seats_per_row
 
+    def get_overbooking_ratio(self):
+        """
+        Devuelve la fracción de sobreventa de la aeronave.
+
+        Returns:
+            float: Fracción de reservas admitidas por encima de la capacidad.
+        """
+        return self.__overbooking_ratio
+
+    def set_overbooking_ratio(self, ratio):
+        """
+        Configura la sobreventa: cuántas reservas de más (en fracción de la
+        capacidad) pueden quedar en lista de espera (ver Flight.book).
+
+        Args:
+            ratio (float): Fracción de sobreventa (0 para no sobrevender).
+
+        Raises:
+            ValueError: Si ratio es negativo.
+        """
+        if ratio < 0:
+            raise ValueError(f"La sobreventa (ratio={ratio}) no puede ser negativa.")
+        self.__overbooking_ratio = ratio
+
+    def overbooking_limit(self):
+        """
+        Calcula cuántas reservas se admiten por encima de la capacidad.
+
+        Returns:
+            int: Plazas de sobreventa (redondeando hacia abajo).
+        """
+        return int(self.num_seats() * self.__overbooking_ratio)
+
+    def get_layout(self):
+        """
+        Devuelve la distribución de asientos de la aeronave.
+
+        Returns:
+            SeatLayout: Distribución inmutable (letras, columnas y fila máxima).
+        """
+        return self.__layout
+
     def seating_plan(self):
         """
         Genera el plan de asientos para la aeronave.
@@ -101,19 +176,52 @@ class Aircraft:
                 - seats (str): Cadena con las letras de asiento 
                   (ej. 'ABCDEF' para 6 asientos por fila).
         """
-        import string
         rows = [None] * (self.__num_rows + 1)
-        seats = string.ascii_uppercase[: self.__num_seats_per_row]
+        seats = self.__layout.get_letters()
         return rows, seats
 
+    def seat_blocks(self):
+        """
+        Divide las letras de asiento de una fila en bloques separados por pasillos.
+
+        Returns:
+            tuple: Cadenas con las letras de cada bloque (ej. ('ABC', 'DEF')).
+        """
+        return self.__layout.get_blocks()
+
+    def window_seats(self):
+        """
+        Devuelve las letras de los asientos de ventanilla (primera y última).
+
+        Returns:
+            str: Letras de ventanilla (ej. 'AF').
+        """
+        seats = self.__layout.get_letters()
+        return seats[0] + seats[-1] if len(seats) > 1 else seats
+
+    def aisle_seats(self):
+        """
+        Devuelve las letras de los asientos de pasillo (los extremos de cada
+        bloque que dan a un pasillo).
+
+        Returns:
+            str: Letras de pasillo (ej. 'CD' para 6 asientos por fila).
+        """
+        blocks = self.seat_blocks()
+        letters = ""
+        for left, right in zip(blocks, blocks[1:]):
+            letters += left[-1] + right[0]
+        return letters
+
     def num_seats(self):
         """
-        Calcula el número total de asientos de la aeronave.
+        Calcula el número total de asientos reservables de la aeronave.
 
         Returns:
-            int: El número total de asientos (num_rows * num_seats_per_row).
+            int: El número total de asientos (num_rows * num_seats_per_row,
+                 menos los bloqueados o inexistentes de la plantilla).
         """
-        return self.__num_rows * self.__num_seats_per_row
+        return self.__layout.num_seats()
 
 
 class Airbus(Aircraft):
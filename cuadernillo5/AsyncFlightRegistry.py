@@ -0,0 +1,179 @@
+# ============================================================================
+# Fichero: AsyncFlightRegistry.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Servicio de reservas asíncrono (asyncio) sobre varios vuelos
+# ============================================================================
+
+"""
+Módulo que define AsyncFlightRegistry, una fachada asyncio sobre varios
+objetos Flight.
+
+Todas las operaciones se ejecutan en el bucle de eventos que las recibe: cada
+petición se encola en su vuelo y, en la siguiente vuelta del bucle, se procesan
+de golpe todas las peticiones pendientes de ese vuelo. Como todo ocurre en un
+único hilo no hace falta ningún cerrojo.
+
+Clases:
+    AsyncFlightRegistry
+"""
+
+import asyncio
+
+
+class AsyncFlightRegistry:
+    """
+    Registro asíncrono de vuelos con peticiones agrupadas por vuelo.
+
+    Atributos:
+        __flights (dict): Vuelos registrados {número de vuelo: Flight}.
+        __pending (dict): Peticiones pendientes por vuelo
+                          {número de vuelo: [(operación, future), ...]}.
+    """
+
+    def __init__(self, flights=()):
+        """
+        Inicializa el registro con una colección opcional de vuelos.
+
+        Args:
+            flights (iterable): Objetos Flight que se registran de inicio.
+
+        Raises:
+            ValueError: Si hay dos vuelos con el mismo número.
+        """
+        self.__flights = {}
+        self.__pending = {}
+        for flight in flights:
+            self.add_flight(flight)
+
+    def add_flight(self, flight):
+        """
+        Registra un vuelo.
+
+        Args:
+            flight (Flight): Vuelo a registrar.
+
+        Raises:
+            ValueError: Si ya hay un vuelo registrado con ese número.
+        """
+        number = flight.get_number()
+        if number in self.__flights:
+            raise ValueError(f"El vuelo {number} ya está registrado.")
+        self.__flights[number] = flight
+
+    def get_flight(self, number):
+        """
+        Devuelve un vuelo registrado.
+
+        Args:
+            number (str): Número del vuelo.
+
+        Returns:
+            Flight: El vuelo.
+
+        Raises:
+            ValueError: Si el vuelo no está registrado.
+        """
+        if number not in self.__flights:
+            raise ValueError(f"El vuelo {number} no está registrado.")
+        return self.__flights[number]
+
+    def flight_numbers(self):
+        """
+        Devuelve los números de los vuelos registrados.
+
+        Returns:
+            list: Números de vuelo.
+        """
+        return list(self.__flights)
+
+    async def allocate(self, number, seat, passenger):
+        """
+        Asigna un pasajero a un asiento de un vuelo.
+
+        Args:
+            number (str): Número del vuelo.
+            seat (str): Identificador del asiento (p.e. '12C').
+            passenger (tuple): Datos del pasajero.
+
+        Raises:
+            ValueError: Si el vuelo no existe o la asignación no es válida
+                        (ver Flight.allocate_passenger).
+        """
+        return await self.__submit(number, lambda flight: flight.allocate_passenger(seat, passenger))
+
+    async def reallocate(self, number, from_seat, to_seat):
+        """
+        Reasigna un pasajero de un asiento a otro en un vuelo.
+
+        Args:
+            number (str): Número del vuelo.
+            from_seat (str): Asiento de origen.
+            to_seat (str): Asiento de destino.
+
+        Raises:
+            ValueError: Si el vuelo no existe o la reasignación no es válida
+                        (ver Flight.reallocate_passenger).
+        """
+        return await self.__submit(number, lambda flight: flight.reallocate_passenger(from_seat, to_seat))
+
+    async def availability(self, number):
+        """
+        Obtiene los asientos libres de un vuelo. Se atiende en orden con el
+        resto de peticiones del vuelo, así que refleja las reservas previas.
+
+        Args:
+            number (str): Número del vuelo.
+
+        Returns:
+            int: Número de asientos libres.
+
+        Raises:
+            ValueError: Si el vuelo no existe.
+        """
+        return await self.__submit(number, lambda flight: flight.num_available_seats())
+
+    def __submit(self, number, operation):
+        """
+        Encola una operación sobre un vuelo y programa su procesado.
+
+        Args:
+            number (str): Número del vuelo.
+            operation (callable): Función que recibe el Flight y hace la operación.
+
+        Returns:
+            asyncio.Future: Se completa con el resultado de la operación.
+
+        Raises:
+            ValueError: Si el vuelo no está registrado.
+        """
+        self.get_flight(number)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self.__pending.get(number)
+        if pending is None:
+            # Primera petición del lote: el vuelo se procesa en la próxima vuelta del bucle
+            pending = self.__pending[number] = []
+            loop.call_soon(self.__drain, number)
+        pending.append((operation, future))
+        return future
+
+    def __drain(self, number):
+        """
+        Procesa de una vez todas las peticiones pendientes de un vuelo. El
+        error de una petición (cualquier excepción, no solo ValueError) se
+        entrega a su future y el resto del lote se sigue procesando.
+
+        Args:
+            number (str): Número del vuelo.
+        """
+        flight = self.__flights[number]
+        for operation, future in self.__pending.pop(number):
+            if future.cancelled():
+                continue
+            try:
+                result = operation(flight)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,175 @@
+# ============================================================================
+# Fichero: BoardingCards.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Generación y escritura por lotes de tarjetas de embarque
+# ============================================================================
+
+"""
+Módulo para generar tarjetas de embarque en varios formatos y escribirlas en
+cualquier destino (fichero de texto o binario, sys.stdout, io.StringIO...)
+haciendo una sola escritura por lote de tarjetas.
+
+Formatos:
+    'box'   -> el recuadro clásico de print_boarding_cards().
+    'csv'   -> una línea CSV por tarjeta (con cabecera al escribir).
+    'jsonl' -> un objeto JSON por línea.
+
+Funciones:
+    format_boarding_cards
+    write_boarding_cards
+    write_fleet_boarding_cards
+    write_lines
+    is_binary
+"""
+
+import csv
+import io
+import json
+from itertools import chain
+
+FORMATS = ("box", "csv", "jsonl")
+
+CSV_HEADER = ("name", "surname", "id_card", "seat", "flight", "model")
+
+_BOX_RULE = "----------------------------------------------------------\n"
+
+# Número de tarjetas que se acumulan antes de cada escritura en el destino
+DEFAULT_BATCH_SIZE = 1000
+
+
+def format_boarding_cards(passenger_seats, flight_number, aircraft_model, fmt="box"):
+    """
+    Generador que da formato a las tarjetas de embarque de un vuelo.
+
+    Args:
+        passenger_seats (iterable): Pares (passenger_data, seat) de los asientos ocupados.
+        flight_number (str): Número del vuelo.
+        aircraft_model (str): Modelo de la aeronave.
+        fmt (str): Formato de salida ('box', 'csv' o 'jsonl').
+
+    Yields:
+        str: El texto de cada tarjeta, terminado en salto de línea.
+
+    Raises:
+        ValueError: Si el formato no es válido.
+    """
+    if fmt == "box":
+        for (name, surname, id_card), seat in passenger_seats:
+            yield (f"{_BOX_RULE}"
+                   f"|  {name} {surname} {id_card} {seat} {flight_number} {aircraft_model}  |\n"
+                   f"{_BOX_RULE}")
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for (name, surname, id_card), seat in passenger_seats:
+            writer.writerow((name, surname, id_card, seat, flight_number, aircraft_model))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    elif fmt == "jsonl":
+        for (name, surname, id_card), seat in passenger_seats:
+            yield json.dumps({"name": name, "surname": surname, "id_card": id_card, "seat": seat,
+                              "flight": flight_number, "model": aircraft_model},
+                             ensure_ascii=False) + "\n"
+    else:
+        raise ValueError(f"Formato de tarjeta '{fmt}' no válido (opciones: {', '.join(FORMATS)}).")
+
+
+def write_boarding_cards(cards, sink, fmt="box", batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Escribe tarjetas ya formateadas en un destino, una escritura por lote.
+
+    Args:
+        cards (iterable): Textos de las tarjetas (ver format_boarding_cards).
+        sink: Destino con método write(); si es binario se codifica en UTF-8.
+        fmt (str): Formato de las tarjetas; en 'csv' se escribe la cabecera.
+        batch_size (int): Número de tarjetas por escritura.
+
+    Returns:
+        int: Número de tarjetas escritas.
+
+    Raises:
+        ValueError: Si el formato no es válido o batch_size < 1.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de tarjeta '{fmt}' no válido (opciones: {', '.join(FORMATS)}).")
+    if batch_size < 1:
+        raise ValueError(f"El tamaño de lote (batch_size={batch_size}) debe ser al menos 1.")
+
+    header = [",".join(CSV_HEADER) + "\n"] if fmt == "csv" else []
+    return write_lines(chain(header, cards), sink, batch_size) - len(header)
+
+
+def write_fleet_boarding_cards(flights, sink, fmt="box", batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Escribe las tarjetas de embarque de varios vuelos en un único flujo.
+
+    Args:
+        flights (iterable): Vuelos (Flight) cuyas tarjetas se escriben.
+        sink: Destino con método write() (texto o binario).
+        fmt (str): Formato de salida ('box', 'csv' o 'jsonl').
+        batch_size (int): Número de tarjetas por escritura.
+
+    Returns:
+        int: Número de tarjetas escritas.
+    """
+    cards = chain.from_iterable(flight.iter_boarding_cards(fmt) for flight in flights)
+    return write_boarding_cards(cards, sink, fmt, batch_size)
+
+
+def write_lines(lines, sink, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Escribe líneas de texto en un destino, una sola llamada a write() por
+    lote. Es la escritura común de las tarjetas y de los manifiestos
+    (ver Manifest.py).
+
+    Args:
+        lines (iterable): Textos a escribir, cada uno con su salto de línea.
+        sink: Destino con método write(); si es binario se codifica en UTF-8.
+        batch_size (int): Número de líneas por escritura.
+
+    Returns:
+        int: Número de líneas escritas.
+    """
+    binary = is_binary(sink)
+    batch = []
+    count = 0
+    for line in lines:
+        batch.append(line)
+        count += 1
+        if len(batch) >= batch_size:
+            _flush(sink, batch, binary)
+            batch = []
+    if batch:
+        _flush(sink, batch, binary)
+    return count
+
+
+def is_binary(stream):
+    """
+    Indica si un flujo (destino o fuente) trabaja con bytes en lugar de texto.
+
+    Args:
+        stream: Flujo con métodos write() o read().
+
+    Returns:
+        bool: True si el flujo es binario.
+    """
+    if isinstance(stream, io.TextIOBase):
+        return False
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return "b" in getattr(stream, "mode", "")
+
+
+def _flush(sink, batch, binary):
+    """
+    Escribe un lote de líneas con una sola llamada a write().
+
+    Args:
+        sink: Destino con método write().
+        batch (list): Textos del lote.
+        binary (bool): Si hay que codificar el texto en UTF-8.
+    """
+    text = "".join(batch)
+    sink.write(text.encode("utf-8") if binary else text)
@@ -0,0 +1,227 @@
+# ============================================================================
+# Fichero: BookingJournal.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Diario de reservas (write-ahead journal) con escritura agrupada
+# ============================================================================
+
+"""
+Módulo que define BookingJournal, un diario de solo añadir donde un Flight
+registra cada cambio de ocupación. Tras una caída, el vuelo se reconstruye
+cargando su última instantánea (Snapshot.py) y reaplicando el diario.
+
+Cada registro va precedido de su longitud (u32) y contiene, en little-endian:
+
+    versión (u64)   número de cambio del vuelo (ver Flight.get_version)
+    operación (u8)  OCCUPY, RELEASE o MOVE
+    datos           OCCUPY:  índice (u32), nombre, apellido, id_card
+                    RELEASE: índice (u32)
+                    MOVE:    índice origen (u32), índice destino (u32)
+
+Las cadenas van en UTF-8 precedidas de su longitud (u16). Los registros se
+acumulan en memoria y se escriben con un único write + fsync por grupo
+(group commit); sync() fuerza la escritura del grupo pendiente.
+
+Clases:
+    BookingJournal
+
+Funciones:
+    read_journal
+"""
+
+import os
+import struct
+
+OCCUPY = 1
+RELEASE = 2
+MOVE = 3
+
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<QB")
+_INDEX = struct.Struct("<I")
+_MOVE = struct.Struct("<II")
+_STR_LEN = struct.Struct("<H")
+
+# Registros que se acumulan antes de cada escritura + fsync
+DEFAULT_GROUP_SIZE = 256
+
+
+class BookingJournal:
+    """
+    Diario de reservas de un vuelo con escritura agrupada.
+
+    Atributos:
+        __path (str): Ruta del fichero del diario.
+        __file (file): Fichero abierto en modo binario de añadir.
+        __group_size (int): Registros por grupo de escritura.
+        __fsync (bool): Si cada grupo se fuerza a disco con os.fsync.
+        __pending (list): Registros codificados pendientes de escribir.
+    """
+
+    def __init__(self, path, group_size=DEFAULT_GROUP_SIZE, fsync=True):
+        """
+        Abre (o crea) un diario para añadir registros.
+
+        Args:
+            path (str): Ruta del fichero del diario.
+            group_size (int): Registros que se acumulan antes de escribir.
+            fsync (bool): Si cada grupo se fuerza a disco.
+
+        Raises:
+            ValueError: Si group_size < 1.
+        """
+        if group_size < 1:
+            raise ValueError(f"El tamaño de grupo (group_size={group_size}) debe ser al menos 1.")
+        self.__path = path
+        self.__file = open(path, "ab")
+        self.__group_size = group_size
+        self.__fsync = fsync
+        self.__pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_path(self):
+        """
+        Devuelve la ruta del diario.
+
+        Returns:
+            str: Ruta del fichero.
+        """
+        return self.__path
+
+    def append(self, version, operation, args):
+        """
+        Añade un registro al grupo pendiente y escribe el grupo si está lleno.
+
+        Args:
+            version (int): Número de cambio del vuelo.
+            operation (int): OCCUPY, RELEASE o MOVE.
+            args (tuple): (index, passenger), (index,) o (from_index, to_index).
+
+        Raises:
+            ValueError: Si la operación no es válida.
+        """
+        payload = _HEADER.pack(version, operation) + _encode(operation, args)
+        self.__pending.append(_LENGTH.pack(len(payload)) + payload)
+        if len(self.__pending) >= self.__group_size:
+            self.sync()
+
+    def sync(self):
+        """
+        Escribe el grupo pendiente con una sola llamada y lo fuerza a disco.
+        """
+        if not self.__pending:
+            return
+        self.__file.write(b"".join(self.__pending))
+        self.__pending = []
+        self.__file.flush()
+        if self.__fsync:
+            os.fsync(self.__file.fileno())
+
+    def truncate(self):
+        """
+        Vacía el diario (tras compactarlo en una instantánea).
+        """
+        self.__pending = []
+        self.__file.truncate(0)
+        self.__file.flush()
+        if self.__fsync:
+            os.fsync(self.__file.fileno())
+
+    def close(self):
+        """
+        Escribe el grupo pendiente y cierra el fichero.
+        """
+        if not self.__file.closed:
+            self.sync()
+            self.__file.close()
+
+
+def read_journal(path):
+    """
+    Generador que recorre los registros de un diario. Un registro final
+    incompleto (caída a mitad de escritura) se ignora.
+
+    Args:
+        path (str): Ruta del fichero del diario.
+
+    Yields:
+        tuple: (version, operation, args) con los mismos args que append().
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    offset = 0
+    end = len(data)
+    while offset + _LENGTH.size <= end:
+        (length,) = _LENGTH.unpack_from(data, offset)
+        start = offset + _LENGTH.size
+        if start + length > end:
+            break  # registro truncado por una caída
+        version, operation = _HEADER.unpack_from(data, start)
+        yield version, operation, _decode(operation, data, start + _HEADER.size)
+        offset = start + length
+
+
+def _encode(operation, args):
+    """
+    Codifica los datos de un registro.
+
+    Args:
+        operation (int): OCCUPY, RELEASE o MOVE.
+        args (tuple): Datos de la operación.
+
+    Returns:
+        bytes: Datos codificados.
+
+    Raises:
+        ValueError: Si la operación no es válida.
+    """
+    if operation == OCCUPY:
+        index, passenger = args
+        parts = [_INDEX.pack(index)]
+        for field in passenger:
+            raw = field.encode("utf-8")
+            parts.append(_STR_LEN.pack(len(raw)))
+            parts.append(raw)
+        return b"".join(parts)
+    if operation == RELEASE:
+        return _INDEX.pack(args[0])
+    if operation == MOVE:
+        return _MOVE.pack(*args)
+    raise ValueError(f"Operación de diario {operation} no válida.")
+
+
+def _decode(operation, data, offset):
+    """
+    Decodifica los datos de un registro.
+
+    Args:
+        operation (int): OCCUPY, RELEASE o MOVE.
+        data (bytes): Contenido del diario.
+        offset (int): Posición de los datos del registro.
+
+    Returns:
+        tuple: Los args con los que se llamó a append().
+
+    Raises:
+        ValueError: Si la operación no es válida.
+    """
+    if operation == OCCUPY:
+        (index,) = _INDEX.unpack_from(data, offset)
+        offset += _INDEX.size
+        fields = []
+        for _ in range(3):
+            (length,) = _STR_LEN.unpack_from(data, offset)
+            offset += _STR_LEN.size
+            fields.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        return index, tuple(fields)
+    if operation == RELEASE:
+        return _INDEX.unpack_from(data, offset)
+    if operation == MOVE:
+        return _MOVE.unpack_from(data, offset)
+    raise ValueError(f"Operación de diario {operation} no válida.")
@@ -0,0 +1,228 @@
+# ============================================================================
+# Fichero: FleetAnalytics.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Estadísticas de ocupación de una flota de vuelos con NumPy
+# ============================================================================
+
+"""
+Módulo de analítica de ocupación para miles de vuelos. La ocupación de cada
+vuelo se exporta con Flight.occupied_indices() (un array de índices, sin
+recorrer asientos en Python) y se vuelca en un array booleano de NumPy
+(vuelos x filas x asientos) por cada distribución de asientos. Todas las
+estadísticas son reducciones vectorizadas sobre esos arrays.
+
+Los asientos bloqueados o que no existen en su fila (ver SeatLayout) no
+cuentan en la capacidad.
+
+Requiere numpy.
+
+Clases:
+    FleetOccupancy
+
+Funciones:
+    occupancy_array
+"""
+
+from array import array
+
+import numpy as np
+
+
+def occupancy_array(flights):
+    """
+    Exporta la ocupación de varios vuelos con la misma distribución.
+
+    Args:
+        flights (list): Vuelos (Flight) cuyas aeronaves comparten SeatLayout.
+
+    Returns:
+        ndarray: Array booleano (vuelos, filas, asientos por fila); True si
+                 el asiento está ocupado.
+
+    Raises:
+        ValueError: Si la lista está vacía o las distribuciones no coinciden.
+    """
+    if not flights:
+        raise ValueError("Hace falta al menos un vuelo para exportar la ocupación.")
+    layout = flights[0].get_aircraft().get_layout()
+    indices = array("I")
+    counts = []
+    for flight in flights:
+        if flight.get_aircraft().get_layout() is not layout:
+            raise ValueError(f"El vuelo {flight.get_number()} no tiene la misma distribución de asientos.")
+        occupied = flight.occupied_indices()
+        indices.extend(occupied)
+        counts.append(len(occupied))
+
+    num_rows, width = layout.get_num_rows(), layout.width()
+    flat = np.zeros(len(flights) * num_rows * width, dtype=bool)
+    if indices:
+        # Cada índice se desplaza al bloque de su vuelo y se marca de una vez
+        offsets = np.repeat(np.arange(len(flights), dtype=np.intp) * (num_rows * width), counts)
+        flat[offsets + np.frombuffer(indices, dtype=np.uintc)] = True
+    return flat.reshape(len(flights), num_rows, width)
+
+
+class FleetOccupancy:
+    """
+    Foto de la ocupación de una flota, agrupada por distribución de asientos.
+
+    Atributos:
+        __numbers (list): Número de cada vuelo, en el orden recibido.
+        __models (list): Modelos distintos, en orden de aparición.
+        __model_codes (ndarray): Posición en __models del modelo de cada vuelo.
+        __occupied (ndarray): Asientos ocupados de cada vuelo.
+        __capacity (ndarray): Asientos reservables de cada vuelo.
+        __groups (dict): {SeatLayout: (posiciones de sus vuelos, array de ocupación)}.
+    """
+
+    def __init__(self, flights):
+        """
+        Exporta la ocupación de todos los vuelos.
+
+        Args:
+            flights (iterable): Vuelos (Flight) de cualquier modelo.
+        """
+        flights = list(flights)
+        self.__numbers = [flight.get_number() for flight in flights]
+
+        models = {}
+        by_layout = {}
+        codes = []
+        for position, flight in enumerate(flights):
+            aircraft = flight.get_aircraft()
+            codes.append(models.setdefault(aircraft.get_model(), len(models)))
+            by_layout.setdefault(aircraft.get_layout(), []).append(position)
+        self.__models = list(models)
+        self.__model_codes = np.array(codes, dtype=np.intp)
+
+        self.__occupied = np.zeros(len(flights), dtype=np.int64)
+        self.__capacity = np.zeros(len(flights), dtype=np.int64)
+        self.__groups = {}
+        for layout, positions in by_layout.items():
+            occupancy = occupancy_array([flights[position] for position in positions])
+            positions = np.array(positions, dtype=np.intp)
+            self.__groups[layout] = (positions, occupancy)
+            self.__occupied[positions] = occupancy.sum(axis=(1, 2))
+            self.__capacity[positions] = layout.num_seats()
+
+    def get_numbers(self):
+        """
+        Devuelve el número de cada vuelo, en el orden de load_factor_by_flight().
+
+        Returns:
+            list: Números de vuelo.
+        """
+        return self.__numbers
+
+    def load_factor(self):
+        """
+        Calcula el factor de ocupación de toda la flota.
+
+        Returns:
+            float: Asientos ocupados / asientos reservables (0.0 sin vuelos).
+        """
+        capacity = self.__capacity.sum()
+        return float(self.__occupied.sum() / capacity) if capacity else 0.0
+
+    def load_factor_by_flight(self):
+        """
+        Calcula el factor de ocupación de cada vuelo.
+
+        Returns:
+            ndarray: Un valor entre 0 y 1 por vuelo, en el orden recibido.
+        """
+        return self.__occupied / self.__capacity
+
+    def load_factor_by_model(self):
+        """
+        Calcula el factor de ocupación de cada modelo de aeronave.
+
+        Returns:
+            dict: {modelo: factor de ocupación}.
+        """
+        size = len(self.__models)
+        occupied = np.bincount(self.__model_codes, weights=self.__occupied, minlength=size)
+        capacity = np.bincount(self.__model_codes, weights=self.__capacity, minlength=size)
+        return dict(zip(self.__models, (occupied / capacity).tolist()))
+
+    def load_factor_by_letter(self):
+        """
+        Calcula el factor de ocupación de cada letra de asiento en toda la flota.
+
+        Returns:
+            dict: {letra: factor de ocupación}, en orden alfabético.
+        """
+        occupied = {}
+        capacity = {}
+        for layout, (positions, occupancy) in self.__groups.items():
+            by_column = occupancy.sum(axis=(0, 1))
+            for col, letter in enumerate(layout.get_letters()):
+                occupied[letter] = occupied.get(letter, 0) + int(by_column[col])
+                capacity[letter] = capacity.get(letter, 0) + len(positions) * layout.letter_capacity(letter)
+        return {letter: occupied[letter] / capacity[letter] if capacity[letter] else 0.0
+                for letter in sorted(occupied)}
+
+    def row_heatmap(self, model):
+        """
+        Calcula el mapa de calor por asiento de un modelo: la fracción de sus
+        vuelos que tiene ocupado cada asiento.
+
+        Args:
+            model (str): Modelo de aeronave.
+
+        Returns:
+            ndarray: Array (filas, asientos por fila) con valores entre 0 y 1;
+                     NaN en los asientos bloqueados o que no existen.
+
+        Raises:
+            ValueError: Si ningún vuelo es de ese modelo.
+        """
+        layout, occupancy = self.__model_occupancy(model)
+        heatmap = occupancy.mean(axis=0)
+        unavailable = np.fromiter(layout.get_unavailable(), dtype=np.intp)
+        heatmap.reshape(-1)[unavailable] = np.nan
+        return heatmap
+
+    def row_load_factor(self, model):
+        """
+        Calcula el factor de ocupación de cada fila de un modelo.
+
+        Args:
+            model (str): Modelo de aeronave.
+
+        Returns:
+            ndarray: Un valor entre 0 y 1 por fila (posición fila - 1).
+
+        Raises:
+            ValueError: Si ningún vuelo es de ese modelo.
+        """
+        layout, occupancy = self.__model_occupancy(model)
+        capacity = np.array([layout.row_capacity(row) for row in range(1, layout.get_num_rows() + 1)])
+        return occupancy.sum(axis=(0, 2)) / (len(occupancy) * capacity)
+
+    def __model_occupancy(self, model):
+        """
+        Selecciona la ocupación de los vuelos de un modelo.
+
+        Args:
+            model (str): Modelo de aeronave.
+
+        Returns:
+            tuple: (SeatLayout, array de ocupación de sus vuelos).
+
+        Raises:
+            ValueError: Si ningún vuelo es de ese modelo.
+        """
+        if model not in self.__models:
+            raise ValueError(f"No hay vuelos del modelo '{model}'.")
+        code = self.__models.index(model)
+        found = []
+        for layout, (positions, occupancy) in self.__groups.items():
+            selected = self.__model_codes[positions] == code
+            if selected.any():
+                found.append((layout, occupancy[selected]))
+        if len(found) > 1:
+            # Mismo modelo con dimensiones distintas: se usa la más frecuente
+            found.sort(key=lambda item: len(item[1]), reverse=True)
+        return found[0]
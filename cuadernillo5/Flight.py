@@ -9,10 +9,75 @@ Módulo Flight para gestionar vuelos y asientos de pasajeros en un avión.
 
 Clases:
     Flight
+
+Funciones:
+    validate_flight_number
 """
 
+import heapq
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from itertools import count
 from pprint import pprint
 
+from BookingJournal import MOVE, OCCUPY, RELEASE, read_journal
+from BoardingCards import DEFAULT_BATCH_SIZE, format_boarding_cards, write_boarding_cards
+from SeatGrid import SeatGrid
+from SeatLayout import SeatError
+from Manifest import ManifestReport, import_manifest, read_manifest, write_manifest
+from Metrics import instrument
+from SeatMap import make_seat_map
+from Snapshot import load_snapshot, open_snapshot, save_snapshot
+
+# Número de cerrojos por filas en el modo concurrente: la fila n usa el
+# cerrojo n % _LOCK_STRIPES, así que hilos en filas distintas no se bloquean.
+_LOCK_STRIPES = 16
+
+# Prioridad de cada clase de tarifa en la lista de espera (menor = antes)
+FARE_CLASSES = {"F": 0, "J": 1, "W": 2, "Y": 3}
+
+# Métodos que se instrumentan al conectar un sink de métricas (ver Metrics.py)
+# {atributo: nombre de la métrica}
+_INSTRUMENTED = {
+    "allocate_passenger": "flight.allocate_passenger",
+    "reallocate_passenger": "flight.reallocate_passenger",
+    "num_available_seats": "flight.num_available_seats",
+    "_Flight__parse_seat": "flight.parse_seat",
+}
+
+def validate_flight_number(number):
+    """
+    Comprueba que un número de vuelo tiene el formato correcto.
+
+    Args:
+        number (str): Número del vuelo (ej. 'BA117').
+
+    Raises:
+        ValueError: Si el número de vuelo no cumple los requisitos:
+                    - Primeros 2 caracteres letras y en mayúsculas.
+                    - El resto dígitos, formando un número < 9999.
+    """
+    # 1) Verificamos longitud mínima: al menos 3 caracteres (2 letras + dígitos).
+    if len(number) < 3:
+        raise ValueError(f"Número de vuelo '{number}' demasiado corto.")
+    # 2) Los dos primeros caracteres deben ser letras.
+    if not number[:2].isalpha():
+        raise ValueError(f"Número de vuelo '{number}' debe comenzar con 2 letras.")
+    # 3) Las dos letras deben estar en mayúsculas.
+    if not number[:2].isupper():
+        raise ValueError(f"Número de vuelo '{number}' debe tener las 2 letras en mayúscula.")
+    # 4) El resto deben ser dígitos y formar un número < 9999.
+    if not number[2:].isdigit():
+        raise ValueError(f"Número de vuelo '{number}' debe terminar con dígitos.")
+    if int(number[2:]) >= 9999:
+        raise ValueError(f"Número de vuelo '{number}' debe tener un número < 9999 tras las letras.")
+
+
 class Flight:
     """
     Representa un vuelo con un número y una aeronave asociada, además de
@@ -21,51 +86,147 @@ class Flight:
     Atributos:
         __number (str): Número identificativo del vuelo (por ejemplo, 'BA117').
         __aircraft (Aircraft): La aeronave asociada a este vuelo.
-        __seating (list): Estructura de asientos; índice 0 es None, y a partir
-                          del 1, cada posición es un diccionario con claves
-                          (letras de asiento) y valores (None o datos de pasajero).
+        __seating (SeatMap): Motor que guarda la ocupación de los asientos
+                             (ver SeatMap.py). get_seating() ofrece siempre la
+                             vista clásica de lista de diccionarios por fila.
+        __layout (SeatLayout): Distribución de asientos de la aeronave.
+        __occupied (int): Número de asientos ocupados.
+        __occupied_by_row (dict): Asientos ocupados por fila {fila: n}.
+        __occupied_by_letter (dict): Asientos ocupados por letra {letra: n}.
+        __passenger_index (dict): Índice inverso {id_card: índice de asiento}.
+        __indexed (bool): Si el motor lleva su propia cuenta e índice de
+                          pasajeros (ver SeatMap.indexed): los contadores y el índice de
+                         pasajeros no se usan y se consulta al motor.
+        __grid (SeatGrid): Plano de asientos con caché por fila para print_seating().
+        __free_heaps (dict): Montículos de asientos libres por preferencia
+                             ('window', 'aisle', 'any'); se construyen en el
+                             primer auto_allocate().
+        __row_locks (list): Cerrojos por franjas de filas (solo en modo
+                            concurrente): la comprobación y la escritura de
+                            cada asiento en el motor se hacen bajo el de su fila.
+        __state_lock (RLock): Protege los contadores, el índice de pasajeros,
+                              los montículos, el plano, la versión y la lista
+                              de espera; cada cambio lo toma solo para
+                              actualizarlos (nullcontext si no es concurrente).
+        __engine_lock (Lock): Serializa las escrituras en los motores que
+                              comparten estructura entre filas (ver
+                              SeatMap.concurrent_rows); nullcontext en el resto.
+        __observers (list): Funciones a las que se avisa tras cada cambio de ocupación.
+        __version (int): Número de cambios de ocupación aplicados al vuelo.
+        __journal (BookingJournal): Diario opcional donde se registra cada cambio.
+        __feed (deque): Búfer circular con los últimos asientos cambiados
+                        (versión, índice); None si el registro está desactivado.
+        __feed_base (int): Versión a partir de la cual el búfer tiene todos
+                           los cambios; los consumidores anteriores reciben
+                           una foto completa.
+        __metrics (MetricsSink): Destino opcional de métricas de los métodos calientes.
+        __waitlist (list): Montículo de la lista de espera; cada entrada es
+                           [prioridad de tarifa, instante, secuencia, pasajero]
+                           (pasajero None si se retiró de la lista).
+        __waitlisted (dict): Entrada de cada pasajero en espera {id_card: entrada}.
+        __waitlist_seq (count): Desempate de entradas con la misma prioridad e instante.
     """
 
-    def __init__(self, number, aircraft):
+    def __init__(self, number, aircraft, engine="dict", concurrent=False, metrics=None, feed_size=0):
         """
         Inicializa la clase Flight con un número de vuelo y una aeronave.
 
         Args:
             number (str): Número del vuelo (ej. 'BA117').
             aircraft (Aircraft): Objeto que representa la aeronave.
+            engine (str | callable): Motor de asientos: 'dict' (una lista de
+                diccionarios por fila, por defecto), 'sparse' (solo los
+                asientos ocupados; crear el vuelo no cuesta según el tamaño
+                de la aeronave), 'bitmap' (un bit por asiento, pensado para
+                mantener muchos vuelos en memoria),
+                'compact' (bitmap con los pasajeros en una PassengerTable) o
+                una factoría (num_rows, seat_letters) -> SeatMap, como la de
+                SQLiteSeatStore.seat_map() para guardar los asientos en SQLite.
+            concurrent (bool): Si es True, las reservas son seguras entre hilos:
+                la comprobación y ocupación de cada asiento se hace bajo un
+                cerrojo de su franja de filas, y los contadores e índices se
+                actualizan en una sección crítica breve. Con 'dict' y
+                'sparse' las escrituras de filas distintas van en paralelo;
+                con el resto de motores solo se serializa la propia escritura.
+            metrics (MetricsSink): Destino de métricas opcional (ver set_metrics()).
+            feed_size (int): Cambios de asiento que se guardan para
+                changes_since(). Con 0 (por defecto) el registro está
+                desactivado y no ocupa memoria: changes_since() devuelve
+                siempre la foto completa.
 
         Raises:
             ValueError: Si el número de vuelo no cumple los requisitos:
                         - Primeros 2 caracteres letras y en mayúsculas.
                         - El resto dígitos, formando un número < 9999.
+            ValueError: Si feed_size < 0.
         """
-        # === Validaciones para el número de vuelo ===
-        # 1) Verificamos longitud mínima: al menos 3 caracteres (2 letras + dígitos).
-        if len(number) < 3:
-            raise ValueError(f"Número de vuelo '{number}' demasiado corto.")
-        # 2) Los dos primeros caracteres deben ser letras.
-        if not number[:2].isalpha():
-            raise ValueError(f"Número de vuelo '{number}' debe comenzar con 2 letras.")
-        # 3) Las dos letras deben estar en mayúsculas.
-        if not number[:2].isupper():
-            raise ValueError(f"Número de vuelo '{number}' debe tener las 2 letras en mayúscula.")
-        # 4) El resto deben ser dígitos y formar un número < 9999.
-        if not number[2:].isdigit():
-            raise ValueError(f"Número de vuelo '{number}' debe terminar con dígitos.")
-        if int(number[2:]) >= 9999:
-            raise ValueError(f"Número de vuelo '{number}' debe tener un número < 9999 tras las letras.")
+        validate_flight_number(number)
+        if feed_size < 0:
+            raise ValueError(f"El tamaño del registro de cambios (feed_size={feed_size}) no puede ser negativo.")
 
         self.__number = number
         self.__aircraft = aircraft
 
-        # Construimos la estructura seating usando el seating_plan del aircraft
-        rows, seat_letters = self.__aircraft.seating_plan()
-        # La posición 0 será None y no se utiliza; a partir de la 1 en adelante, diccionarios
-        # con clave = letra de asiento y valor = None (sin pasajero).
-        self.__seating = [None]  # índice 0
-        for _ in rows[1:]:  # ignoramos el primer elemento (fila 0)
-            row_dict = {letter: None for letter in seat_letters}
-            self.__seating.append(row_dict)
+        # Construimos el motor de asientos usando la distribución del aircraft
+        self.__layout = self.__aircraft.get_layout()
+        self.__seating = make_seat_map(engine, self.__layout.get_num_rows(),
+                                       self.__layout.get_letters())
+
+        # Contadores de ocupación que mantienen __occupy y __release, para que
+        # las consultas de disponibilidad no recorran nunca el mapa de asientos.
+        # Solo guardan las filas/letras con algún ocupado; el resto está libre.
+        self.__occupied = 0
+        self.__occupied_by_row = {}
+        self.__occupied_by_letter = {}
+
+        # Índice inverso pasajero -> asiento (el id_card es el tercer dato del pasajero)
+        self.__passenger_index = {}
+
+        # Plano de asientos: cada cambio invalida solo la fila afectada
+        self.__grid = SeatGrid(self.__layout)
+
+        # Montículos de asientos libres para auto_allocate (perezosos)
+        self.__free_heaps = None
+
+        # Observadores (p.e. FlightRegistry) que siguen la ocupación del vuelo
+        self.__observers = []
+
+        # Cada cambio de ocupación incrementa la versión y, si hay diario, se registra
+        self.__version = 0
+        self.__journal = None
+
+        # Registro de cambios opcional para los consumidores que sondean el vuelo
+        self.__feed = deque(maxlen=feed_size) if feed_size else None
+        self.__feed_base = 0
+
+        # Modo concurrente opcional: cerrojos por franjas de filas
+        if concurrent:
+            stripes = min(_LOCK_STRIPES, self.__layout.get_num_rows())
+            self.__row_locks = [threading.Lock() for _ in range(stripes)]
+            self.__state_lock = threading.RLock()
+            serial = not self.__seating.concurrent_rows
+            self.__engine_lock = threading.Lock() if serial else nullcontext()
+        else:
+            self.__row_locks = None
+            self.__state_lock = self.__engine_lock = nullcontext()
+
+        # Lista de espera de la sobreventa (ver book())
+        self.__waitlist = []
+        self.__waitlisted = {}
+        self.__waitlist_seq = count()
+
+        self.__metrics = None
+        if metrics is not None:
+            self.set_metrics(metrics)
+
+        # Un motor indexado (SQLite, que otros procesos cambian, o una
+        # instantánea abierta con mmap, que no se decodifica al abrirla) es la
+        # única fuente de verdad: no se llevan contadores propios
+        self.__indexed = self.__seating.indexed
+        if not self.__indexed and self.__seating.has_bookings():
+            occupied = list(self.__seating.items())
+            self.__track_many([index for index, _ in occupied],
+                              [passenger for _, passenger in occupied])
 
     def get_number(self):
         """
@@ -85,14 +246,170 @@ class Flight:
         """
         return self.__aircraft
 
+    def add_observer(self, callback):
+        """
+        Registra una función a la que se llama tras cada cambio de ocupación.
+        Se llama ya fuera de los cerrojos del vuelo, así que en modo
+        concurrente puede ejecutarse desde varios hilos a la vez y los avisos
+        pueden llegar desordenados: el observador debe leer el estado actual
+        del vuelo bajo su propio cerrojo (ver FlightRegistry).
+
+        Args:
+            callback (callable): Recibe el propio vuelo como único argumento.
+        """
+        self.__observers.append(callback)
+
+    def remove_observer(self, callback):
+        """
+        Deja de avisar a una función registrada con add_observer().
+
+        Args:
+            callback (callable): La función registrada.
+
+        Raises:
+            ValueError: Si la función no estaba registrada.
+        """
+        self.__observers.remove(callback)
+
+    def get_version(self):
+        """
+        Devuelve la versión del vuelo: el número de cambios de ocupación
+        (asignaciones, liberaciones y movimientos) aplicados hasta ahora.
+
+        Returns:
+            int: Versión actual del vuelo.
+        """
+        return self.__version
+
+    def changes_since(self, version=None):
+        """
+        Devuelve los cambios de asiento posteriores a una versión, para que
+        los consumidores que sondean el vuelo (pantallas de puerta, quioscos)
+        no tengan que comparar get_seating() entero: el coste es proporcional
+        a los cambios, no a los asientos. El búfer circular solo guarda qué
+        asientos cambiaron; su ocupante se lee del motor al consultar, así que
+        cada asiento aparece una vez con su ocupante actual. Si el consumidor
+        se ha quedado tan atrás que el búfer ya no tiene todos sus cambios, si
+        no indica versión o si el registro está desactivado (feed_size=0),
+        recibe una foto completa de los asientos ocupados.
+
+        Uso típico:
+            version, full, changes = flight.changes_since(None)
+            ...
+            version, full, changes = flight.changes_since(version)
+            if full:
+                vista.clear()
+            for seat, passenger in changes:
+                vista[seat] = passenger   # None: el asiento queda libre
+
+        Args:
+            version (int): Última versión que vio el consumidor (None si es nuevo).
+
+        Returns:
+            tuple: (versión actual, foto completa (bool), lista de pares
+                   (asiento, pasajero o None)). Si es una foto completa, la
+                   lista tiene todos los asientos ocupados en orden.
+
+        Raises:
+            ValueError: Si la versión es negativa o posterior a la actual.
+        """
+        seat_name = self.__layout.seat_name
+        with self.__state_lock:
+            current = self.__version
+            if version is not None and not 0 <= version <= current:
+                raise ValueError(f"Versión {version} no válida (la versión actual del vuelo "
+                                 f"{self.__number} es {current}).")
+            if version is not None and self.__feed is not None and version >= self.__feed_base:
+                changed = []
+                for change_version, index in reversed(self.__feed):
+                    if change_version <= version:
+                        break
+                    changed.append(index)
+                get = self.__seating.get
+                return current, False, [(seat_name(index), get(index))
+                                        for index in dict.fromkeys(reversed(changed))]
+
+        # La foto completa recorre el motor: con todas las filas bloqueadas no
+        # hay escrituras a medias y la versión corresponde a lo que se lee
+        with self.__flight_guard():
+            return self.__version, True, [(seat_name(index), passenger)
+                                          for index, passenger in self.__seating.items()]
+
+    def attach_journal(self, journal):
+        """
+        Conecta un diario de reservas: desde ese momento cada cambio de
+        ocupación se registra en él (ver BookingJournal.py).
+
+        Args:
+            journal (BookingJournal): Diario donde se registran los cambios.
+        """
+        self.__journal = journal
+
+    def detach_journal(self):
+        """
+        Desconecta el diario de reservas, escribiendo antes su grupo pendiente.
+
+        Returns:
+            BookingJournal: El diario que estaba conectado (o None).
+        """
+        journal = self.__journal
+        if journal is not None:
+            journal.sync()
+        self.__journal = None
+        return journal
+
+    def get_metrics(self):
+        """
+        Devuelve el destino de métricas conectado.
+
+        Returns:
+            MetricsSink: El sink, o None si la instrumentación está apagada.
+        """
+        return self.__metrics
+
+    def set_metrics(self, sink):
+        """
+        Conecta (o desconecta, con None) un destino de métricas. Con un sink,
+        allocate_passenger, reallocate_passenger, num_available_seats y el
+        análisis de asientos cuentan llamadas, errores por causa y latencias
+        (ver Metrics.py). Las envolturas se instalan solo en esta instancia:
+        sin sink se usan los métodos de la clase y el coste es nulo.
+
+        Args:
+            sink (MetricsSink): Destino de las métricas, o None.
+        """
+        for attribute, name in _INSTRUMENTED.items():
+            self.__dict__.pop(attribute, None)
+            if sink is not None:
+                setattr(self, attribute, instrument(getattr(self, attribute), sink, name))
+        self.__metrics = sink
+
     def get_seating(self):
         """
         Retorna la estructura de asientos (lista de diccionarios).
 
+        Con el motor 'dict' es la estructura interna; con otros motores es
+        una vista construida en el momento.
+
         Returns:
             list: Lista con la ocupación de asientos del vuelo.
         """
-        return self.__seating
+        with self.__flight_guard():
+            return self.__seating.rows_view()
+
+    def occupied_indices(self):
+        """
+        Devuelve los índices empaquetados de los asientos ocupados, sin
+        recorrer el mapa de asientos (salen del índice de pasajeros). Es la
+        exportación que usa FleetAnalytics.py para montar arrays de NumPy.
+
+        Returns:
+            array: array('I') con los índices, sin orden garantizado.
+        """
+        if self.__indexed:
+            return array("I", (index for index, _ in self.__seating.items()))
+        with self.__state_lock:
+            return array("I", self.__passenger_index.values())
 
     def allocate_passenger(self, seat, passenger):
         """
@@ -104,15 +421,164 @@ class Flight:
 
         Raises:
             ValueError: Si el asiento ya está ocupado.
+            ValueError: Si el pasajero ya tiene asiento en este vuelo.
             ValueError: Si el asiento no cumple el formato o no es válido (se controla en __parse_seat).
         """
-        row, letter = self.__parse_seat(seat)
+        index = self.__parse_seat(seat)
+
+        with self.__row_guard(index):
+            # === Validar que el asiento esté libre ===
+            if self.__seating.get(index) is not None:
+                raise SeatError(f"El asiento {seat} ya está ocupado.", "occupied")
+
+            # __occupy valida además que el pasajero no tenga ya asiento
+            self.__occupy(index, passenger)
+        self.__notify()
+
+    def allocate_many(self, bookings):
+        """
+        Asigna un lote de pasajeros a sus asientos con semántica todo o nada:
+        primero se valida el lote completo y solo si todo es correcto se
+        aplican las asignaciones. Si algo falla, el vuelo queda intacto.
 
-        # === Validar que el asiento esté libre ===
-        if self.__seating[row][letter] is not None:
-            raise ValueError(f"El asiento {seat} ya está ocupado.")
+        Args:
+            bookings (iterable): Pares (seat, passenger), p.e.
+                [('1A', ('Jack', 'Shephard', '85994003S')), ...].
+
+        Raises:
+            ValueError: Si algún asiento no es válido, ya está ocupado o se
+                        repite dentro del lote.
+            ValueError: Si algún pasajero ya tiene asiento en el vuelo o
+                        aparece dos veces en el lote.
+        """
+        parse = self.__parse_seat
+        indices = []
+        passengers = []
+        seen = set()
+        seen_ids = set()
 
-        self.__seating[row][letter] = passenger
+        # === Validación del propio lote: formato y repetidos ===
+        for seat, passenger in bookings:
+            index = parse(seat)
+            if index in seen:
+                raise SeatError(f"El asiento {seat} aparece repetido en el lote.", "duplicate")
+            id_card = passenger[2]
+            if id_card in seen_ids:
+                raise SeatError(f"El pasajero {id_card} aparece repetido en el lote.", "duplicate")
+            seen.add(index)
+            seen_ids.add(id_card)
+            indices.append(index)
+            passengers.append(passenger)
+
+        with self.__row_guard(*indices):
+            # === Validación contra el estado del vuelo (sin tocarlo) ===
+            get = self.__seating.get
+            for index, passenger in zip(indices, passengers):
+                if get(index) is not None:
+                    raise SeatError(f"El asiento {self.__layout.seat_name(index)} ya está ocupado.", "occupied")
+                self.__check_not_booked(passenger)
+
+            # === Aplicación del lote (__occupy_many vuelve a comprobar los pasajeros) ===
+            self.__occupy_many(indices, passengers)
+        self.__notify()
+
+    def allocate_rows(self, rows, report):
+        """
+        Asigna un lote de filas de manifiesto sin abortar: las filas que no se
+        pueden asignar (asiento no válido u ocupado, pasajero repetido o que ya
+        tiene asiento) se anotan en el informe y el resto se asigna con una
+        sola escritura en el motor y un único aviso a los observadores.
+
+        Args:
+            rows (list): Tuplas (línea, asiento, pasajero) del manifiesto.
+            report (ManifestReport): Informe donde se anotan los resultados.
+
+        Returns:
+            int: Número de filas asignadas.
+        """
+        parse = self.__parse_seat
+        parsed = []
+        for line, seat, passenger in rows:
+            try:
+                parsed.append((line, parse(seat), passenger))
+            except ValueError as error:
+                report.add_error(line, str(error))
+        if not parsed:
+            return 0
+
+        candidates = []
+        with self.__row_guard(*(index for _, index, _ in parsed)):
+            # === Validación contra el estado del vuelo y el propio lote ===
+            get = self.__seating.get
+            seen = set()
+            seen_ids = set()
+            for line, index, passenger in parsed:
+                id_card = passenger[2]
+                if index in seen or get(index) is not None:
+                    report.add_error(line, f"El asiento {self.__layout.seat_name(index)} ya está ocupado.")
+                elif id_card in seen_ids or id_card in self.__waitlisted or self.__is_booked(id_card):
+                    report.add_error(line, f"El pasajero {id_card} ya tiene asiento en el vuelo {self.__number}.")
+                else:
+                    seen.add(index)
+                    seen_ids.add(id_card)
+                    candidates.append((line, index, passenger))
+
+            # === Aplicación de las filas válidas ===
+            with self.__engine_lock:
+                self.__seating.put_many((index, passenger) for _, index, passenger in candidates)
+            indices = []
+            passengers = []
+            rejected = []
+            with self.__state_lock:
+                # En modo concurrente otro hilo pudo sentar entretanto al pasajero
+                booked = () if self.__indexed else self.__passenger_index
+                for line, index, passenger in candidates:
+                    if passenger[2] in booked or passenger[2] in self.__waitlisted:
+                        report.add_error(line, f"El pasajero {passenger[2]} ya tiene asiento "
+                                               f"en el vuelo {self.__number}.")
+                        rejected.append(index)
+                    else:
+                        indices.append(index)
+                        passengers.append(passenger)
+                self.__track_many(indices, passengers)
+                for index, passenger in zip(indices, passengers):
+                    self.__record(OCCUPY, (index, passenger))
+                if rejected:
+                    self.__undo_put(rejected)
+        report.add_imported(len(indices))
+        if indices:
+            self.__notify()
+        return len(indices)
+
+    def import_manifest(self, source, fmt="csv", batch_size=DEFAULT_BATCH_SIZE, report=None):
+        """
+        Importa un manifiesto de pasajeros (ver Manifest.py) leyéndolo en
+        streaming y asignándolo por lotes con allocate_rows(). Las filas
+        incorrectas, o de otro vuelo si el manifiesto tiene columna 'flight',
+        se anotan en el informe sin detener la importación.
+
+        Args:
+            source (str | file): Ruta del fichero o flujo abierto (texto o binario).
+            fmt (str): Formato del manifiesto ('csv' o 'jsonl').
+            batch_size (int): Filas que se validan y asignan de una vez.
+            report (ManifestReport): Informe donde anotar los resultados
+                                     (por defecto, uno nuevo).
+
+        Returns:
+            ManifestReport: Filas importadas y filas rechazadas con su línea.
+
+        Raises:
+            ValueError: Si el formato no es válido, batch_size < 1 o a la
+                        cabecera CSV le faltan columnas.
+        """
+        def resolve(number):
+            if number is not None and number != self.__number:
+                raise ValueError(f"La fila es del vuelo {number}, no del {self.__number}.")
+            return self
+
+        if report is None:
+            report = ManifestReport()
+        return import_manifest(read_manifest(source, report, fmt), resolve, report, batch_size)
 
     def reallocate_passenger(self, from_seat, to_seat):
         """
@@ -127,21 +593,282 @@ class Flight:
             ValueError: Si el asiento de destino está ocupado.
             ValueError: Si alguno de los asientos no cumple el formato (se controla en __parse_seat).
         """
-        from_row, from_letter = self.__parse_seat(from_seat)
-        passenger = self.__seating[from_row][from_letter]
+        self.__move(self.__parse_seat(from_seat), self.__parse_seat(to_seat))
 
-        # === Validar que el asiento original esté ocupado ===
-        if passenger is None:
-            raise ValueError(f"El asiento {from_seat} está vacío; no se puede reasignar.")
+    def find_seat(self, id_card):
+        """
+        Busca el asiento que ocupa un pasajero, sin recorrer el vuelo.
 
-        # === Validar que el asiento de destino esté libre ===
-        to_row, to_letter = self.__parse_seat(to_seat)
-        if self.__seating[to_row][to_letter] is not None:
-            raise ValueError(f"El asiento {to_seat} ya está ocupado.")
+        Args:
+            id_card (str): Documento de identidad del pasajero.
 
-        # Movemos al pasajero
-        self.__seating[from_row][from_letter] = None
-        self.__seating[to_row][to_letter] = passenger
+        Returns:
+            str: Asiento del pasajero (p.e. '12C'), o None si no está en el vuelo.
+        """
+        index = self.__seat_of(id_card)
+        if index is None:
+            return None
+        return self.__layout.seat_name(index)
+
+    def reallocate_by_passenger(self, id_card, to_seat):
+        """
+        Reasigna a un pasajero, identificado por su documento, a otro asiento.
+
+        Args:
+            id_card (str): Documento de identidad del pasajero.
+            to_seat (str): Asiento de destino (p.e. '21F').
+
+        Raises:
+            ValueError: Si el pasajero no tiene asiento en este vuelo, o si en
+                        modo concurrente deja su asiento antes de moverlo.
+            ValueError: Si el asiento de destino está ocupado o no es válido.
+        """
+        to_index = self.__parse_seat(to_seat)
+        from_index = self.__seat_of(id_card)
+        if from_index is None:
+            raise SeatError(f"El pasajero {id_card} no tiene asiento en el vuelo {self.__number}.", "not_booked")
+        self.__move(from_index, to_index, id_card)
+
+    def auto_allocate(self, passenger, preference="any", together=1):
+        """
+        Asigna automáticamente el mejor asiento libre (el más adelantado y,
+        dentro de la fila, el de letra menor) según la preferencia indicada.
+
+        Para un pasajero se usa un montículo de asientos libres por tipo de
+        asiento, de modo que cada asignación cuesta O(log n). Para un grupo
+        (together > 1) se buscan asientos contiguos en una misma fila: primero
+        dentro de un mismo bloque y, si no hay, cruzando el pasillo. Solo se
+        miran las filas con suficientes asientos libres según los contadores.
+
+        Args:
+            passenger (tuple | list): Datos del pasajero o, si together > 1,
+                una lista con los datos de cada pasajero del grupo.
+            preference (str): 'window', 'aisle' o 'any'. En grupos, se prefiere
+                una fila en la que el grupo incluya un asiento de ese tipo.
+            together (int): Número de pasajeros que deben sentarse juntos.
+
+        Returns:
+            str | list: El asiento asignado o, para grupos, la lista de asientos
+                        en el mismo orden que los pasajeros.
+
+        Raises:
+            ValueError: Si la preferencia no es válida, el grupo no coincide con
+                        together, algún pasajero ya tiene asiento o no quedan
+                        asientos libres que cumplan la petición.
+        """
+        if preference not in ("window", "aisle", "any"):
+            raise ValueError(f"Preferencia '{preference}' no válida (use 'window', 'aisle' o 'any').")
+        if together < 1:
+            raise ValueError(f"El número de pasajeros (together={together}) debe ser al menos 1.")
+
+        if together > 1:
+            passengers = list(passenger)
+            if len(passengers) != together:
+                raise ValueError(f"Se esperaban {together} pasajeros y se recibieron {len(passengers)}.")
+            seats = self.__find_adjacent_seats(together, preference)
+            self.allocate_many(zip(seats, passengers))
+            return seats
+
+        self.__check_not_booked(passenger)
+
+        get = self.__seating.get
+        rebuilt = False
+        while True:
+            with self.__state_lock:
+                heap = self.__get_free_heaps()[preference]
+                # Descartamos los asientos que se ocuparon después de entrar al montículo
+                while heap and get(heap[0]) is not None:
+                    heapq.heappop(heap)
+                if not heap and self.__indexed and not rebuilt:
+                    # Con SQLite otros procesos pudieron liberar asientos que el montículo no tiene
+                    self.__free_heaps = None
+                    rebuilt = True
+                    continue
+                if not heap:
+                    raise SeatError(f"No quedan asientos libres de tipo '{preference}' "
+                                    f"en el vuelo {self.__number}.", "no_seats")
+                index = heapq.heappop(heap)
+
+            with self.__row_guard(index):
+                # En modo concurrente otro hilo pudo ocuparlo: probamos el siguiente
+                if get(index) is None:
+                    self.__occupy(index, passenger)
+                    break
+        self.__notify()
+        return self.__layout.seat_name(index)
+
+    def book(self, passenger, fare_class="Y", preference="any", timestamp=None):
+        """
+        Reserva una plaza admitiendo sobreventa: si hay asiento libre se
+        asigna con auto_allocate() (con la preferencia o, si no la hay,
+        cualquiera); si el vuelo está lleno, el pasajero entra en la lista de
+        espera mientras no se supere la sobreventa de la aeronave (ver
+        Aircraft.set_overbooking_ratio). La lista de espera se ordena por
+        clase de tarifa y, dentro de cada clase, por orden de llegada; al
+        liberarse un asiento (cancel() o reallocate_passenger()) se sienta al
+        primero en O(log n). La lista de espera no se guarda en instantáneas.
+
+        Args:
+            passenger (tuple): Datos del pasajero.
+            fare_class (str): Clase de tarifa ('F', 'J', 'W' o 'Y'; ver FARE_CLASSES).
+            preference (str): 'window', 'aisle' o 'any'.
+            timestamp (float): Instante de la reserva (por defecto, ahora).
+
+        Returns:
+            str: El asiento asignado, o None si el pasajero queda en espera.
+
+        Raises:
+            ValueError: Si la tarifa o la preferencia no son válidas.
+            ValueError: Si el pasajero ya tiene asiento o ya está en espera.
+            ValueError: Si el vuelo está lleno y no quedan plazas de sobreventa.
+        """
+        priority = FARE_CLASSES.get(fare_class)
+        if priority is None:
+            raise ValueError(f"Clase de tarifa '{fare_class}' no válida (opciones: {', '.join(FARE_CLASSES)}).")
+        if passenger[2] in self.__waitlisted:
+            raise SeatError(f"El pasajero {passenger[2]} ya está en la lista de espera "
+                            f"del vuelo {self.__number}.", "already_booked")
+        if timestamp is None:
+            timestamp = time.time()
+
+        while True:
+            for wanted in dict.fromkeys((preference, "any")):
+                try:
+                    return self.auto_allocate(passenger, wanted)
+                except SeatError as error:
+                    if error.reason != "no_seats":
+                        raise
+
+            with self.__state_lock:
+                # En modo concurrente pudo liberarse un asiento entretanto
+                if self.__num_occupied() < self.__layout.num_seats():
+                    continue
+                if len(self.__waitlisted) >= self.__aircraft.overbooking_limit():
+                    raise SeatError(f"El vuelo {self.__number} está completo y sin plazas de sobreventa.", "full")
+                self.__check_not_booked(passenger)
+                entry = [priority, timestamp, next(self.__waitlist_seq), passenger]
+                heapq.heappush(self.__waitlist, entry)
+                self.__waitlisted[passenger[2]] = entry
+            return None
+
+    def cancel(self, seat):
+        """
+        Cancela la reserva de un asiento. Si hay pasajeros en espera, el
+        primero ocupa el asiento liberado.
+
+        Args:
+            seat (str): Identificador del asiento (p.e. '12C').
+
+        Returns:
+            tuple: Datos del pasajero cuya reserva se canceló.
+
+        Raises:
+            ValueError: Si el asiento no es válido o está vacío.
+        """
+        index = self.__parse_seat(seat)
+        with self.__row_guard(index):
+            if self.__seating.get(index) is None:
+                raise SeatError(f"El asiento {seat} está vacío; no hay reserva que cancelar.", "empty_seat")
+            passenger = self.__release(index)
+            self.__promote(index)
+        self.__notify()
+        return passenger
+
+    def cancel_passenger(self, id_card):
+        """
+        Cancela la reserva de un pasajero: libera su asiento (y, como en
+        cancel(), lo ocupa el primero de la lista de espera) o, si estaba en
+        espera, lo retira de la lista.
+
+        Args:
+            id_card (str): Documento de identidad del pasajero.
+
+        Returns:
+            tuple: Datos del pasajero.
+
+        Raises:
+            ValueError: Si el pasajero no tiene asiento ni está en espera, o
+                        si en modo concurrente deja su asiento antes de
+                        cancelarlo (otro hilo lo movió o lo canceló).
+        """
+        with self.__state_lock:
+            entry = self.__waitlisted.pop(id_card, None)
+            if entry is not None:
+                # Borrado perezoso: la entrada se descarta al salir del montículo
+                passenger, entry[3] = entry[3], None
+                if len(self.__waitlist) > 2 * len(self.__waitlisted) + 16:
+                    self.__waitlist = [item for item in self.__waitlist if item[3] is not None]
+                    heapq.heapify(self.__waitlist)
+                return passenger
+        index = self.__seat_of(id_card)
+        if index is None:
+            raise SeatError(f"El pasajero {id_card} no tiene asiento en el vuelo {self.__number}.", "not_booked")
+        with self.__row_guard(index):
+            # El asiento se buscó sin cerrojo: se comprueba que siga siendo suyo
+            self.__check_occupant(index, id_card)
+            passenger = self.__release(index)
+            self.__promote(index)
+        self.__notify()
+        return passenger
+
+    def cancel_many(self, seats):
+        """
+        Cancela un lote de reservas con semántica todo o nada: si algún
+        asiento no es válido, está vacío o se repite, no se cancela ninguno.
+        El motor libera el lote de una vez y los observadores reciben un único
+        aviso, así que una oleada de cancelaciones no obliga a reconstruir el vuelo.
+
+        Args:
+            seats (iterable): Identificadores de los asientos (p.e. ['1A', '12C']).
+
+        Returns:
+            list: Datos de los pasajeros cancelados, en el mismo orden.
+
+        Raises:
+            ValueError: Si algún asiento no es válido, está vacío o se repite.
+        """
+        indices = []
+        seen = set()
+        for seat in seats:
+            index = self.__parse_seat(seat)
+            if index in seen:
+                raise SeatError(f"El asiento {seat} aparece repetido en el lote.", "duplicate")
+            seen.add(index)
+            indices.append(index)
+        if not indices:
+            return []
+
+        with self.__row_guard(*indices):
+            get = self.__seating.get
+            for index in indices:
+                if get(index) is None:
+                    raise SeatError(f"El asiento {self.__layout.seat_name(index)} está vacío; "
+                                    f"no hay reserva que cancelar.", "empty_seat")
+            passengers = self.__release_many(indices)
+            for index in indices:
+                self.__promote(index)
+        self.__notify()
+        return passengers
+
+    def get_waitlist(self):
+        """
+        Devuelve los pasajeros en espera, en el orden en que se sentarán.
+
+        Returns:
+            list: Datos de cada pasajero en espera.
+        """
+        with self.__state_lock:
+            entries = sorted(entry for entry in self.__waitlist if entry[3] is not None)
+        return [entry[3] for entry in entries]
+
+    def num_waitlisted(self):
+        """
+        Devuelve el número de pasajeros en espera.
+
+        Returns:
+            int: Pasajeros en la lista de espera.
+        """
+        return len(self.__waitlisted)
 
     def num_available_seats(self):
         """
@@ -150,22 +877,104 @@ class Flight:
         Returns:
             int: Número de asientos libres.
         """
+        return self.__aircraft.num_seats() - self.__num_occupied()
+
+    def num_available_seats_in_row(self, row):
+        """
+        Obtiene la cantidad de asientos libres en una fila.
+
+        Args:
+            row (int): Número de fila (empezando en 1).
+
+        Returns:
+            int: Número de asientos libres en la fila.
+
+        Raises:
+            ValueError: Si la fila no existe en la aeronave.
+        """
+        num_rows = self.__layout.get_num_rows()
+        if row < 1 or row > num_rows:
+            raise SeatError(f"La fila {row} no existe en este avión (máximo {num_rows}).", "bad_row")
+        return self.__layout.row_capacity(row) - self.__occupied_in_row(row)
+
+    def num_available_seats_by_letter(self, letters):
+        """
+        Obtiene la cantidad de asientos libres con alguna de las letras dadas.
+
+        Args:
+            letters (str): Una o varias letras de asiento (ej. 'A' o 'AF').
+
+        Returns:
+            int: Número de asientos libres con esas letras en todo el vuelo.
+
+        Raises:
+            ValueError: Si alguna letra no es válida para este avión.
+        """
         count = 0
-        # Empezamos en la fila 1 porque la 0 es None
-        for row in self.__seating[1:]:
-            for seat_letter, occupant in row.items():
-                if occupant is None:
-                    count += 1
+        for letter in letters:
+            if letter not in self.__layout.get_letter_set():
+                raise SeatError(f"La letra de asiento '{letter}' no es válida para este avión.", "bad_letter")
+            if self.__indexed:
+                occupied = self.__seating.count(column=self.__layout.get_columns()[letter])
+            else:
+                occupied = self.__occupied_by_letter.get(letter, 0)
+            count += self.__layout.letter_capacity(letter) - occupied
         return count
 
-    def print_seating(self):
+    def num_available_window_seats(self):
+        """
+        Obtiene la cantidad de asientos de ventanilla libres.
+
+        Returns:
+            int: Número de asientos de ventanilla libres.
+        """
+        return self.num_available_seats_by_letter(self.__aircraft.window_seats())
+
+    def num_available_aisle_seats(self):
+        """
+        Obtiene la cantidad de asientos de pasillo libres.
+
+        Returns:
+            int: Número de asientos de pasillo libres.
+        """
+        return self.num_available_seats_by_letter(self.__aircraft.aisle_seats())
+
+    def render_seating(self):
+        """
+        Devuelve el plano de asientos en forma de rejilla ('X' ocupado,
+        '.' libre). Solo se vuelven a dibujar las filas que cambiaron desde
+        la última llamada (ver SeatGrid.py).
+
+        Returns:
+            str: El plano, con una línea de cabecera y una por fila.
+        """
+        if self.__indexed:
+            # Sin __track no se invalida la caché (y con SQLite otros procesos cambian el motor)
+            return SeatGrid(self.__layout).render(self.__seating.get)
+        with self.__state_lock:
+            return self.__grid.render(self.__seating.get)
+
+    def print_seating(self, fmt="grid"):
         """
         Muestra por consola el plan de asientos del vuelo.
 
+        Args:
+            fmt (str): 'grid' para el plano compacto de render_seating()
+                       (por defecto) o 'pprint' para la lista de diccionarios.
+
         Ejemplo de una fila:
-            {'A': None, 'B': None, 'C': None, 'D': None, 'E': None, 'F': None}
+            grid:   '12 X.. .X.'
+            pprint: {'A': None, 'B': None, 'C': None, 'D': None, 'E': None, 'F': None}
+
+        Raises:
+            ValueError: Si el formato no es válido.
         """
-        pprint(self.__seating)
+        if fmt == "grid":
+            sys.stdout.write(self.render_seating())
+        elif fmt == "pprint":
+            pprint(self.get_seating())
+        else:
+            raise ValueError(f"Formato de plano '{fmt}' no válido (opciones: grid, pprint).")
 
     def print_boarding_cards(self):
         """
@@ -176,27 +985,231 @@ class Flight:
             |  Jack Sheppard 85994003S 15E BA758 Airbus A319          |
             ----------------------------------------------------------
         """
-        for passenger, seat in self.__passenger_seats():
-            name, surname, id_card = passenger
-            row, letter = self.__parse_seat(seat)
+        self.write_boarding_cards(sys.stdout)
+
+    def iter_boarding_cards(self, fmt="box"):
+        """
+        Generador con el texto de la tarjeta de embarque de cada pasajero.
 
-            # Datos del vuelo y modelo de avión
-            flight_number = self.get_number()
-            aircraft_model = self.__aircraft.get_model()
+        Args:
+            fmt (str): Formato de salida ('box', 'csv' o 'jsonl'; ver BoardingCards.py).
+
+        Yields:
+            str: El texto de cada tarjeta, terminado en salto de línea.
+        """
+        return format_boarding_cards(self.__passenger_seats(), self.__number,
+                                     self.__aircraft.get_model(), fmt)
+
+    def write_boarding_cards(self, sink, fmt="box", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Escribe las tarjetas de embarque en un destino, una escritura por lote.
+
+        Args:
+            sink: Destino con método write() (fichero de texto o binario, stdout...).
+            fmt (str): Formato de salida ('box', 'csv' o 'jsonl').
+            batch_size (int): Número de tarjetas por escritura.
+
+        Returns:
+            int: Número de tarjetas escritas.
+
+        Raises:
+            ValueError: Si el formato no es válido o batch_size < 1.
+        """
+        return write_boarding_cards(self.iter_boarding_cards(fmt), sink, fmt, batch_size)
+
+    def iter_manifest(self):
+        """
+        Generador con las filas del manifiesto del vuelo.
+
+        Yields:
+            tuple: (vuelo, asiento, nombre, apellido, id_card) de cada asiento ocupado.
+        """
+        for (name, surname, id_card), seat in self.__passenger_seats():
+            yield (self.__number, seat, name, surname, id_card)
+
+    def export_manifest(self, sink, fmt="csv", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Exporta el manifiesto del vuelo (ver Manifest.py), una escritura por lote.
+
+        Args:
+            sink (str | file): Ruta del fichero o destino con método write().
+            fmt (str): Formato de salida ('csv' o 'jsonl').
+            batch_size (int): Número de filas por escritura.
+
+        Returns:
+            int: Número de filas escritas.
+
+        Raises:
+            ValueError: Si el formato no es válido o batch_size < 1.
+        """
+        return write_manifest(self.iter_manifest(), sink, fmt, batch_size)
+
+    def save(self, path):
+        """
+        Guarda el vuelo en una instantánea binaria compacta (ver Snapshot.py):
+        la aeronave, un mapa de bits de ocupación y la tabla de pasajeros.
+
+        Args:
+            path (str): Ruta del fichero de destino.
+        """
+        with self.__flight_guard():
+            save_snapshot(path, self.__number, self.__aircraft, self.__seating.items(), self.__version)
+
+    @classmethod
+    def load(cls, path, engine="dict", concurrent=False, feed_size=0):
+        """
+        Recupera un vuelo guardado con save(). Con engine='mmap' la
+        instantánea se abre con mmap y no se decodifica: la ocupación sale del
+        mapa de bits y cada pasajero se lee al consultarlo (ver
+        Snapshot.MappedSeatMap), así que reabrir un vuelo cuesta lo que su
+        cabecera. Con cualquier otro motor se decodifican y restauran todos
+        los pasajeros.
+
+        El vuelo abierto con engine='mmap' mantiene el fichero mapeado
+        mientras existe (un descriptor por vuelo) y sus cambios no se
+        escriben en él hasta el próximo save().
+
+        Args:
+            path (str): Ruta de la instantánea.
+            engine (str | callable): Motor de asientos del vuelo recuperado, o 'mmap'.
+            concurrent (bool): Si el vuelo recuperado usa el modo concurrente.
+            feed_size (int): Tamaño del registro de cambios (ver changes_since()).
+
+        Returns:
+            Flight: El vuelo con su aeronave y sus pasajeros.
+
+        Raises:
+            ValueError: Si el fichero no es una instantánea válida.
+        """
+        if engine == "mmap":
+            number, aircraft, version, factory = open_snapshot(path)
+            flight = cls(number, aircraft, engine=factory, concurrent=concurrent, feed_size=feed_size)
+        else:
+            number, aircraft, indices, passengers, version = load_snapshot(path)
+            flight = cls(number, aircraft, engine=engine, concurrent=concurrent, feed_size=feed_size)
+            # La instantánea ya está validada: se restaura sin volver a analizar asientos
+            flight.__occupy_many(indices, passengers, record=False)
+        flight.__version = flight.__feed_base = version
+        return flight
 
-            print("----------------------------------------------------------")
-            print(f"|  {name} {surname} {id_card} {row}{letter} {flight_number} {aircraft_model}  |")
-            print("----------------------------------------------------------")
+    @classmethod
+    def recover(cls, snapshot_path, journal_path, engine="dict", concurrent=False, feed_size=0):
+        """
+        Reconstruye un vuelo tras una caída: carga su última instantánea y
+        reaplica los cambios del diario posteriores a ella.
+
+        Args:
+            snapshot_path (str): Ruta de la instantánea (ver save()).
+            journal_path (str): Ruta del diario (ver BookingJournal.py).
+            engine (str | callable): Motor de asientos del vuelo recuperado.
+            concurrent (bool): Si el vuelo recuperado usa el modo concurrente.
+            feed_size (int): Tamaño del registro de cambios (ver changes_since()).
+
+        Returns:
+            Flight: El vuelo recuperado.
+        """
+        flight = cls.load(snapshot_path, engine=engine, concurrent=concurrent, feed_size=feed_size)
+        if os.path.exists(journal_path):
+            flight.replay_journal(journal_path)
+        return flight
+
+    def replay_journal(self, path):
+        """
+        Reaplica sobre el vuelo los registros de un diario cuya versión sea
+        posterior a la actual; los ya incluidos (p.e. en la instantánea de la
+        que se cargó el vuelo) se saltan. Los cambios reaplicados no se vuelven
+        a registrar en el diario conectado.
+
+        Args:
+            path (str): Ruta del diario.
+
+        Returns:
+            int: Número de registros aplicados.
+
+        Raises:
+            ValueError: Si un registro no se puede aplicar sobre el estado actual
+                        (el diario no corresponde a este vuelo).
+        """
+        applied = 0
+        with self.__flight_guard(), self.__state_lock:
+            # Los registros se aplican primero sobre una capa {índice: pasajero}
+            # y al final solo se llevan al vuelo los asientos cuyo ocupante
+            # cambió: reaplicar un millón de movimientos no toca un millón de
+            # veces los contadores ni el motor.
+            get = self.__seating.get
+            overlay = {}
+            version = self.__version
+            for record_version, operation, args in read_journal(path):
+                if record_version <= version:
+                    continue
+                if operation == OCCUPY:
+                    index, passenger = args
+                    current = overlay[index] if index in overlay else get(index)
+                    if current is not None:
+                        raise ValueError(f"Diario incoherente: el asiento "
+                                         f"{self.__layout.seat_name(index)} ya está ocupado.")
+                    overlay[index] = passenger
+                else:
+                    from_index = args[0]
+                    passenger = overlay[from_index] if from_index in overlay else get(from_index)
+                    if passenger is None:
+                        raise ValueError(f"Diario incoherente: el asiento "
+                                         f"{self.__layout.seat_name(from_index)} está vacío.")
+                    overlay[from_index] = None
+                    if operation == MOVE:
+                        overlay[args[1]] = passenger
+                version = record_version
+                applied += 1
+
+            changed = [(index, passenger) for index, passenger in overlay.items()
+                       if get(index) != passenger]
+            for index, _ in changed:
+                if get(index) is not None:
+                    self.__release(index, record=False)
+            occupied = [(index, passenger) for index, passenger in changed if passenger is not None]
+            self.__occupy_many([index for index, _ in occupied],
+                               [passenger for _, passenger in occupied], record=False)
+            self.__version = version
+            if applied and self.__feed is not None:
+                # Los cambios reaplicados no pasan por el registro de cambios
+                self.__feed.clear()
+                self.__feed_base = version
+        if applied:
+            self.__notify()
+        return applied
+
+    def compact_journal(self, snapshot_path):
+        """
+        Compacta el diario conectado: guarda una instantánea con el estado
+        actual y vacía el diario. El diario solo se vacía cuando la
+        instantánea ya está en disco (save_snapshot fuerza el fichero y su
+        directorio), así que un corte de corriente nunca deja un diario vacío
+        sin instantánea. Si hay una caída entre ambos pasos, la versión
+        guardada en la instantánea evita reaplicar cambios.
+
+        Args:
+            snapshot_path (str): Ruta de la nueva instantánea.
+
+        Raises:
+            ValueError: Si no hay ningún diario conectado.
+        """
+        if self.__journal is None:
+            raise ValueError(f"El vuelo {self.__number} no tiene un diario conectado.")
+        with self.__flight_guard(), self.__state_lock:
+            self.__journal.sync()
+            save_snapshot(snapshot_path, self.__number, self.__aircraft, self.__seating.items(), self.__version)
+            self.__journal.truncate()  # solo tras volver de save_snapshot: la instantánea ya es duradera
 
     def __parse_seat(self, seat):
         """
-        Separa un identificador de asiento en la fila (numérico) y la letra.
+        Analiza un identificador de asiento con el parser memorizado de la
+        distribución de la aeronave (ver SeatLayout.seat_index).
 
         Args:
             seat (str): El identificador del asiento (p.e. '12C').
 
         Returns:
-            tuple: (row (int), letter (str))
+            int: Índice empaquetado del asiento dentro del motor.
 
         Raises:
             ValueError: Si el asiento no es válido:
@@ -204,40 +1217,537 @@ class Flight:
                 - El resto deben ser dígitos.
                 - El número de fila debe estar entre 1 y num_rows de la aeronave.
         """
-        # Ejemplo: seat = '12C'
-        # Ultimo char -> 'C' (debe estar en seat_letters)
-        # El resto -> '12' (deben ser dígitos y 1 <= 12 <= num_rows)
-        seat_letters = self.__aircraft.seating_plan()[1]
+        return self.__layout.seat_index(seat)
 
-        if len(seat) < 2:
-            raise ValueError(f"Asiento '{seat}' es demasiado corto.")
+    def __seat_classes(self):
+        """
+        Devuelve las letras que pertenecen a cada tipo de asiento.
 
-        letter = seat[-1]        # el último carácter
-        if letter not in seat_letters:
-            raise ValueError(f"La letra de asiento '{letter}' no es válida para este avión.")
+        Returns:
+            dict: {'window': letras, 'aisle': letras, 'any': todas las letras}.
+        """
+        return {
+            "window": self.__aircraft.window_seats(),
+            "aisle": self.__aircraft.aisle_seats(),
+            "any": self.__layout.get_letters(),
+        }
 
-        row_str = seat[:-1]      # todo menos el último carácter
-        if not row_str.isdigit():
-            raise ValueError(f"La fila de asiento '{row_str}' no es un número válido.")
+    def __get_free_heaps(self):
+        """
+        Devuelve los montículos de asientos libres, construyéndolos en la
+        primera llamada a partir de la distribución de la aeronave.
 
-        row = int(row_str)
-        num_rows = self.__aircraft.get_num_rows()
-        if row < 1 or row > num_rows:
-            raise ValueError(f"La fila {row} no existe en este avión (máximo {num_rows}).")
+        Returns:
+            dict: {preferencia: lista con estructura de montículo de índices}.
+        """
+        if self.__free_heaps is None:
+            width = self.__layout.width()
+            columns = self.__layout.get_columns()
+            unavailable = self.__layout.get_unavailable()
+            get = self.__seating.get
+            self.__free_heaps = {}
+            for preference, letters in self.__seat_classes().items():
+                cols = sorted(columns[letter] for letter in letters)
+                # Generados en orden creciente: la lista ya es un montículo válido
+                self.__free_heaps[preference] = [
+                    row * width + col
+                    for row in range(self.__layout.get_num_rows())
+                    for col in cols
+                    if row * width + col not in unavailable and get(row * width + col) is None
+                ]
+        return self.__free_heaps
+
+    def __find_adjacent_seats(self, together, preference):
+        """
+        Busca 'together' asientos libres contiguos en una misma fila.
+
+        Args:
+            together (int): Número de asientos contiguos necesarios.
+            preference (str): 'window', 'aisle' o 'any'.
+
+        Returns:
+            list: Identificadores de los asientos encontrados.
+
+        Raises:
+            ValueError: Si no hay ninguna fila con hueco para el grupo.
+        """
+        letters = self.__layout.get_letters()
+        width = self.__layout.width()
+        preferred = set(self.__seat_classes()[preference])
+        unavailable = self.__layout.get_unavailable()
+        get = self.__seating.get
+
+        # Tramos de columnas candidatos: primero dentro de cada bloque y después
+        # cruzando el pasillo (cualquier tramo de letras consecutivas).
+        in_block = []
+        start = 0
+        for block in self.__layout.get_blocks():
+            for first in range(start, start + len(block) - together + 1):
+                in_block.append(range(first, first + together))
+            start += len(block)
+        across = [range(first, first + together) for first in range(width - together + 1)
+                  if range(first, first + together) not in in_block]
+
+        for spans in (in_block, across):
+            for row in range(self.__layout.get_num_rows()):
+                if self.__layout.row_capacity(row + 1) - self.__occupied_in_row(row + 1) < together:
+                    continue
+                base = row * width
+                free_spans = [span for span in spans
+                              if all(base + col not in unavailable and get(base + col) is None
+                                     for col in span)]
+                if not free_spans:
+                    continue
+                best = free_spans[0]
+                for span in free_spans:
+                    if any(letters[col] in preferred for col in span):
+                        best = span
+                        break
+                return [f"{row + 1}{letters[col]}" for col in best]
+
+        raise ValueError(f"No hay {together} asientos libres juntos en el vuelo {self.__number}.")
 
-        return row, letter
+    def __row_guard(self, *indices):
+        """
+        Devuelve el contexto que protege las filas de los asientos indicados.
+        Fuera del modo concurrente no bloquea nada.
+
+        Args:
+            *indices (int): Índices empaquetados de los asientos afectados.
+
+        Returns:
+            context manager: Adquiere los cerrojos de las franjas implicadas,
+                             siempre en el mismo orden para evitar interbloqueos.
+        """
+        if self.__row_locks is None:
+            return self.__state_lock
+        width = self.__layout.width()
+        stripes = sorted({(index // width) % len(self.__row_locks) for index in indices})
+        if len(stripes) == 1:
+            return self.__row_locks[stripes[0]]
+        stack = ExitStack()
+        for stripe in stripes:
+            stack.enter_context(self.__row_locks[stripe])
+        return stack
+
+    def __flight_guard(self):
+        """
+        Devuelve el contexto que bloquea todas las filas, para las operaciones
+        que recorren el motor entero (vistas, instantáneas, reaplicar el
+        diario). Fuera del modo concurrente no bloquea nada.
+
+        Returns:
+            context manager: Adquiere todos los cerrojos de franja, en orden.
+        """
+        if self.__row_locks is None:
+            return self.__state_lock
+        stack = ExitStack()
+        for lock in self.__row_locks:
+            stack.enter_context(lock)
+        return stack
+
+    def __record(self, operation, args):
+        """
+        Registra un cambio de ocupación: incrementa la versión, lo añade al
+        diario si hay uno conectado y, si el registro de cambios está activo,
+        anota los asientos afectados. Se llama dentro de la sección crítica.
+
+        Args:
+            operation (int): OCCUPY, RELEASE o MOVE (ver BookingJournal.py).
+            args (tuple): Datos del cambio.
+        """
+        self.__version += 1
+        if self.__journal is not None:
+            self.__journal.append(self.__version, operation, args)
+
+        feed = self.__feed
+        if feed is not None:
+            # OCCUPY y RELEASE cambian un asiento (args[0]); MOVE, dos
+            for index in (args[:2] if operation == MOVE else args[:1]):
+                if len(feed) == feed.maxlen:
+                    self.__feed_base = feed[0][0]
+                feed.append((self.__version, index))
+
+    def __notify(self):
+        """
+        Avisa a los observadores de que la ocupación del vuelo ha cambiado.
+        """
+        for callback in self.__observers:
+            callback(self)
+
+    def __check_not_booked(self, passenger):
+        """
+        Comprueba que el pasajero no tenga ya un asiento en este vuelo.
+
+        Args:
+            passenger (tuple): Datos del pasajero (nombre, apellido, id_card).
+
+        Raises:
+            ValueError: Si el pasajero ya tiene asiento.
+        """
+        id_card = passenger[2]
+        if self.__is_booked(id_card):
+            raise SeatError(f"El pasajero {id_card} ya tiene asiento en el vuelo {self.__number}.", "already_booked")
+
+    def __move(self, from_index, to_index, id_card=None):
+        """
+        Mueve al pasajero de un asiento a otro libre y sienta en el asiento
+        liberado al primero de la lista de espera.
+
+        Args:
+            from_index (int): Índice empaquetado del asiento de origen.
+            to_index (int): Índice empaquetado del asiento de destino.
+            id_card (str): Si se indica, el pasajero que debe ocupar el
+                           origen; se comprueba con la fila bloqueada.
+
+        Raises:
+            ValueError: Si el origen está vacío (o lo ocupa otro pasajero) o
+                        el destino está ocupado.
+        """
+        seat_name = self.__layout.seat_name
+        with self.__row_guard(from_index, to_index):
+            # === Validar que el asiento original esté ocupado ===
+            if id_card is not None:
+                self.__check_occupant(from_index, id_card)
+            elif self.__seating.get(from_index) is None:
+                raise SeatError(f"El asiento {seat_name(from_index)} está vacío; no se puede reasignar.",
+                                "empty_seat")
+
+            # === Validar que el asiento de destino esté libre ===
+            if self.__seating.get(to_index) is not None:
+                raise SeatError(f"El asiento {seat_name(to_index)} ya está ocupado.", "occupied")
+
+            # Movemos al pasajero: las dos filas están bloqueadas, así que el
+            # motor se escribe fuera de la sección crítica de los contadores
+            with self.__engine_lock:
+                passenger = self.__seating.move(from_index, to_index)
+            if passenger is None:
+                # Solo con SQLite: otro proceso lo liberó entretanto
+                raise SeatError(f"El asiento {seat_name(from_index)} está vacío; no se puede reasignar.",
+                                "empty_seat")
+            with self.__state_lock:
+                self.__untrack(from_index, passenger)
+                self.__track(to_index, passenger)
+                self.__record(MOVE, (from_index, to_index))
+            self.__promote(from_index)
+        self.__notify()
+
+    def __seat_of(self, id_card):
+        """
+        Busca el asiento de un pasajero, sin cerrojos: en modo concurrente
+        hay que volver a comprobarlo con la fila bloqueada (ver __check_occupant).
+
+        Args:
+            id_card (str): Documento de identidad del pasajero.
+
+        Returns:
+            int: Índice empaquetado del asiento, o None si no tiene asiento.
+        """
+        if self.__indexed:
+            return self.__seating.find(id_card)
+        return self.__passenger_index.get(id_card)
+
+    def __check_occupant(self, index, id_card):
+        """
+        Comprueba, con la fila del asiento bloqueada, que el pasajero sigue
+        sentado en él.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+            id_card (str): Documento de identidad del pasajero.
+
+        Raises:
+            ValueError: Si el asiento está libre o lo ocupa otro pasajero.
+        """
+        occupant = self.__seating.get(index)
+        if occupant is None or occupant[2] != id_card:
+            raise SeatError(f"El pasajero {id_card} ya no ocupa el asiento "
+                            f"{self.__layout.seat_name(index)} del vuelo {self.__number}.", "not_booked")
+
+    def __is_booked(self, id_card):
+        """
+        Indica si un pasajero tiene asiento en este vuelo.
+
+        Args:
+            id_card (str): Documento de identidad del pasajero.
+
+        Returns:
+            bool: True si tiene asiento.
+        """
+        if self.__indexed:
+            return self.__seating.find(id_card) is not None
+        return id_card in self.__passenger_index
+
+    def __num_occupied(self):
+        """
+        Devuelve el número de asientos ocupados del vuelo.
+
+        Returns:
+            int: Asientos ocupados (leídos del motor si es indexado).
+        """
+        return self.__seating.count() if self.__indexed else self.__occupied
+
+    def __occupied_in_row(self, row):
+        """
+        Devuelve el número de asientos ocupados de una fila.
+
+        Args:
+            row (int): Número de fila (empezando en 1).
+
+        Returns:
+            int: Asientos ocupados de la fila (leídos del motor si es indexado).
+        """
+        if self.__indexed:
+            return self.__seating.count(row=row)
+        return self.__occupied_by_row.get(row, 0)
+
+    def __occupy(self, index, passenger):
+        """
+        Coloca un pasajero en un asiento libre, actualiza los contadores y
+        registra el cambio. Se llama con la fila del asiento bloqueada: el
+        motor se escribe fuera de la sección crítica y en ella solo se
+        comprueba el pasajero y se actualizan contadores e índices.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+            passenger (tuple): Datos del pasajero.
+
+        Raises:
+            ValueError: Si el pasajero ya tiene asiento en este vuelo.
+        """
+        self.__check_not_booked(passenger)
+        with self.__engine_lock:
+            self.__seating.put(index, passenger)
+
+        with self.__state_lock:
+            # En modo concurrente otro hilo pudo sentarlo entretanto (en un
+            # motor indexado lo impide ya la propia escritura)
+            try:
+                if not self.__indexed:
+                    self.__check_not_booked(passenger)
+            except SeatError:
+                self.__undo_put((index,))
+                raise
+            self.__track(index, passenger)
+            self.__record(OCCUPY, (index, passenger))
+
+    def __occupy_many(self, indices, passengers, record=True):
+        """
+        Coloca un lote de pasajeros en asientos libres (ya validados y sin
+        repetir, con sus filas bloqueadas) con una sola escritura en el motor
+        y actualiza los contadores de una vez.
+
+        Args:
+            indices (list): Índices empaquetados de los asientos.
+            passengers (list): Datos de cada pasajero, en el mismo orden.
+            record (bool): Si se registran los cambios (False al restaurar).
+
+        Raises:
+            ValueError: Si algún pasajero ya tiene asiento en este vuelo; en
+                        ese caso no se asigna ninguno.
+        """
+        with self.__engine_lock:
+            self.__seating.put_many(zip(indices, passengers))
+
+        with self.__state_lock:
+            try:
+                if not self.__indexed:
+                    for passenger in passengers:
+                        self.__check_not_booked(passenger)
+            except SeatError:
+                self.__undo_put(indices)
+                raise
+            self.__track_many(indices, passengers)
+            if record:
+                for index, passenger in zip(indices, passengers):
+                    self.__record(OCCUPY, (index, passenger))
+
+    def __track(self, index, passenger):
+        """
+        Suma a los contadores, al índice de pasajeros y al plano un asiento
+        que ya está ocupado en el motor. Se llama dentro de la sección crítica.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+            passenger (tuple): Datos del pasajero.
+        """
+        if self.__indexed:
+            return  # el motor indexado lleva la cuenta
+        row, col = divmod(index, self.__layout.width())
+        letter = self.__layout.get_letters()[col]
+
+        self.__occupied += 1
+        self.__occupied_by_row[row + 1] = self.__occupied_by_row.get(row + 1, 0) + 1
+        self.__occupied_by_letter[letter] = self.__occupied_by_letter.get(letter, 0) + 1
+        self.__passenger_index[passenger[2]] = index
+        self.__grid.invalidate(row + 1)
+
+    def __track_many(self, indices, passengers):
+        """
+        Suma a los contadores y al índice de pasajeros un lote de asientos que
+        ya están ocupados en el motor.
+
+        Args:
+            indices (list): Índices empaquetados de los asientos.
+            passengers (list): Datos de cada pasajero, en el mismo orden.
+        """
+        if self.__indexed:
+            return  # el motor indexado lleva la cuenta
+        width = self.__layout.width()
+        letters = self.__layout.get_letters()
+        by_row = self.__occupied_by_row
+        by_letter = self.__occupied_by_letter
+        booked = self.__passenger_index
+        invalidate = self.__grid.invalidate
+
+        for index, passenger in zip(indices, passengers):
+            row, col = divmod(index, width)
+            by_row[row + 1] = by_row.get(row + 1, 0) + 1
+            by_letter[letters[col]] = by_letter.get(letters[col], 0) + 1
+            booked[passenger[2]] = index
+            invalidate(row + 1)
+        self.__occupied += len(indices)
+
+    def __undo_put(self, indices):
+        """
+        Deshace la escritura en el motor de asientos que no llegaron a
+        contabilizarse (su pasajero ya tenía asiento). Se llama dentro de la
+        sección crítica, con las filas de los asientos bloqueadas.
+
+        Args:
+            indices (iterable): Índices empaquetados de los asientos.
+        """
+        width = self.__layout.width()
+        with self.__engine_lock:
+            self.__seating.remove_many(list(indices))
+        for index in indices:
+            # Un render_seating() intermedio pudo dibujar el asiento ocupado
+            self.__grid.invalidate(index // width + 1)
+            self.__push_free(index)
+
+    def __release(self, index, record=True):
+        """
+        Libera un asiento ocupado, actualiza los contadores y registra el
+        cambio. Se llama con la fila del asiento bloqueada.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+            record (bool): Si se registra el cambio (False al reaplicar el diario).
+
+        Returns:
+            tuple: Datos del pasajero que ocupaba el asiento.
+
+        Raises:
+            ValueError: Si el asiento ya estaba libre (solo con SQLite: otro
+                        proceso lo liberó entretanto).
+        """
+        with self.__engine_lock:
+            passenger = self.__seating.remove(index)
+        if passenger is None:
+            raise SeatError(f"El asiento {self.__layout.seat_name(index)} está vacío; "
+                            f"no hay reserva que cancelar.", "empty_seat")
+        with self.__state_lock:
+            self.__untrack(index, passenger)
+            if record:
+                self.__record(RELEASE, (index,))
+        return passenger
+
+    def __release_many(self, indices):
+        """
+        Libera un lote ya validado de asientos ocupados con una sola llamada
+        al motor, actualiza los contadores y registra los cambios. Se llama
+        con las filas de los asientos bloqueadas.
+
+        Args:
+            indices (list): Índices empaquetados de los asientos (ocupados y sin repetir).
+
+        Returns:
+            list: Datos de cada pasajero, en el mismo orden.
+        """
+        with self.__engine_lock:
+            passengers = self.__seating.remove_many(indices)
+        with self.__state_lock:
+            for index, passenger in zip(indices, passengers):
+                self.__untrack(index, passenger)
+                self.__record(RELEASE, (index,))
+        return passengers
+
+    def __untrack(self, index, passenger):
+        """
+        Resta de los contadores, del índice de pasajeros y del plano un asiento
+        que el motor ya ha liberado, y lo devuelve a los montículos de
+        auto_allocate. Todo en O(1) (O(log n) para los montículos).
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+            passenger (tuple): Datos del pasajero que lo ocupaba.
+        """
+        if self.__indexed:
+            self.__push_free(index)
+            return
+        row, col = divmod(index, self.__layout.width())
+        letter = self.__layout.get_letters()[col]
+
+        self.__occupied -= 1
+        self.__occupied_by_row[row + 1] -= 1
+        self.__occupied_by_letter[letter] -= 1
+        del self.__passenger_index[passenger[2]]
+        self.__grid.invalidate(row + 1)
+        self.__push_free(index)
+
+    def __push_free(self, index):
+        """
+        Devuelve un asiento libre a los montículos de auto_allocate de su tipo.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+        """
+        if self.__free_heaps is None:
+            return
+        letter = self.__layout.get_letters()[index % self.__layout.width()]
+        for preference, letters in self.__seat_classes().items():
+            if letter in letters:
+                heapq.heappush(self.__free_heaps[preference], index)
+        # Con mucha rotación se acumulan entradas obsoletas: se reconstruyen
+        if len(self.__free_heaps["any"]) > 2 * self.__layout.num_seats():
+            self.__free_heaps = None
+
+    def __promote(self, index):
+        """
+        Sienta en un asiento recién liberado al primero de la lista de espera.
+        Se llama con la fila del asiento bloqueada, fuera de la sección crítica.
+
+        Args:
+            index (int): Índice empaquetado del asiento libre.
+
+        Returns:
+            tuple: Datos del pasajero promovido, o None si no había nadie en espera.
+        """
+        if not self.__waitlisted:
+            return None
+        passenger = None
+        with self.__state_lock:
+            waitlist = self.__waitlist
+            while waitlist and passenger is None:
+                passenger = heapq.heappop(waitlist)[3]  # None: retirado de la lista
+            if passenger is not None:
+                del self.__waitlisted[passenger[2]]
+        if passenger is not None:
+            self.__occupy(index, passenger)
+        return passenger
 
     def __passenger_seats(self):
         """
-        Generador que recorre las ubicaciones de asientos ocupados.
+        Generador que recorre las ubicaciones de asientos ocupados. En modo
+        concurrente los asientos se copian antes con todas las filas
+        bloqueadas, para no recorrer el motor mientras otro hilo escribe.
 
         Yields:
             tuple: (passenger_data, seat) para cada asiento ocupado.
         """
-        # self.__seating[0] es None, así que empezamos en 1
-        for row_num in range(1, len(self.__seating)):
-            row = self.__seating[row_num]
-            for seat_letter, passenger in row.items():
-                if passenger is not None:
-                    seat = f"{row_num}{seat_letter}"
-                    yield (passenger, seat)
+        occupied = self.__seating.items()
+        if self.__row_locks is not None:
+            with self.__flight_guard():
+                occupied = list(occupied)
+        for index, passenger in occupied:
+            yield (passenger, self.__layout.seat_name(index))
@@ -0,0 +1,310 @@
+# ============================================================================
+# Fichero: FlightRegistry.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Registro de una flota de vuelos con índices de búsqueda
+# ============================================================================
+
+"""
+Módulo que define FlightRegistry, un registro de vuelos indexado por número
+de vuelo, matrícula de la aeronave, aerolínea (Boeing) y variante (Airbus),
+con un índice ordenado de asientos libres.
+
+Clases:
+    FlightRegistry
+"""
+
+import threading
+from bisect import bisect_left, insort
+from itertools import chain
+
+from Aircraft import Airbus, Boeing
+from BoardingCards import DEFAULT_BATCH_SIZE
+from Flight import validate_flight_number
+from Manifest import ManifestReport, import_manifest, read_manifest, write_manifest
+
+
+class FlightRegistry:
+    """
+    Registro de vuelos de una flota.
+
+    Atributos:
+        __flights (dict): Vuelos por número {número: Flight}.
+        __by_registration (dict): Números de vuelo por matrícula {matrícula: set}.
+        __by_airline (dict): Números de vuelo por aerolínea de Boeing {aerolínea: set}.
+        __by_variant (dict): Números de vuelo por variante de Airbus {variante: set}.
+        __free (dict): Asientos libres registrados de cada vuelo {número: n}.
+        __free_index (list): Pares (asientos libres, número) ordenados, para
+                             responder a "vuelos con al menos N libres" con bisect.
+        __lock (Lock): Protege __free y __free_index: los vuelos concurrentes
+                       avisan a sus observadores desde varios hilos a la vez.
+    """
+
+    def __init__(self, flights=()):
+        """
+        Inicializa el registro con una colección opcional de vuelos.
+
+        Args:
+            flights (iterable): Objetos Flight que se registran de inicio.
+
+        Raises:
+            ValueError: Si hay dos vuelos con el mismo número.
+        """
+        self.__flights = {}
+        self.__by_registration = {}
+        self.__by_airline = {}
+        self.__by_variant = {}
+        self.__free = {}
+        self.__free_index = []
+        self.__lock = threading.Lock()
+        for flight in flights:
+            self.add_flight(flight)
+
+    def __len__(self):
+        return len(self.__flights)
+
+    def __iter__(self):
+        return iter(self.__flights.values())
+
+    def __contains__(self, number):
+        return number in self.__flights
+
+    def add_flight(self, flight):
+        """
+        Registra un vuelo en todos los índices. A partir de ese momento el
+        registro sigue sus cambios de ocupación como observador del vuelo.
+
+        Args:
+            flight (Flight): Vuelo a registrar.
+
+        Raises:
+            ValueError: Si ya hay un vuelo registrado con ese número.
+        """
+        number = flight.get_number()
+        if number in self.__flights:
+            raise ValueError(f"El vuelo {number} ya está registrado.")
+
+        aircraft = flight.get_aircraft()
+        self.__flights[number] = flight
+        self.__by_registration.setdefault(aircraft.get_registration(), set()).add(number)
+        if isinstance(aircraft, Boeing):
+            self.__by_airline.setdefault(aircraft.get_airline(), set()).add(number)
+        if isinstance(aircraft, Airbus):
+            self.__by_variant.setdefault(aircraft.get_variant(), set()).add(number)
+
+        # Primero el observador: un cambio que llegue antes de entrar en el
+        # índice se ignora, y la entrada se crea ya con el valor actual
+        flight.add_observer(self.__on_flight_changed)
+        with self.__lock:
+            free = flight.num_available_seats()
+            self.__free[number] = free
+            insort(self.__free_index, (free, number))
+
+    def remove_flight(self, number):
+        """
+        Elimina un vuelo del registro y de todos sus índices.
+
+        Args:
+            number (str): Número del vuelo.
+
+        Returns:
+            Flight: El vuelo eliminado.
+
+        Raises:
+            ValueError: Si el número no es válido o el vuelo no está registrado.
+        """
+        flight = self.get_flight(number)
+        flight.remove_observer(self.__on_flight_changed)
+
+        aircraft = flight.get_aircraft()
+        _discard(self.__by_registration, aircraft.get_registration(), number)
+        if isinstance(aircraft, Boeing):
+            _discard(self.__by_airline, aircraft.get_airline(), number)
+        if isinstance(aircraft, Airbus):
+            _discard(self.__by_variant, aircraft.get_variant(), number)
+
+        with self.__lock:
+            free = self.__free.pop(number)
+            del self.__free_index[bisect_left(self.__free_index, (free, number))]
+        return self.__flights.pop(number)
+
+    def get_flight(self, number):
+        """
+        Devuelve un vuelo por su número.
+
+        Args:
+            number (str): Número del vuelo (ej. 'BA117').
+
+        Returns:
+            Flight: El vuelo.
+
+        Raises:
+            ValueError: Si el número no es válido (ver validate_flight_number)
+                        o el vuelo no está registrado.
+        """
+        validate_flight_number(number)
+        if number not in self.__flights:
+            raise ValueError(f"El vuelo {number} no está registrado.")
+        return self.__flights[number]
+
+    def flights_by_registration(self, registration):
+        """
+        Devuelve los vuelos operados por una aeronave concreta.
+
+        Args:
+            registration (str): Matrícula de la aeronave.
+
+        Returns:
+            list: Vuelos de esa aeronave, ordenados por número.
+        """
+        return self.__lookup(self.__by_registration, registration)
+
+    def flights_by_airline(self, airline):
+        """
+        Devuelve los vuelos operados con un Boeing de una aerolínea.
+
+        Args:
+            airline (str): Aerolínea (ver Boeing.get_airline).
+
+        Returns:
+            list: Vuelos de esa aerolínea, ordenados por número.
+        """
+        return self.__lookup(self.__by_airline, airline)
+
+    def flights_by_variant(self, variant):
+        """
+        Devuelve los vuelos operados con una variante de Airbus.
+
+        Args:
+            variant (str): Variante del Airbus (ver Airbus.get_variant).
+
+        Returns:
+            list: Vuelos con esa variante, ordenados por número.
+        """
+        return self.__lookup(self.__by_variant, variant)
+
+    def flights_with_free_seats(self, min_free):
+        """
+        Devuelve los vuelos con al menos un número de asientos libres, sin
+        consultar cada vuelo: se busca en el índice ordenado con bisect.
+
+        Args:
+            min_free (int): Número mínimo de asientos libres.
+
+        Returns:
+            list: Vuelos que cumplen la condición, de menos a más asientos libres.
+        """
+        with self.__lock:
+            start = bisect_left(self.__free_index, (min_free, ""))
+            numbers = [number for _, number in self.__free_index[start:]]
+        return [self.__flights[number] for number in numbers]
+
+    def total_free_seats(self):
+        """
+        Suma los asientos libres de toda la flota.
+
+        Returns:
+            int: Número total de asientos libres.
+        """
+        with self.__lock:
+            return sum(self.__free.values())
+
+    def import_manifest(self, source, fmt="csv", batch_size=DEFAULT_BATCH_SIZE, report=None):
+        """
+        Importa un manifiesto con reservas de varios vuelos (ver Manifest.py).
+        Cada fila va al vuelo de su columna 'flight'; las filas se asignan por
+        lotes de como mucho batch_size entre todos los vuelos, así que un
+        manifiesto de millones de filas se importa con memoria acotada. Las
+        filas sin vuelo, de vuelos no registrados o que no se pueden asignar
+        se anotan en el informe sin detener la importación.
+
+        Args:
+            source (str | file): Ruta del fichero o flujo abierto (texto o binario).
+            fmt (str): Formato del manifiesto ('csv' o 'jsonl').
+            batch_size (int): Filas pendientes que provocan una asignación.
+            report (ManifestReport): Informe donde anotar los resultados
+                                     (por defecto, uno nuevo).
+
+        Returns:
+            ManifestReport: Filas importadas y filas rechazadas con su línea.
+
+        Raises:
+            ValueError: Si el formato no es válido, batch_size < 1 o a la
+                        cabecera CSV le faltan columnas.
+        """
+        def resolve(number):
+            if number is None:
+                raise ValueError("La fila no indica el vuelo.")
+            return self.get_flight(number)
+
+        if report is None:
+            report = ManifestReport()
+        return import_manifest(read_manifest(source, report, fmt), resolve, report, batch_size)
+
+    def export_manifest(self, sink, fmt="csv", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Exporta el manifiesto de todos los vuelos en un único flujo.
+
+        Args:
+            sink (str | file): Ruta del fichero o destino con método write().
+            fmt (str): Formato de salida ('csv' o 'jsonl').
+            batch_size (int): Número de filas por escritura.
+
+        Returns:
+            int: Número de filas escritas.
+
+        Raises:
+            ValueError: Si el formato no es válido o batch_size < 1.
+        """
+        rows = chain.from_iterable(flight.iter_manifest() for flight in self.__flights.values())
+        return write_manifest(rows, sink, fmt, batch_size)
+
+    def __lookup(self, index, key):
+        """
+        Resuelve los números de vuelo de un índice secundario.
+
+        Args:
+            index (dict): Índice {clave: set de números de vuelo}.
+            key (str): Clave buscada.
+
+        Returns:
+            list: Vuelos asociados a la clave, ordenados por número.
+        """
+        return [self.__flights[number] for number in sorted(index.get(key, ()))]
+
+    def __on_flight_changed(self, flight):
+        """
+        Observador de los vuelos: mueve el vuelo dentro del índice de asientos
+        libres cuando cambia su ocupación. Puede llamarse desde varios hilos a
+        la vez: bajo el cerrojo se quita la entrada por el valor registrado y
+        se lee el valor actual del vuelo, así que el último aviso deja siempre
+        el índice al día aunque los avisos lleguen desordenados.
+
+        Args:
+            flight (Flight): El vuelo que ha cambiado.
+        """
+        number = flight.get_number()
+        with self.__lock:
+            old = self.__free.get(number)
+            if old is None:
+                return  # el vuelo aún no está en el índice o ya se eliminó
+            new = flight.num_available_seats()
+            if old == new:
+                return
+            del self.__free_index[bisect_left(self.__free_index, (old, number))]
+            insort(self.__free_index, (new, number))
+            self.__free[number] = new
+
+
+def _discard(index, key, number):
+    """
+    Quita un número de vuelo de un índice secundario, borrando la clave si queda vacía.
+
+    Args:
+        index (dict): Índice {clave: set de números de vuelo}.
+        key (str): Clave del índice.
+        number (str): Número de vuelo a quitar.
+    """
+    numbers = index[key]
+    numbers.discard(number)
+    if not numbers:
+        del index[key]
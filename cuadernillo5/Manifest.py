@@ -0,0 +1,332 @@
+# ============================================================================
+# Fichero: Manifest.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Importación y exportación por lotes de manifiestos de pasajeros
+# ============================================================================
+
+"""
+Módulo para leer y escribir manifiestos de pasajeros (una fila por reserva)
+sin cargar el fichero entero en memoria. Las filas se leen en streaming con
+csv o json, se agrupan en lotes de tamaño fijo y cada lote se asigna a su
+vuelo con una sola validación (ver Flight.allocate_rows). Las filas
+incorrectas se anotan en un ManifestReport y la importación continúa.
+
+Formatos:
+    'csv'   -> cabecera con las columnas de MANIFEST_FIELDS ('flight' es
+               opcional al importar en un único vuelo).
+    'jsonl' -> un objeto JSON por línea con esas mismas claves.
+
+Ejemplo (csv):
+    flight,seat,name,surname,id_card
+    BA758,12C,Jack,Shephard,85994003S
+
+Clases:
+    ManifestReport
+
+Funciones:
+    read_manifest
+    import_manifest
+    format_manifest
+    write_manifest
+"""
+
+import csv
+import io
+import json
+import os
+from itertools import chain
+from operator import itemgetter
+
+from BoardingCards import DEFAULT_BATCH_SIZE, is_binary, write_lines
+
+MANIFEST_FORMATS = ("csv", "jsonl")
+
+MANIFEST_FIELDS = ("flight", "seat", "name", "surname", "id_card")
+
+# Errores que se guardan con su detalle; a partir de ahí solo se cuentan
+DEFAULT_MAX_ERRORS = 1000
+
+
+class ManifestReport:
+    """
+    Resultado de una importación de manifiesto.
+
+    Atributos:
+        __imported (int): Filas asignadas a su asiento.
+        __num_errors (int): Filas rechazadas.
+        __errors (list): Pares (línea, mensaje) de las primeras filas rechazadas.
+        __max_errors (int): Número máximo de errores que se guardan con detalle.
+    """
+
+    def __init__(self, max_errors=DEFAULT_MAX_ERRORS):
+        """
+        Inicializa un informe vacío.
+
+        Args:
+            max_errors (int): Errores que se guardan con su detalle; el resto
+                              solo se cuentan, para que un fichero muy malo no
+                              llene la memoria.
+        """
+        self.__imported = 0
+        self.__num_errors = 0
+        self.__errors = []
+        self.__max_errors = max_errors
+
+    def add_imported(self, count):
+        """
+        Suma filas asignadas.
+
+        Args:
+            count (int): Número de filas asignadas.
+        """
+        self.__imported += count
+
+    def add_error(self, line, message):
+        """
+        Anota una fila rechazada.
+
+        Args:
+            line (int): Número de línea de la fila en el fichero.
+            message (str): Motivo del rechazo.
+        """
+        self.__num_errors += 1
+        if len(self.__errors) < self.__max_errors:
+            self.__errors.append((line, message))
+
+    def get_imported(self):
+        """
+        Devuelve el número de filas asignadas.
+
+        Returns:
+            int: Filas asignadas.
+        """
+        return self.__imported
+
+    def num_errors(self):
+        """
+        Devuelve el número de filas rechazadas (incluidas las no guardadas).
+
+        Returns:
+            int: Filas rechazadas.
+        """
+        return self.__num_errors
+
+    def get_errors(self):
+        """
+        Devuelve el detalle de las filas rechazadas. Las filas mal formadas se
+        anotan al leerlas y las que no se pueden asignar al procesar su lote,
+        así que las líneas no salen necesariamente en orden.
+
+        Returns:
+            list: Pares (línea, mensaje), como mucho max_errors.
+        """
+        return list(self.__errors)
+
+
+def read_manifest(source, report, fmt="csv"):
+    """
+    Generador que lee un manifiesto fila a fila. Las filas incompletas o mal
+    formadas se anotan en report y no se devuelven.
+
+    Args:
+        source (str | file): Ruta del fichero o flujo abierto (texto o binario).
+        report (ManifestReport): Informe donde se anotan las filas rechazadas.
+        fmt (str): Formato del manifiesto ('csv' o 'jsonl').
+
+    Yields:
+        tuple: (línea, vuelo o None, asiento, (nombre, apellido, id_card)).
+
+    Raises:
+        ValueError: Si el formato no es válido o a la cabecera CSV le faltan columnas.
+    """
+    if fmt not in MANIFEST_FORMATS:
+        raise ValueError(f"Formato de manifiesto '{fmt}' no válido (opciones: {', '.join(MANIFEST_FORMATS)}).")
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8", newline="") as stream:
+            yield from read_manifest(stream, report, fmt)
+        return
+    if is_binary(source):
+        text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+        try:
+            yield from read_manifest(text, report, fmt)
+        finally:
+            text.detach()  # el flujo recibido sigue abierto
+        return
+
+    if fmt == "csv":
+        # csv.reader con las columnas por posición: evita un dict por fila
+        reader = csv.reader(source)
+        header = next(reader, [])
+        missing = [field for field in MANIFEST_FIELDS[1:] if field not in header]
+        if missing:
+            raise ValueError(f"Faltan columnas en la cabecera del manifiesto: {', '.join(missing)}.")
+        select = itemgetter(*(header.index(field) for field in MANIFEST_FIELDS[1:]))
+        flight_col = header.index("flight") if "flight" in header else None
+        for fields in reader:
+            if len(fields) != len(header):
+                if fields:
+                    report.add_error(reader.line_num, f"La fila tiene {len(fields)} columnas "
+                                                      f"en lugar de {len(header)}.")
+                continue
+            row = _parse_record(None if flight_col is None else fields[flight_col],
+                                select(fields), reader.line_num, report)
+            if row is not None:
+                yield row
+    else:
+        for line, text in enumerate(source, 1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as error:
+                report.add_error(line, f"JSON no válido: {error}.")
+                continue
+            if not isinstance(record, dict):
+                report.add_error(line, "La línea no es un objeto JSON.")
+                continue
+            row = _parse_record(record.get("flight"), tuple(map(record.get, MANIFEST_FIELDS[1:])),
+                                line, report)
+            if row is not None:
+                yield row
+
+
+def import_manifest(rows, resolve, report, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Asigna las filas de un manifiesto a sus vuelos por lotes. Las filas se
+    acumulan por vuelo y, cuando entre todos los vuelos hay batch_size filas
+    pendientes, se asignan todas; así la memoria no depende del tamaño del
+    fichero ni del número de vuelos.
+
+    Args:
+        rows (iterable): Filas de read_manifest().
+        resolve (callable): Función número de vuelo (o None) -> Flight; lanza
+                            ValueError si la fila no corresponde a ningún vuelo.
+        report (ManifestReport): Informe donde se anotan los resultados.
+        batch_size (int): Filas pendientes que provocan una asignación.
+
+    Returns:
+        ManifestReport: El mismo informe recibido.
+
+    Raises:
+        ValueError: Si batch_size < 1.
+    """
+    if batch_size < 1:
+        raise ValueError(f"El tamaño de lote (batch_size={batch_size}) debe ser al menos 1.")
+
+    pending = {}
+    resolved = {}
+    count = 0
+    for line, number, seat, passenger in rows:
+        flight = resolved.get(number)
+        if flight is None:
+            try:
+                flight = resolved[number] = resolve(number)
+            except ValueError as error:
+                report.add_error(line, str(error))
+                continue
+        pending.setdefault(flight, []).append((line, seat, passenger))
+        count += 1
+        if count >= batch_size:
+            _flush(pending, report)
+            count = 0
+    _flush(pending, report)
+    return report
+
+
+def format_manifest(rows, fmt="csv"):
+    """
+    Generador que da formato a las filas de un manifiesto.
+
+    Args:
+        rows (iterable): Tuplas (vuelo, asiento, nombre, apellido, id_card).
+        fmt (str): Formato de salida ('csv' o 'jsonl').
+
+    Yields:
+        str: El texto de cada fila, terminado en salto de línea.
+
+    Raises:
+        ValueError: Si el formato no es válido.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    elif fmt == "jsonl":
+        for row in rows:
+            yield json.dumps(dict(zip(MANIFEST_FIELDS, row)), ensure_ascii=False) + "\n"
+    else:
+        raise ValueError(f"Formato de manifiesto '{fmt}' no válido (opciones: {', '.join(MANIFEST_FORMATS)}).")
+
+
+def write_manifest(rows, sink, fmt="csv", batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Escribe un manifiesto en un destino, una escritura por lote de filas.
+
+    Args:
+        rows (iterable): Tuplas (vuelo, asiento, nombre, apellido, id_card).
+        sink (str | file): Ruta del fichero o destino con método write()
+                           (texto o binario); en 'csv' se escribe la cabecera.
+        fmt (str): Formato de salida ('csv' o 'jsonl').
+        batch_size (int): Número de filas por escritura.
+
+    Returns:
+        int: Número de filas escritas.
+
+    Raises:
+        ValueError: Si el formato no es válido o batch_size < 1.
+    """
+    if fmt not in MANIFEST_FORMATS:
+        raise ValueError(f"Formato de manifiesto '{fmt}' no válido (opciones: {', '.join(MANIFEST_FORMATS)}).")
+    if batch_size < 1:
+        raise ValueError(f"El tamaño de lote (batch_size={batch_size}) debe ser al menos 1.")
+
+    if isinstance(sink, (str, os.PathLike)):
+        with open(sink, "w", encoding="utf-8", newline="") as stream:
+            return write_manifest(rows, stream, fmt, batch_size)
+
+    header = [",".join(MANIFEST_FIELDS) + "\n"] if fmt == "csv" else []
+    return write_lines(chain(header, format_manifest(rows, fmt)), sink, batch_size) - len(header)
+
+
+def _parse_record(number, values, line, report):
+    """
+    Comprueba que una fila leída tenga asiento y los tres datos del pasajero.
+
+    Args:
+        number (str): Valor de la columna 'flight' (None si no la hay).
+        values (tuple): Valores de seat, name, surname e id_card.
+        line (int): Número de línea de la fila.
+        report (ManifestReport): Informe donde se anota si se rechaza.
+
+    Returns:
+        tuple: (línea, vuelo o None, asiento, pasajero), o None si se rechaza.
+    """
+    try:
+        seat, name, surname, id_card = (value.strip() for value in values)
+    except AttributeError:
+        seat = name = surname = id_card = None  # algún valor no es texto
+    if not (seat and name and surname and id_card):
+        for field, value in zip(MANIFEST_FIELDS[1:], values):
+            if not isinstance(value, str) or not value.strip():
+                report.add_error(line, f"Falta el campo '{field}' o está vacío.")
+                return None
+    number = number.strip() if isinstance(number, str) else None
+    return (line, number or None, seat, (name, surname, id_card))
+
+
+def _flush(pending, report):
+    """
+    Asigna las filas pendientes de cada vuelo y vacía los lotes.
+
+    Args:
+        pending (dict): Filas pendientes {Flight: [(línea, asiento, pasajero), ...]}.
+        report (ManifestReport): Informe donde se anotan los resultados.
+    """
+    for flight, rows in pending.items():
+        flight.allocate_rows(rows, report)
+    pending.clear()
@@ -0,0 +1,194 @@
+# ============================================================================
+# Fichero: Metrics.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Métricas opcionales (contadores e histogramas) de Flight
+# ============================================================================
+
+"""
+Módulo de instrumentación de Flight. Un sink de métricas recibe dos tipos de
+medidas:
+
+    increment(name, value)   contadores: llamadas y errores por causa
+    observe(name, seconds)   latencias, que se acumulan en histogramas
+
+Flight.set_metrics(sink) envuelve con instrument() los métodos calientes
+(ver _INSTRUMENTED en Flight.py) solo en esa instancia; sin sink los métodos
+son los de la clase y la instrumentación no cuesta nada. Para enviar las
+métricas a otro sistema (StatsD, Prometheus...) basta con heredar de
+MetricsSink.
+
+Nombres de las métricas, para cada método instrumentado <m>:
+
+    flight.<m>                   histograma de latencias (segundos)
+    flight.<m>.calls             llamadas
+    flight.<m>.errors.<causa>    errores por causa (SeatError.reason, o
+                                 'invalid' para otros ValueError)
+
+Clases:
+    MetricsSink
+    InMemoryMetrics
+
+Funciones:
+    instrument
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Límites superiores (segundos) de las cubetas de los histogramas: 1-2-5 por década
+LATENCY_BUCKETS = tuple(base * 10 ** exponent for exponent in range(-7, 0) for base in (1, 2, 5)) + (1.0,)
+
+
+class MetricsSink:
+    """
+    Interfaz de los destinos de métricas.
+    """
+
+    def increment(self, name, value=1):
+        """
+        Suma value a un contador.
+
+        Args:
+            name (str): Nombre del contador.
+            value (int): Cantidad a sumar.
+        """
+        raise NotImplementedError
+
+    def observe(self, name, seconds):
+        """
+        Registra una latencia en un histograma.
+
+        Args:
+            name (str): Nombre del histograma.
+            seconds (float): Duración medida.
+        """
+        raise NotImplementedError
+
+
+class InMemoryMetrics(MetricsSink):
+    """
+    Sink que guarda las métricas en memoria. Es seguro entre hilos.
+
+    Atributos:
+        __counters (dict): Valor de cada contador {nombre: n}.
+        __histograms (dict): {nombre: [cuentas por cubeta (+1 por encima de la última), suma]}.
+        __lock (Lock): Protege ambos diccionarios.
+    """
+
+    def __init__(self):
+        self.__counters = {}
+        self.__histograms = {}
+        self.__lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self.__lock:
+            histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+
+    def get_counter(self, name):
+        """
+        Devuelve el valor de un contador.
+
+        Args:
+            name (str): Nombre del contador.
+
+        Returns:
+            int: Valor (0 si nunca se incrementó).
+        """
+        return self.__counters.get(name, 0)
+
+    def get_histogram(self, name):
+        """
+        Devuelve un histograma de latencias.
+
+        Args:
+            name (str): Nombre del histograma.
+
+        Returns:
+            dict: {'count': n, 'sum': segundos, 'buckets': [(límite, n), ...]};
+                  el último límite es float('inf').
+        """
+        with self.__lock:
+            counts, total = self.__histograms.get(name, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0])
+            counts = list(counts)
+        return {
+            "count": sum(counts),
+            "sum": total,
+            "buckets": list(zip(LATENCY_BUCKETS + (float("inf"),), counts)),
+        }
+
+    def percentile(self, name, fraction):
+        """
+        Estima un percentil de latencia con el límite de su cubeta.
+
+        Args:
+            name (str): Nombre del histograma.
+            fraction (float): Percentil entre 0 y 1 (p.e. 0.99).
+
+        Returns:
+            float: Límite superior de la cubeta del percentil (None sin medidas).
+        """
+        histogram = self.get_histogram(name)
+        target = fraction * histogram["count"]
+        seen = 0
+        for bound, count in histogram["buckets"]:
+            seen += count
+            if count and seen >= target:
+                return bound
+        return None
+
+    def snapshot(self):
+        """
+        Devuelve una copia de todas las métricas.
+
+        Returns:
+            dict: {'counters': {...}, 'histograms': {nombre: get_histogram(nombre)}}.
+        """
+        with self.__lock:
+            counters = dict(self.__counters)
+            names = list(self.__histograms)
+        return {"counters": counters, "histograms": {name: self.get_histogram(name) for name in names}}
+
+
+def instrument(function, sink, name):
+    """
+    Envuelve una función para contar sus llamadas, sus errores por causa y
+    medir su latencia.
+
+    Args:
+        function (callable): Función (o método ya ligado) a medir.
+        sink (MetricsSink): Destino de las métricas.
+        name (str): Prefijo de las métricas (p.e. 'flight.allocate_passenger').
+
+    Returns:
+        callable: La función instrumentada.
+    """
+    increment = sink.increment
+    observe = sink.observe
+    clock = time.perf_counter
+    calls = f"{name}.calls"
+    errors = f"{name}.errors."
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        increment(calls)
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        except ValueError as error:
+            increment(errors + getattr(error, "reason", "invalid"))
+            raise
+        finally:
+            observe(name, clock() - start)
+
+    return wrapper
@@ -6,9 +6,12 @@
 
 """
 Módulo que define la clase Passenger, utilizada para representar la información
-básica de un pasajero: nombre, apellido y documento de identidad.
+básica de un pasajero: nombre, apellido y documento de identidad, y la clase
+PassengerTable, que guarda muchos pasajeros en columnas compactas.
 """
 
+import sys
+
 class Passenger:
     """
     Representa a un pasajero con nombre, apellido e ID.
@@ -25,6 +28,9 @@ class Passenger:
         id_card(): Devuelve el documento de identidad del pasajero.
     """
 
+    # Sin __dict__ por instancia: cada pasajero ocupa solo sus tres referencias
+    __slots__ = ("_name", "_surname", "_id_card")
+
     def __init__(self, name, surname, id_card):
         """
         Inicializa un objeto Passenger con nombre, apellido e ID.
@@ -83,3 +89,95 @@ class Passenger:
             tuple: (nombre, apellido, id_card).
         """
         return (self._name, self._surname, self._id_card)
+
+
+class PassengerTable:
+    """
+    Tabla de pasajeros en columnas (una lista por campo) a la que se accede
+    por un número entero (handle). Los nombres y apellidos se internan, así que
+    los repetidos en miles de reservas comparten una única cadena.
+
+    Atributos:
+        __names (list): Nombre de cada handle (None si el hueco está libre).
+        __surnames (list): Apellido de cada handle.
+        __id_cards (list): Documento de identidad de cada handle.
+        __free (list): Handles liberados que se reutilizan en add().
+    """
+
+    __slots__ = ("__names", "__surnames", "__id_cards", "__free")
+
+    def __init__(self):
+        """
+        Inicializa una tabla vacía.
+        """
+        self.__names = []
+        self.__surnames = []
+        self.__id_cards = []
+        self.__free = []
+
+    def __len__(self):
+        return len(self.__names) - len(self.__free)
+
+    def add(self, passenger):
+        """
+        Añade un pasajero a la tabla.
+
+        Args:
+            passenger (tuple): Datos del pasajero (nombre, apellido, id_card).
+
+        Returns:
+            int: Handle con el que se recupera el pasajero.
+        """
+        name, surname, id_card = passenger
+        name = sys.intern(name)
+        surname = sys.intern(surname)
+        if self.__free:
+            handle = self.__free.pop()
+            self.__names[handle] = name
+            self.__surnames[handle] = surname
+            self.__id_cards[handle] = id_card
+        else:
+            handle = len(self.__names)
+            self.__names.append(name)
+            self.__surnames.append(surname)
+            self.__id_cards.append(id_card)
+        return handle
+
+    def get(self, handle):
+        """
+        Devuelve los datos de un pasajero.
+
+        Args:
+            handle (int): Handle devuelto por add().
+
+        Returns:
+            tuple: (nombre, apellido, id_card).
+        """
+        return (self.__names[handle], self.__surnames[handle], self.__id_cards[handle])
+
+    def id_card(self, handle):
+        """
+        Devuelve el documento de identidad de un pasajero.
+
+        Args:
+            handle (int): Handle devuelto por add().
+
+        Returns:
+            str: Documento de identidad del pasajero.
+        """
+        return self.__id_cards[handle]
+
+    def remove(self, handle):
+        """
+        Elimina un pasajero de la tabla; su handle se reutilizará.
+
+        Args:
+            handle (int): Handle devuelto por add().
+
+        Returns:
+            tuple: Datos del pasajero eliminado.
+        """
+        passenger = self.get(handle)
+        self.__names[handle] = self.__surnames[handle] = self.__id_cards[handle] = None
+        self.__free.append(handle)
+        return passenger
@@ -0,0 +1,261 @@
+# ============================================================================
+# Fichero: SQLiteSeatStore.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Almacén persistente de asientos en SQLite para Flight
+# ============================================================================
+
+"""
+Módulo que define un motor de asientos persistente sobre sqlite3 (biblioteca
+estándar). Los asientos viven en la base de datos, no en memoria, y varios
+procesos pueden compartir el mismo fichero: las restricciones UNIQUE impiden
+que dos reservas ocupen el mismo asiento o que un pasajero tenga dos asientos
+en el mismo vuelo.
+
+Esquema:
+    flights    (number PK, num_rows, seat_letters)
+    passengers (id_card PK, name, surname)
+    seats      (flight, seat_index, id_card)
+               UNIQUE (flight, seat_index)  -> índice por (vuelo, asiento)
+               UNIQUE (flight, id_card)
+               INDEX  (id_card)             -> búsquedas por pasajero
+
+Uso:
+    store = SQLiteSeatStore('reservas.db')
+    flight = Flight('BA117', aircraft, engine=store.seat_map('BA117'))
+
+Clases:
+    SQLiteSeatStore
+    SQLiteSeatMap
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+from SeatMap import SeatMap
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    number       TEXT PRIMARY KEY,
+    num_rows     INTEGER NOT NULL,
+    seat_letters TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passengers (
+    id_card TEXT PRIMARY KEY,
+    name    TEXT NOT NULL,
+    surname TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seats (
+    flight     TEXT NOT NULL REFERENCES flights(number),
+    seat_index INTEGER NOT NULL,
+    id_card    TEXT NOT NULL REFERENCES passengers(id_card),
+    UNIQUE (flight, seat_index),
+    UNIQUE (flight, id_card)
+);
+CREATE INDEX IF NOT EXISTS seats_by_passenger ON seats(id_card);
+"""
+
+_UPSERT_PASSENGER = (
+    "INSERT INTO passengers (id_card, name, surname) VALUES (?, ?, ?) "
+    "ON CONFLICT (id_card) DO UPDATE SET name = excluded.name, surname = excluded.surname"
+)
+_INSERT_SEAT = "INSERT INTO seats (flight, seat_index, id_card) VALUES (?, ?, ?)"
+
+
+class SQLiteSeatStore:
+    """
+    Base de datos SQLite de asientos con una conexión reutilizable.
+
+    Atributos:
+        __connection (sqlite3.Connection): Conexión abierta en modo autocommit;
+                                           las transacciones se abren a mano.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        """
+        Abre (o crea) la base de datos y su esquema.
+
+        Args:
+            path (str): Ruta del fichero de la base de datos (':memory:' para pruebas).
+            timeout (float): Segundos que se espera si otro proceso tiene el cerrojo.
+        """
+        self.__connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                            check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        self.__connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_connection(self):
+        """
+        Devuelve la conexión compartida.
+
+        Returns:
+            sqlite3.Connection: La conexión a la base de datos.
+        """
+        return self.__connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Abre una transacción de escritura (BEGIN IMMEDIATE) que se confirma
+        al salir del bloque o se deshace si hay una excepción.
+
+        Yields:
+            sqlite3.Connection: La conexión dentro de la transacción.
+        """
+        self.__connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.__connection
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+        self.__connection.execute("COMMIT")
+
+    def seat_map(self, number):
+        """
+        Devuelve la factoría de motor para usar con Flight(..., engine=...).
+
+        Args:
+            number (str): Número del vuelo cuyos asientos se guardan.
+
+        Returns:
+            callable: Factoría (num_rows, seat_letters) -> SQLiteSeatMap.
+        """
+        return lambda num_rows, seat_letters: SQLiteSeatMap(self, number, num_rows, seat_letters)
+
+    def close(self):
+        """
+        Cierra la conexión.
+        """
+        self.__connection.close()
+
+
+class SQLiteSeatMap(SeatMap):
+    """
+    Motor de asientos de un vuelo guardado en un SQLiteSeatStore. Es un
+    motor indexado (indexed): otras conexiones pueden cambiar los asientos,
+    así que Flight lee de la base de datos la ocupación y los asientos de
+    cada pasajero en vez de llevar sus propios contadores.
+
+    Atributos:
+        _store (SQLiteSeatStore): Base de datos compartida.
+        _number (str): Número del vuelo.
+    """
+
+    indexed = True
+
+    def __init__(self, store, number, num_rows, seat_letters):
+        """
+        Registra el vuelo en la base de datos si no existía.
+
+        Raises:
+            ValueError: Si el vuelo ya existe con otras dimensiones.
+        """
+        super().__init__(num_rows, seat_letters)
+        self._store = store
+        self._number = number
+        connection = store.get_connection()
+        connection.execute("INSERT OR IGNORE INTO flights (number, num_rows, seat_letters) VALUES (?, ?, ?)",
+                           (number, num_rows, seat_letters))
+        stored = connection.execute("SELECT num_rows, seat_letters FROM flights WHERE number = ?",
+                                    (number,)).fetchone()
+        if tuple(stored) != (num_rows, seat_letters):
+            raise ValueError(f"El vuelo {number} ya existe en la base de datos con otra distribución "
+                             f"({stored[0]} filas, asientos '{stored[1]}').")
+
+    def has_bookings(self):
+        row = self._store.get_connection().execute(
+            "SELECT EXISTS (SELECT 1 FROM seats WHERE flight = ?)", (self._number,)).fetchone()
+        return bool(row[0])
+
+    def get(self, index):
+        return self._store.get_connection().execute(
+            "SELECT p.name, p.surname, p.id_card FROM seats s JOIN passengers p USING (id_card) "
+            "WHERE s.flight = ? AND s.seat_index = ?", (self._number, index)).fetchone()
+
+    def put(self, index, passenger):
+        self.put_many([(index, passenger)])
+
+    def put_many(self, bookings):
+        bookings = list(bookings)
+        try:
+            with self._store.transaction() as connection:
+                connection.executemany(_UPSERT_PASSENGER,
+                                       [(p[2], p[0], p[1]) for _, p in bookings])
+                connection.executemany(_INSERT_SEAT,
+                                       [(self._number, index, p[2]) for index, p in bookings])
+        except sqlite3.IntegrityError as error:
+            # Otro proceso se adelantó: la restricción UNIQUE rechaza la reserva
+            if "id_card" in str(error):
+                raise ValueError(f"Algún pasajero del lote ya tiene asiento en el vuelo {self._number} "
+                                 f"(registrado por otro proceso).") from error
+            raise ValueError(f"Algún asiento del lote ya está ocupado en el vuelo {self._number} "
+                             f"(registrado por otro proceso).") from error
+
+    def remove(self, index):
+        with self._store.transaction() as connection:
+            passenger = connection.execute(
+                "DELETE FROM seats WHERE flight = ? AND seat_index = ? RETURNING id_card",
+                (self._number, index)).fetchone()
+            if passenger is None:
+                return None
+            return connection.execute("SELECT name, surname, id_card FROM passengers WHERE id_card = ?",
+                                      passenger).fetchone()
+
+    def remove_many(self, indices):
+        # Un lote de cancelaciones es una única transacción
+        passengers = []
+        with self._store.transaction() as connection:
+            for index in indices:
+                row = connection.execute(
+                    "DELETE FROM seats WHERE flight = ? AND seat_index = ? RETURNING id_card",
+                    (self._number, index)).fetchone()
+                if row is None:
+                    raise ValueError(f"Algún asiento del lote ya estaba libre en el vuelo {self._number} "
+                                     f"(liberado por otro proceso).")
+                passengers.append(connection.execute(
+                    "SELECT name, surname, id_card FROM passengers WHERE id_card = ?", row).fetchone())
+        return passengers
+
+    def move(self, from_index, to_index):
+        # Un único UPDATE: el pasajero no puede quedarse sin asiento a medias
+        try:
+            with self._store.transaction() as connection:
+                row = connection.execute(
+                    "UPDATE seats SET seat_index = ? WHERE flight = ? AND seat_index = ? RETURNING id_card",
+                    (to_index, self._number, from_index)).fetchone()
+                if row is None:
+                    return None
+                return connection.execute("SELECT name, surname, id_card FROM passengers WHERE id_card = ?",
+                                          row).fetchone()
+        except sqlite3.IntegrityError as error:
+            raise ValueError(f"El asiento de destino ya está ocupado en el vuelo {self._number} "
+                             f"(registrado por otro proceso).") from error
+
+    def find(self, id_card):
+        row = self._store.get_connection().execute(
+            "SELECT seat_index FROM seats WHERE flight = ? AND id_card = ?", (self._number, id_card)).fetchone()
+        return None if row is None else row[0]
+
+    def count(self, row=None, column=None):
+        sql = "SELECT COUNT(*) FROM seats WHERE flight = ?"
+        params = [self._number]
+        if row is not None:
+            sql += " AND seat_index BETWEEN ? AND ?"
+            params += [(row - 1) * self._width, row * self._width - 1]
+        if column is not None:
+            sql += " AND seat_index % ? = ?"
+            params += [self._width, column]
+        return self._store.get_connection().execute(sql, params).fetchone()[0]
+
+    def items(self):
+        cursor = self._store.get_connection().execute(
+            "SELECT s.seat_index, p.name, p.surname, p.id_card FROM seats s JOIN passengers p USING (id_card) "
+            "WHERE s.flight = ? ORDER BY s.seat_index", (self._number,))
+        for index, name, surname, id_card in cursor:
+            yield index, (name, surname, id_card)
@@ -0,0 +1,121 @@
+# ============================================================================
+# Fichero: SeatGrid.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Plano compacto de asientos con caché de filas ya dibujadas
+# ============================================================================
+
+"""
+Módulo que define SeatGrid, el plano de asientos en forma de rejilla (filas x
+letras) que usa Flight.print_seating(). Cada fila se dibuja una vez y se
+guarda; el vuelo invalida solo la fila que cambia con cada reserva, así que
+volver a dibujar tras una reserva cuesta una fila. En las cabinas no
+uniformes (ver SeatLayout.register_template) los asientos bloqueados se
+marcan con '#' y los que no existen en su fila se dejan en blanco.
+
+Ejemplo (Airbus A319, 1A y 2D ocupados):
+
+       ABC DEF
+     1 X.. ...
+     2 ... X..
+
+Clases:
+    SeatGrid
+"""
+
+# Marcas de asiento libre, ocupado, bloqueado y sin asiento
+FREE = "."
+OCCUPIED = "X"
+BLOCKED = "#"
+MISSING = " "
+
+
+class SeatGrid:
+    """
+    Plano de asientos de un vuelo con caché por fila.
+
+    Atributos:
+        __layout (SeatLayout): Distribución de asientos de la aeronave.
+        __rows (list): Texto ya dibujado de cada fila (None si hay que dibujarla);
+                       la lista se crea en el primer render().
+        __text (str): Plano completo ya dibujado (None si alguna fila cambió).
+    """
+
+    def __init__(self, layout):
+        """
+        Inicializa el plano vacío de una distribución.
+
+        Args:
+            layout (SeatLayout): Distribución de asientos de la aeronave.
+        """
+        self.__layout = layout
+        self.__rows = None
+        self.__text = None
+
+    def invalidate(self, row):
+        """
+        Marca una fila para volver a dibujarla.
+
+        Args:
+            row (int): Número de fila (empezando en 1).
+        """
+        if self.__rows is not None:
+            self.__rows[row - 1] = None
+        self.__text = None
+
+    def render(self, get):
+        """
+        Devuelve el plano, dibujando solo las filas invalidadas.
+
+        Args:
+            get (callable): Función índice empaquetado -> pasajero o None
+                            (normalmente SeatMap.get del vuelo).
+
+        Returns:
+            str: El plano completo, con la cabecera y una línea por fila.
+        """
+        if self.__text is None:
+            if self.__rows is None:
+                self.__rows = [None] * self.__layout.get_num_rows()
+            rows = self.__rows
+            for row, text in enumerate(rows):
+                if text is None:
+                    rows[row] = self.__render_row(row, get)
+            header = " " * (self.__label_width() + 1) + " ".join(self.__layout.get_blocks())
+            self.__text = "\n".join([header, *rows]) + "\n"
+        return self.__text
+
+    def __label_width(self):
+        """
+        Devuelve el ancho de la columna con el número de fila.
+
+        Returns:
+            int: Cifras de la última fila.
+        """
+        return len(str(self.__layout.get_num_rows()))
+
+    def __render_row(self, row, get):
+        """
+        Dibuja una fila.
+
+        Args:
+            row (int): Fila (empezando en 0).
+            get (callable): Función índice empaquetado -> pasajero o None.
+
+        Returns:
+            str: El número de fila seguido de las marcas de cada bloque.
+        """
+        layout = self.__layout
+        unavailable = layout.get_unavailable()
+        blocked = layout.get_blocked()
+        blocks = []
+        col = row * layout.width()
+        for block in layout.get_blocks():
+            marks = []
+            for index in range(col, col + len(block)):
+                if index in unavailable:
+                    marks.append(BLOCKED if index in blocked else MISSING)
+                else:
+                    marks.append(FREE if get(index) is None else OCCUPIED)
+            blocks.append("".join(marks))
+            col += len(block)
+        return f"{row + 1:>{self.__label_width()}} " + " ".join(blocks)
@@ -0,0 +1,479 @@
+# ============================================================================
+# Fichero: SeatLayout.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Distribución inmutable de asientos de una aeronave y su parser
+# ============================================================================
+
+"""
+Módulo que define SeatLayout, la distribución de asientos (filas y letras)
+que comparte cada aeronave con sus vuelos. La distribución es inmutable y se
+cachea por dimensiones, de modo que todas las aeronaves del mismo tamaño
+comparten el mismo objeto y la misma caché de asientos ya analizados.
+
+Además hay un registro de plantillas por modelo (ej. 'Boeing 777'), que
+admite cabinas no uniformes: filas con menos letras que el resto, filas de
+salida de emergencia y asientos bloqueados. Los motores de asientos siguen
+usando el rectángulo completo (filas x letras); los asientos que no existen
+o están bloqueados simplemente no se pueden reservar.
+
+Clases:
+    SeatError
+    SeatLayout
+"""
+
+import string
+from functools import lru_cache
+from types import MappingProxyType
+
+# Reparto de los asientos de una fila en bloques separados por pasillos,
+# según el número de asientos por fila (ej. 9 -> 3-3-3 como en un Boeing 777).
+_SEAT_BLOCKS = {
+    1: (1,),
+    2: (2,),
+    3: (3,),
+    4: (2, 2),
+    5: (2, 3),
+    6: (3, 3),
+    7: (2, 3, 2),
+    8: (2, 4, 2),
+    9: (3, 3, 3),
+    10: (3, 4, 3),
+}
+
+class SeatError(ValueError):
+    """
+    Error de validación de un asiento o de una reserva. Es un ValueError, así
+    que se captura igual que el resto de errores de validación; además indica
+    la causa en 'reason' para poder contarla (ver Metrics.py).
+
+    Atributos:
+        reason (str): Causa del error: 'too_short', 'bad_letter', 'bad_row',
+                      'missing_seat', 'blocked', 'occupied', 'empty_seat',
+                      'already_booked', 'not_booked' o 'duplicate'.
+    """
+
+    def __init__(self, message, reason):
+        super().__init__(message)
+        self.reason = reason
+
+
+# Plantillas registradas por modelo de aeronave {modelo: SeatLayout}
+_TEMPLATES = {}
+
+
+class SeatLayout:
+    """
+    Distribución inmutable de los asientos de una aeronave.
+
+    Atributos:
+        _num_rows (int): Número de filas (la fila máxima).
+        _letters (str): Letras de asiento de cada fila (ej. 'ABCDEF').
+        _letter_set (frozenset): Conjunto de letras válidas.
+        _columns (MappingProxyType): Posición de cada letra {letra: columna}.
+        _blocks (tuple): Letras de cada bloque entre pasillos.
+        _parsed (dict): Caché de asientos ya analizados {asiento: índice}.
+        _model (str): Modelo de la plantilla (None si se creó por dimensiones).
+        _row_letters (MappingProxyType): Letras de las filas distintas al resto {fila: letras}.
+        _exit_rows (frozenset): Filas de salida de emergencia.
+        _blocked (frozenset): Índices de los asientos bloqueados.
+        _unavailable (frozenset): Índices que no se pueden reservar (bloqueados
+                                  o que no existen en su fila).
+        _row_capacity (tuple): Asientos reservables de cada fila (posición fila - 1).
+        _letter_capacity (MappingProxyType): Asientos reservables por letra.
+    """
+
+    __slots__ = ("_num_rows", "_letters", "_letter_set", "_columns", "_blocks", "_parsed",
+                 "_model", "_row_letters", "_exit_rows", "_blocked", "_unavailable",
+                 "_row_capacity", "_letter_capacity")
+
+    def __init__(self, num_rows, letters, model=None, row_letters=None, exit_rows=(), blocked=()):
+        """
+        Inicializa la distribución. Normalmente se obtiene con for_dimensions()
+        o, para cabinas no uniformes, con register_template().
+
+        Args:
+            num_rows (int): Número de filas.
+            letters (str): Letras de asiento de la fila más ancha.
+            model (str): Modelo de la plantilla, si la hay.
+            row_letters (dict): Letras de las filas que no tienen todas {fila: letras}.
+            exit_rows (iterable): Filas de salida de emergencia.
+            blocked (iterable): Asientos bloqueados (ej. '12C').
+
+        Raises:
+            ValueError: Si alguna fila, letra o asiento no existe en la distribución.
+        """
+        self._num_rows = num_rows
+        self._letters = letters
+        self._letter_set = frozenset(letters)
+        self._columns = MappingProxyType({letter: col for col, letter in enumerate(letters)})
+        self._blocks = _split_blocks(letters)
+        self._parsed = {}
+        self._model = model
+
+        row_letters = dict(row_letters or {})
+        width = len(letters)
+        missing = set()
+        for row, row_seats in row_letters.items():
+            if row < 1 or row > num_rows:
+                raise ValueError(f"La fila {row} no existe en este avión (máximo {num_rows}).")
+            if not set(row_seats) <= self._letter_set:
+                raise ValueError(f"Las letras '{row_seats}' de la fila {row} no son válidas para este avión.")
+            missing.update((row - 1) * width + col for col, letter in enumerate(letters)
+                           if letter not in row_seats)
+        self._row_letters = MappingProxyType(row_letters)
+
+        self._exit_rows = frozenset(exit_rows)
+        for row in self._exit_rows:
+            if row < 1 or row > num_rows:
+                raise ValueError(f"La fila {row} no existe en este avión (máximo {num_rows}).")
+
+        # Los asientos bloqueados se validan con el parser antes de excluirlos
+        self._blocked = frozenset()
+        self._unavailable = frozenset(missing)
+        self._blocked = frozenset(self.seat_index(seat) for seat in blocked)
+        self._unavailable = self._blocked | self._unavailable
+        self._parsed = {}
+
+        row_capacity = [width] * num_rows
+        letter_capacity = dict.fromkeys(letters, num_rows)
+        for index in self._unavailable:
+            row, col = divmod(index, width)
+            row_capacity[row] -= 1
+            letter_capacity[letters[col]] -= 1
+        self._row_capacity = tuple(row_capacity)
+        self._letter_capacity = MappingProxyType(letter_capacity)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def for_dimensions(num_rows, num_seats_per_row):
+        """
+        Devuelve la distribución compartida para unas dimensiones dadas.
+
+        Args:
+            num_rows (int): Número de filas.
+            num_seats_per_row (int): Número de asientos por fila.
+
+        Returns:
+            SeatLayout: La distribución (la misma instancia en cada llamada).
+        """
+        return SeatLayout(num_rows, string.ascii_uppercase[:num_seats_per_row])
+
+    @staticmethod
+    def register_template(model, num_rows, letters, row_letters=None, exit_rows=(), blocked=()):
+        """
+        Registra (o sustituye) la plantilla de asientos de un modelo. Las
+        aeronaves de ese modelo creadas después la comparten.
+
+        Args:
+            model (str): Modelo de la aeronave (ej. 'Airbus A321neo').
+            num_rows (int): Número de filas.
+            letters (str): Letras de asiento de la fila más ancha.
+            row_letters (dict): Letras de las filas que no tienen todas {fila: letras}.
+            exit_rows (iterable): Filas de salida de emergencia.
+            blocked (iterable): Asientos bloqueados (ej. '12C').
+
+        Returns:
+            SeatLayout: La plantilla registrada.
+
+        Raises:
+            ValueError: Si la plantilla no es válida.
+        """
+        if not model:
+            raise ValueError("El modelo de la plantilla (model) no puede estar vacío.")
+        layout = SeatLayout(num_rows, letters, model, row_letters, exit_rows, blocked)
+        _TEMPLATES[model] = layout
+        return layout
+
+    @staticmethod
+    def unregister_template(model):
+        """
+        Retira la plantilla registrada de un modelo. Las aeronaves que ya la
+        usan la conservan.
+
+        Args:
+            model (str): Modelo de la aeronave.
+
+        Returns:
+            SeatLayout: La plantilla retirada, o None si el modelo no tenía ninguna.
+        """
+        return _TEMPLATES.pop(model, None)
+
+    @staticmethod
+    def template(model):
+        """
+        Devuelve la plantilla registrada de un modelo.
+
+        Args:
+            model (str): Modelo de la aeronave.
+
+        Returns:
+            SeatLayout: La plantilla, o None si el modelo no tiene ninguna.
+        """
+        return _TEMPLATES.get(model)
+
+    def __reduce__(self):
+        # Al enviarse a otro proceso se reconstruye con la caché compartida
+        if self._model is None:
+            return (SeatLayout.for_dimensions, (self._num_rows, len(self._letters)))
+        blocked = tuple(self.seat_name(index) for index in sorted(self._blocked))
+        return (_restore_template, (self._model, self._num_rows, self._letters,
+                                    dict(self._row_letters), tuple(sorted(self._exit_rows)), blocked))
+
+    def get_model(self):
+        """
+        Devuelve el modelo de la plantilla.
+
+        Returns:
+            str: Modelo, o None si la distribución se creó por dimensiones.
+        """
+        return self._model
+
+    def get_num_rows(self):
+        """
+        Devuelve el número de filas de la distribución.
+
+        Returns:
+            int: Número de filas (la fila máxima válida).
+        """
+        return self._num_rows
+
+    def get_letters(self):
+        """
+        Devuelve las letras de asiento de cada fila.
+
+        Returns:
+            str: Letras de asiento de cada fila, en orden.
+        """
+        return self._letters
+
+    def get_letter_set(self):
+        """
+        Devuelve el conjunto de letras de asiento.
+
+        Returns:
+            frozenset: Conjunto de letras de asiento válidas.
+        """
+        return self._letter_set
+
+    def get_columns(self):
+        """
+        Devuelve la columna que ocupa cada letra dentro de la fila.
+
+        Returns:
+            MappingProxyType: Columna de cada letra de asiento (solo lectura).
+        """
+        return self._columns
+
+    def get_blocks(self):
+        """
+        Devuelve los bloques de asientos de una fila.
+
+        Returns:
+            tuple: Letras de cada bloque separado por pasillos (ej. ('ABC', 'DEF')).
+        """
+        return self._blocks
+
+    def get_row_letters(self, row):
+        """
+        Devuelve las letras de asiento que existen en una fila.
+
+        Args:
+            row (int): Número de fila (empezando en 1).
+
+        Returns:
+            str: Letras de la fila (todas, salvo en las filas no uniformes).
+        """
+        return self._row_letters.get(row, self._letters)
+
+    def get_exit_rows(self):
+        """
+        Devuelve las filas de salida de emergencia.
+
+        Returns:
+            frozenset: Números de fila.
+        """
+        return self._exit_rows
+
+    def get_blocked(self):
+        """
+        Devuelve los asientos bloqueados.
+
+        Returns:
+            frozenset: Índices empaquetados de los asientos bloqueados.
+        """
+        return self._blocked
+
+    def get_unavailable(self):
+        """
+        Devuelve los asientos que no se pueden reservar: los bloqueados y los
+        que no existen en su fila.
+
+        Returns:
+            frozenset: Índices empaquetados.
+        """
+        return self._unavailable
+
+    def row_capacity(self, row):
+        """
+        Devuelve el número de asientos reservables de una fila.
+
+        Args:
+            row (int): Número de fila (empezando en 1).
+
+        Returns:
+            int: Asientos reservables de la fila.
+        """
+        return self._row_capacity[row - 1]
+
+    def letter_capacity(self, letter):
+        """
+        Devuelve el número de asientos reservables con una letra.
+
+        Args:
+            letter (str): Letra de asiento.
+
+        Returns:
+            int: Asientos reservables con esa letra en todas las filas.
+        """
+        return self._letter_capacity[letter]
+
+    def width(self):
+        """
+        Devuelve el número de asientos por fila.
+
+        Returns:
+            int: Número de asientos por fila.
+        """
+        return len(self._letters)
+
+    def num_seats(self):
+        """
+        Calcula el número total de asientos reservables.
+
+        Returns:
+            int: Número total de asientos (sin los bloqueados ni los que no existen).
+        """
+        return self._num_rows * len(self._letters) - len(self._unavailable)
+
+    def seat_index(self, seat):
+        """
+        Analiza un identificador de asiento y devuelve su índice empaquetado,
+        (fila - 1) * asientos_por_fila + columna. Los asientos válidos se
+        memorizan, así que analizar un asiento repetido es una consulta a un dict.
+
+        Args:
+            seat (str): El identificador del asiento (p.e. '12C').
+
+        Returns:
+            int: Índice empaquetado del asiento.
+
+        Raises:
+            ValueError: Si el asiento no es válido:
+                - El último carácter debe ser una letra válida.
+                - El resto deben ser dígitos.
+                - El número de fila debe estar entre 1 y num_rows.
+                - El asiento debe existir en su fila y no estar bloqueado.
+        """
+        index = self._parsed.get(seat)
+        if index is not None:
+            return index
+
+        if len(seat) < 2:
+            raise SeatError(f"Asiento '{seat}' es demasiado corto.", "too_short")
+
+        letter = seat[-1]        # el último carácter
+        if letter not in self._letter_set:
+            raise SeatError(f"La letra de asiento '{letter}' no es válida para este avión.", "bad_letter")
+
+        row_str = seat[:-1]      # todo menos el último carácter
+        if not row_str.isdigit():
+            raise SeatError(f"La fila de asiento '{row_str}' no es un número válido.", "bad_row")
+
+        row = int(row_str)
+        if row < 1 or row > self._num_rows:
+            raise SeatError(f"La fila {row} no existe en este avión (máximo {self._num_rows}).", "bad_row")
+
+        index = (row - 1) * len(self._letters) + self._columns[letter]
+        if index in self._unavailable:
+            if index in self._blocked:
+                raise SeatError(f"El asiento {row}{letter} está bloqueado.", "blocked")
+            raise SeatError(f"El asiento {row}{letter} no existe en la fila {row} "
+                            f"(asientos: {self.get_row_letters(row)}).", "missing_seat")
+        # Acotamos la caché: variantes como '007A' no deben hacerla crecer sin fin
+        if len(self._parsed) < 4 * self.num_seats():
+            self._parsed[seat] = index
+        return index
+
+    def parse(self, seat):
+        """
+        Separa un identificador de asiento en fila y columna.
+
+        Args:
+            seat (str): El identificador del asiento (p.e. '12C').
+
+        Returns:
+            tuple: (row (int), col (int)).
+
+        Raises:
+            ValueError: Si el asiento no es válido (ver seat_index).
+        """
+        row, col = divmod(self.seat_index(seat), len(self._letters))
+        return row + 1, col
+
+    def seat_name(self, index):
+        """
+        Construye el identificador de un asiento a partir de su índice.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+
+        Returns:
+            str: Identificador del asiento (p.e. '12C').
+        """
+        row, col = divmod(index, len(self._letters))
+        return f"{row + 1}{self._letters[col]}"
+
+
+def _restore_template(model, num_rows, letters, row_letters, exit_rows, blocked):
+    """
+    Recupera una plantilla al recibirla desde otro proceso: si el modelo ya
+    está registrado con la misma definición se reutiliza; si no, se construye
+    sin registrarla, para no cambiar las plantillas de este proceso.
+
+    Returns:
+        SeatLayout: La plantilla.
+    """
+    layout = _TEMPLATES.get(model)
+    if layout is not None and layout.__reduce__()[1] == (model, num_rows, letters, row_letters,
+                                                         exit_rows, blocked):
+        return layout
+    return SeatLayout(num_rows, letters, model, row_letters, exit_rows, blocked)
+
+
+def _split_blocks(letters):
+    """
+    Divide las letras de una fila en bloques separados por pasillos.
+
+    Args:
+        letters (str): Letras de asiento de la fila.
+
+    Returns:
+        tuple: Cadenas con las letras de cada bloque.
+    """
+    sizes = _SEAT_BLOCKS.get(len(letters))
+    if sizes is None:
+        # Filas muy anchas: tres bloques, con el central absorbiendo el resto
+        side = len(letters) // 3
+        sizes = (side, len(letters) - 2 * side, side)
+
+    blocks = []
+    start = 0
+    for size in sizes:
+        blocks.append(letters[start:start + size])
+        start += size
+    return tuple(blocks)
+
+
+# Modelos de serie: comparten la distribución por dimensiones
+_TEMPLATES["Airbus A319"] = SeatLayout.for_dimensions(23, 6)
+_TEMPLATES["Boeing 777"] = SeatLayout.for_dimensions(56, 9)
@@ -0,0 +1,451 @@
+# ============================================================================
+# Fichero: SeatMap.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Motores de almacenamiento de la ocupación de asientos de un vuelo
+# ============================================================================
+
+"""
+Módulo que define los motores (seat maps) en los que Flight guarda la
+ocupación de sus asientos.
+
+Todos los motores identifican cada asiento por su índice empaquetado:
+
+    indice = (fila - 1) * asientos_por_fila + columna
+
+donde la columna es la posición de la letra dentro de las letras de asiento
+(A -> 0, B -> 1, ...).
+
+Clases:
+    SeatMap
+    DictSeatMap
+    SparseSeatMap
+    BitmapSeatMap
+    CompactSeatMap
+"""
+
+from array import array
+
+from Passenger import PassengerTable
+
+
+class SeatMap:
+    """
+    Clase base de los motores de asientos. Define la interfaz que utiliza
+    Flight y ofrece implementaciones genéricas de las vistas.
+
+    Atributos:
+        concurrent_rows (bool): Atributo de clase. True si dos hilos pueden
+                                escribir a la vez asientos de filas distintas
+                                (cada fila se guarda aparte); si no, Flight
+                                serializa las escrituras en modo concurrente.
+        indexed (bool): Atributo de clase. True si el motor lleva su propia
+                        cuenta de ocupación e índice de pasajeros (find() y
+                        count() eficientes, y put() rechaza un pasajero que ya
+                        tiene asiento); Flight no guarda entonces contadores
+                        ni índice propios y consulta siempre al motor. Lo usan
+                        SQLite, porque otros procesos cambian los asientos, y
+                        las instantáneas abiertas con mmap (ver Snapshot.py).
+        _num_rows (int): Número de filas de la aeronave.
+        _seat_letters (str): Letras de asiento de cada fila (ej. 'ABCDEF').
+        _width (int): Número de asientos por fila.
+    """
+
+    concurrent_rows = False
+    indexed = False
+
+    def __init__(self, num_rows, seat_letters):
+        """
+        Inicializa el motor con las dimensiones de la aeronave.
+
+        Args:
+            num_rows (int): Número de filas de la aeronave.
+            seat_letters (str): Letras de asiento de cada fila.
+        """
+        self._num_rows = num_rows
+        self._seat_letters = seat_letters
+        self._width = len(seat_letters)
+
+    def has_bookings(self):
+        """
+        Indica si el motor ya tenía asientos ocupados al crearse (solo en
+        motores persistentes; los de memoria siempre empiezan vacíos).
+
+        Returns:
+            bool: True si hay asientos ocupados que Flight debe contabilizar.
+        """
+        return False
+
+    def get(self, index):
+        """
+        Devuelve el pasajero que ocupa el asiento, o None si está libre.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+        """
+        raise NotImplementedError
+
+    def put(self, index, passenger):
+        """
+        Coloca un pasajero en un asiento libre.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+            passenger (tuple): Datos del pasajero.
+        """
+        raise NotImplementedError
+
+    def put_many(self, bookings):
+        """
+        Coloca un lote de pasajeros en asientos libres.
+
+        Args:
+            bookings (iterable): Pares (index, passenger).
+        """
+        put = self.put
+        for index, passenger in bookings:
+            put(index, passenger)
+
+    def remove(self, index):
+        """
+        Libera un asiento y devuelve el pasajero que lo ocupaba.
+
+        Args:
+            index (int): Índice empaquetado del asiento.
+
+        Returns:
+            tuple: Datos del pasajero que ocupaba el asiento.
+        """
+        raise NotImplementedError
+
+    def remove_many(self, indices):
+        """
+        Libera un lote de asientos ocupados.
+
+        Args:
+            indices (list): Índices empaquetados de los asientos.
+
+        Returns:
+            list: Datos de cada pasajero, en el mismo orden.
+        """
+        remove = self.remove
+        return [remove(index) for index in indices]
+
+    def move(self, from_index, to_index):
+        """
+        Mueve al pasajero de un asiento a otro asiento libre.
+
+        Args:
+            from_index (int): Índice empaquetado del asiento de origen.
+            to_index (int): Índice empaquetado del asiento de destino.
+
+        Returns:
+            tuple: Datos del pasajero movido, o None si el origen estaba libre.
+        """
+        passenger = self.remove(from_index)
+        if passenger is not None:
+            self.put(to_index, passenger)
+        return passenger
+
+    def find(self, id_card):
+        """
+        Busca el asiento de un pasajero recorriendo los asientos ocupados.
+        Flight solo lo usa con motores indexados (ver indexed); el resto
+        tiene su propio índice de pasajeros.
+
+        Args:
+            id_card (str): Documento de identidad del pasajero.
+
+        Returns:
+            int: Índice empaquetado del asiento, o None si no tiene asiento.
+        """
+        for index, passenger in self.items():
+            if passenger[2] == id_card:
+                return index
+        return None
+
+    def count(self, row=None, column=None):
+        """
+        Cuenta los asientos ocupados de la aeronave, de una fila o de una
+        columna. Como find(), Flight solo lo usa con motores indexados.
+
+        Args:
+            row (int): Número de fila (empezando en 1), o None para todas.
+            column (int): Posición de la letra en la fila, o None para todas.
+
+        Returns:
+            int: Número de asientos ocupados.
+        """
+        width = self._width
+        return sum(1 for index, _ in self.items()
+                   if (row is None or index // width == row - 1)
+                   and (column is None or index % width == column))
+
+    def items(self):
+        """
+        Generador que recorre los asientos ocupados en orden de índice.
+
+        Yields:
+            tuple: (index, passenger) para cada asiento ocupado.
+        """
+        raise NotImplementedError
+
+    def rows_view(self):
+        """
+        Construye la vista clásica de asientos: una lista cuyo índice 0 es
+        None y, a partir del 1, un diccionario por fila {letra: pasajero}.
+
+        Returns:
+            list: Vista de la ocupación de asientos.
+        """
+        seating = [None]
+        for _ in range(self._num_rows):
+            seating.append({letter: None for letter in self._seat_letters})
+        for index, passenger in self.items():
+            row, col = divmod(index, self._width)
+            seating[row + 1][self._seat_letters[col]] = passenger
+        return seating
+
+
+class DictSeatMap(SeatMap):
+    """
+    Motor clásico: una lista con un diccionario por fila. get_seating()
+    devuelve directamente esta estructura.
+
+    Las filas se crean al reservar en ellas o al pedir la vista completa, así
+    que un vuelo sin reservas apenas ocupa memoria.
+
+    Atributos:
+        _rows (list): Índice 0 a None y un diccionario {letra: pasajero} por
+                      fila (None si la fila aún no se ha creado).
+        _complete (bool): Si ya se han creado todas las filas.
+    """
+
+    concurrent_rows = True
+
+    def __init__(self, num_rows, seat_letters):
+        super().__init__(num_rows, seat_letters)
+        self._rows = [None] * (num_rows + 1)  # índice 0 sin usar
+        self._complete = False
+
+    def get(self, index):
+        row, col = divmod(index, self._width)
+        row_dict = self._rows[row + 1]
+        return None if row_dict is None else row_dict[self._seat_letters[col]]
+
+    def put(self, index, passenger):
+        row, col = divmod(index, self._width)
+        row_dict = self._rows[row + 1]
+        if row_dict is None:
+            row_dict = self._rows[row + 1] = dict.fromkeys(self._seat_letters)
+        row_dict[self._seat_letters[col]] = passenger
+
+    def remove(self, index):
+        row, col = divmod(index, self._width)
+        row_dict = self._rows[row + 1]
+        letter = self._seat_letters[col]
+        passenger = row_dict[letter]
+        row_dict[letter] = None
+        return passenger
+
+    def items(self):
+        index = 0
+        for row in self._rows[1:]:
+            if row is None:
+                index += self._width
+                continue
+            for passenger in row.values():
+                if passenger is not None:
+                    yield index, passenger
+                index += 1
+
+    def rows_view(self):
+        # La vista es la propia estructura interna (comportamiento histórico).
+        if not self._complete:
+            rows = self._rows
+            for row in range(1, len(rows)):
+                if rows[row] is None:
+                    rows[row] = dict.fromkeys(self._seat_letters)
+            self._complete = True
+        return self._rows
+
+
+class SparseSeatMap(SeatMap):
+    """
+    Motor disperso: solo guarda los asientos ocupados, en un diccionario
+    {índice: pasajero}. Crearlo no depende del tamaño de la aeronave y la
+    memoria crece con las reservas, así que conviene para los vuelos que se
+    programan con meses de antelación y casi sin reservas. La vista por
+    filas de get_seating() y print_seating(fmt='pprint') se construye solo
+    cuando se pide.
+
+    Atributos:
+        _seats (dict): Pasajero de cada asiento ocupado {índice: pasajero}.
+    """
+
+    concurrent_rows = True
+
+    def __init__(self, num_rows, seat_letters):
+        super().__init__(num_rows, seat_letters)
+        self._seats = {}
+
+    def get(self, index):
+        return self._seats.get(index)
+
+    def put(self, index, passenger):
+        self._seats[index] = passenger
+
+    def put_many(self, bookings):
+        self._seats.update(bookings)
+
+    def remove(self, index):
+        return self._seats.pop(index)
+
+    def remove_many(self, indices):
+        pop = self._seats.pop
+        return [pop(index) for index in indices]
+
+    def items(self):
+        seats = self._seats
+        for index in sorted(seats):
+            yield index, seats[index]
+
+
+class BitmapSeatMap(SeatMap):
+    """
+    Motor compacto: un bit de ocupación por asiento en un bytearray y los
+    pasajeros en un diccionario {índice: pasajero} que solo tiene los
+    asientos ocupados, así que un vuelo vacío ocupa poco más que el mapa de
+    bits. El bit es la fuente de verdad: get() no mira el diccionario si el
+    asiento está libre e items() recorre el mapa saltando bytes vacíos.
+
+    Atributos:
+        _bits (bytearray): Mapa de bits de ocupación (1 = ocupado).
+        _slots (dict): Pasajero de cada asiento ocupado {índice: pasajero}.
+    """
+
+    def __init__(self, num_rows, seat_letters):
+        super().__init__(num_rows, seat_letters)
+        self._bits = bytearray((num_rows * self._width + 7) // 8)
+        self._slots = {}
+
+    def get(self, index):
+        if self._bits[index >> 3] & (1 << (index & 7)):
+            return self._slots.get(index)
+        return None
+
+    def put(self, index, passenger):
+        # Primero el pasajero y después el bit: get() nunca ve un bit sin pasajero
+        self._slots[index] = passenger
+        self._bits[index >> 3] |= 1 << (index & 7)
+
+    def remove(self, index):
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        return self._slots.pop(index, None)
+
+    def items(self):
+        slots = self._slots
+        for index in self._occupied():
+            yield index, slots[index]
+
+    def _occupied(self):
+        """
+        Generador que recorre los índices ocupados según el mapa de bits.
+
+        Yields:
+            int: Índice empaquetado de cada asiento ocupado, en orden.
+        """
+        for byte_pos, byte in enumerate(self._bits):
+            # Saltamos de golpe los bloques de 8 asientos libres
+            if not byte:
+                continue
+            base = byte_pos << 3
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield base + bit
+
+
+class CompactSeatMap(BitmapSeatMap):
+    """
+    Motor bitmap que no guarda tuplas de pasajero: cada asiento guarda un
+    entero (handle) de una PassengerTable. La tabla puede compartirse entre
+    los vuelos de una flota con functools.partial(CompactSeatMap, table=tabla).
+    Los handles van en un array('i') por fila, creado con la primera
+    reserva de la fila.
+
+    Atributos:
+        _rows (dict): Handles de cada fila con reservas {fila: array} (-1 si
+                      el asiento está libre; la fila empieza en 0).
+        _table (PassengerTable): Tabla donde se guardan los pasajeros (si no
+                                 se comparte, se crea con la primera reserva).
+    """
+
+    def __init__(self, num_rows, seat_letters, table=None):
+        SeatMap.__init__(self, num_rows, seat_letters)
+        self._bits = bytearray((num_rows * self._width + 7) // 8)
+        self._rows = {}
+        self._table = table
+
+    def get(self, index):
+        if self._bits[index >> 3] & (1 << (index & 7)):
+            row, col = divmod(index, self._width)
+            return self._table.get(self._rows[row][col])
+        return None
+
+    def put(self, index, passenger):
+        row, col = divmod(index, self._width)
+        handles = self._rows.get(row)
+        if handles is None:
+            handles = self._rows[row] = array("i", [-1]) * self._width
+        if self._table is None:
+            self._table = PassengerTable()
+        handles[col] = self._table.add(passenger)
+        self._bits[index >> 3] |= 1 << (index & 7)
+
+    def remove(self, index):
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        row, col = divmod(index, self._width)
+        handles = self._rows[row]
+        passenger = self._table.remove(handles[col])
+        handles[col] = -1
+        return passenger
+
+    def items(self):
+        get = self._table.get
+        rows = self._rows
+        width = self._width
+        for index in self._occupied():
+            row, col = divmod(index, width)
+            yield index, get(rows[row][col])
+
+
+# Motores disponibles por nombre para Flight(..., engine=...)
+SEAT_MAP_ENGINES = {
+    "dict": DictSeatMap,
+    "sparse": SparseSeatMap,
+    "bitmap": BitmapSeatMap,
+    "compact": CompactSeatMap,
+}
+
+
+def make_seat_map(engine, num_rows, seat_letters):
+    """
+    Crea el motor de asientos indicado.
+
+    Args:
+        engine (str | callable): Nombre del motor ('dict', 'sparse', 'bitmap', 'compact') o una
+            factoría que recibe (num_rows, seat_letters) y devuelve un SeatMap.
+        num_rows (int): Número de filas de la aeronave.
+        seat_letters (str): Letras de asiento de cada fila.
+
+    Returns:
+        SeatMap: El motor de asientos creado.
+
+    Raises:
+        ValueError: Si el nombre del motor no es conocido.
+    """
+    if callable(engine):
+        return engine(num_rows, seat_letters)
+    if engine not in SEAT_MAP_ENGINES:
+        raise ValueError(f"Motor de asientos '{engine}' desconocido "
+                         f"(opciones: {', '.join(SEAT_MAP_ENGINES)}).")
+    return SEAT_MAP_ENGINES[engine](num_rows, seat_letters)
@@ -0,0 +1,285 @@
+# ============================================================================
+# Fichero: ShardedInventory.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Inventario de asientos repartido entre varios procesos
+# ============================================================================
+
+"""
+Módulo que define ShardedInventory, un inventario de asientos repartido por
+número de vuelo entre varios procesos (multiprocessing). Cada proceso es dueño
+de sus objetos Flight; el router del proceso principal agrupa las peticiones
+por proceso, envía un único mensaje por proceso y lote, y recompone las
+respuestas en el orden original. Las consultas de toda la flota se reparten
+entre todos los procesos y se combinan.
+
+Clases:
+    ShardedInventory
+"""
+
+import multiprocessing
+import zlib
+
+from Flight import Flight
+
+# Operaciones que acepta ShardedInventory.execute()
+OPERATIONS = ("add_flight", "allocate", "reallocate", "availability")
+
+
+class ShardedInventory:
+    """
+    Router de un inventario de vuelos repartido entre procesos.
+
+    Atributos:
+        __connections (list): Extremo del router de la tubería de cada proceso.
+        __processes (list): Procesos trabajadores.
+    """
+
+    def __init__(self, num_workers, engine="dict"):
+        """
+        Arranca los procesos trabajadores.
+
+        Args:
+            num_workers (int): Número de procesos.
+            engine (str): Motor de asientos de los vuelos de cada proceso.
+
+        Raises:
+            ValueError: Si num_workers < 1.
+        """
+        if num_workers < 1:
+            raise ValueError(f"El número de procesos (num_workers={num_workers}) debe ser al menos 1.")
+        self.__connections = []
+        self.__processes = []
+        for _ in range(num_workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(child, engine), daemon=True)
+            process.start()
+            child.close()
+            self.__connections.append(parent)
+            self.__processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def num_workers(self):
+        """
+        Devuelve el número de procesos trabajadores.
+
+        Returns:
+            int: Número de procesos.
+        """
+        return len(self.__processes)
+
+    def shard_of(self, number):
+        """
+        Calcula el proceso dueño de un vuelo. Se usa crc32 (y no hash()) para
+        que el reparto sea el mismo en cualquier ejecución.
+
+        Args:
+            number (str): Número del vuelo.
+
+        Returns:
+            int: Índice del proceso.
+        """
+        return zlib.crc32(number.encode("utf-8")) % len(self.__connections)
+
+    def execute(self, commands):
+        """
+        Ejecuta un lote de operaciones: un mensaje por proceso implicado, que
+        trabajan en paralelo.
+
+        Args:
+            commands (iterable): Tuplas (operación, número de vuelo, *args):
+                ('add_flight', number, aircraft)
+                ('allocate', number, seat, passenger)
+                ('reallocate', number, from_seat, to_seat)
+                ('availability', number)
+
+        Returns:
+            list: El resultado de cada operación en el orden recibido. Las que
+                  fallan devuelven la excepción ValueError en vez de lanzarla,
+                  para no perder el resto del lote.
+
+        Raises:
+            ValueError: Si alguna operación no existe.
+        """
+        batches = {}
+        positions = {}
+        count = 0
+        for position, command in enumerate(commands):
+            if command[0] not in OPERATIONS:
+                raise ValueError(f"Operación '{command[0]}' no válida (opciones: {', '.join(OPERATIONS)}).")
+            shard = self.shard_of(command[1])
+            batches.setdefault(shard, []).append(command)
+            positions.setdefault(shard, []).append(position)
+            count += 1
+
+        results = [None] * count
+        for shard, batch in batches.items():
+            self.__connections[shard].send(("batch", batch))
+        for shard in batches:
+            for position, (ok, value) in zip(positions[shard], self.__connections[shard].recv()):
+                results[position] = value if ok else ValueError(value)
+        return results
+
+    def add_flight(self, number, aircraft):
+        """
+        Crea un vuelo en el proceso que le corresponde.
+
+        Args:
+            number (str): Número del vuelo.
+            aircraft (Aircraft): Aeronave del vuelo.
+
+        Raises:
+            ValueError: Si el número no es válido o el vuelo ya existe.
+        """
+        self.__single(("add_flight", number, aircraft))
+
+    def allocate(self, number, seat, passenger):
+        """
+        Asigna un pasajero a un asiento (ver Flight.allocate_passenger).
+
+        Raises:
+            ValueError: Si el vuelo no existe o la asignación no es válida.
+        """
+        self.__single(("allocate", number, seat, passenger))
+
+    def reallocate(self, number, from_seat, to_seat):
+        """
+        Reasigna un pasajero (ver Flight.reallocate_passenger).
+
+        Raises:
+            ValueError: Si el vuelo no existe o la reasignación no es válida.
+        """
+        self.__single(("reallocate", number, from_seat, to_seat))
+
+    def availability(self, number):
+        """
+        Devuelve los asientos libres de un vuelo.
+
+        Returns:
+            int: Número de asientos libres.
+
+        Raises:
+            ValueError: Si el vuelo no existe.
+        """
+        return self.__single(("availability", number))
+
+    def total_free_seats(self):
+        """
+        Suma los asientos libres de todos los vuelos de todos los procesos.
+
+        Returns:
+            int: Número total de asientos libres.
+        """
+        return sum(self.__broadcast(("total_free",)))
+
+    def find_passenger(self, id_card):
+        """
+        Busca en todos los procesos los asientos de un pasajero.
+
+        Args:
+            id_card (str): Documento de identidad del pasajero.
+
+        Returns:
+            list: Pares (número de vuelo, asiento), ordenados por vuelo.
+        """
+        found = []
+        for partial in self.__broadcast(("find", id_card)):
+            found.extend(partial)
+        return sorted(found)
+
+    def close(self):
+        """
+        Detiene los procesos trabajadores.
+        """
+        for connection in self.__connections:
+            if not connection.closed:
+                connection.send(None)
+                connection.close()
+        for process in self.__processes:
+            process.join()
+
+    def __single(self, command):
+        """
+        Ejecuta una operación y lanza su error si falla.
+
+        Raises:
+            ValueError: Si la operación falla.
+        """
+        result = self.execute([command])[0]
+        if isinstance(result, ValueError):
+            raise result
+        return result
+
+    def __broadcast(self, message):
+        """
+        Envía una consulta a todos los procesos y recoge sus respuestas.
+
+        Returns:
+            list: La respuesta de cada proceso.
+        """
+        for connection in self.__connections:
+            connection.send(message)
+        return [connection.recv() for connection in self.__connections]
+
+
+def _worker(connection, engine):
+    """
+    Bucle de un proceso trabajador: atiende mensajes hasta recibir None.
+
+    Args:
+        connection (Connection): Extremo del trabajador de la tubería.
+        engine (str): Motor de asientos de los vuelos.
+    """
+    flights = {}
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        kind = message[0]
+        if kind == "batch":
+            connection.send([_apply(flights, command, engine) for command in message[1]])
+        elif kind == "total_free":
+            connection.send(sum(flight.num_available_seats() for flight in flights.values()))
+        elif kind == "find":
+            found = []
+            for number, flight in flights.items():
+                seat = flight.find_seat(message[1])
+                if seat is not None:
+                    found.append((number, seat))
+            connection.send(found)
+    connection.close()
+
+
+def _apply(flights, command, engine):
+    """
+    Aplica una operación sobre los vuelos de un trabajador. Cualquier error
+    (también los de un comando mal formado, p.e. TypeError por un pasajero
+    None o argumentos de menos) se devuelve como mensaje: una excepción que
+    escapara mataría al trabajador y rompería la tubería de todo el lote.
+
+    Returns:
+        tuple: (True, resultado) o (False, mensaje de error).
+    """
+    try:
+        operation, number, *args = command
+        if operation == "add_flight":
+            if number in flights:
+                raise ValueError(f"El vuelo {number} ya existe.")
+            flights[number] = Flight(number, args[0], engine=engine)
+            return True, None
+        if number not in flights:
+            raise ValueError(f"El vuelo {number} no existe.")
+        flight = flights[number]
+        if operation == "allocate":
+            return True, flight.allocate_passenger(*args)
+        if operation == "reallocate":
+            return True, flight.reallocate_passenger(*args)
+        return True, flight.num_available_seats()
+    except ValueError as error:
+        return False, str(error)
+    except Exception as error:
+        return False, f"Comando {command!r} no válido: {type(error).__name__}: {error}"
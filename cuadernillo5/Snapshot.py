@@ -0,0 +1,483 @@
+# ============================================================================
+# Fichero: Snapshot.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Formato binario compacto para guardar y recuperar vuelos
+# ============================================================================
+
+"""
+Módulo que define el formato binario de las instantáneas (snapshots) de un
+vuelo. Todos los enteros son little-endian y las cadenas van en UTF-8
+precedidas de su longitud (u16):
+
+    cabecera   b'FLTS', versión del formato (u16)
+    cambios    versión del vuelo (u64): número de cambios incluidos, para
+               saber qué registros del diario (BookingJournal.py) faltan
+    vuelo      número de vuelo (cadena)
+    aeronave   tipo (u8: 0 Aircraft, 1 Airbus, 2 Boeing), matrícula, modelo,
+               variante/aerolínea (cadena vacía en Aircraft), filas (u16),
+               asientos por fila (u16); al cargar, un Aircraft cuyo modelo
+               tenga plantilla registrada (SeatLayout.register_template)
+               recupera esa plantilla
+    ocupación  longitud (u32) y mapa de bits, un bit por asiento en orden de
+               índice empaquetado (el mismo que BitmapSeatMap)
+    pasajeros  número (u32), posición de cada pasajero (u32, relativa al
+               primer pasajero; desde el formato 3) y, por cada asiento
+               ocupado en orden de índice, nombre, apellido e id_card (cadenas)
+
+Hay dos formas de leerla:
+
+    load_snapshot()  decodifica todos los pasajeros; la usa Flight.load()
+                     para restaurar el vuelo en un motor en memoria.
+    open_snapshot()  solo lee la cabecera y deja el fichero en un mmap; el
+                     motor MappedSeatMap cuenta la ocupación con el mapa de
+                     bits y decodifica cada pasajero cuando se consulta
+                     (Flight.load(path, engine='mmap')). Reabrir miles de
+                     vuelos cuesta lo que sus cabeceras, no sus reservas.
+                     Cada vuelo así abierto mantiene un descriptor del
+                     fichero, y en Windows un fichero mapeado no se puede
+                     sustituir: save() sobre la misma ruta falla allí.
+
+Funciones:
+    save_snapshot
+    load_snapshot
+    open_snapshot
+
+Clases:
+    MappedSeatMap
+"""
+
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+from Aircraft import Aircraft, Airbus, Boeing
+from SeatMap import BitmapSeatMap
+
+MAGIC = b"FLTS"
+VERSION = 3
+
+_KIND_AIRCRAFT = 0
+_KIND_AIRBUS = 1
+_KIND_BOEING = 2
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_DIMENSIONS = struct.Struct("<HH")
+
+
+def save_snapshot(path, number, aircraft, occupied, version=0):
+    """
+    Guarda la instantánea de un vuelo. Se escribe en un fichero temporal que
+    se fuerza a disco y sustituye al destino al terminar; después se fuerza
+    también el directorio, así que al volver de la llamada la instantánea es
+    duradera y nunca queda una a medias (ver Flight.compact_journal).
+
+    Args:
+        path (str): Ruta del fichero de destino.
+        number (str): Número del vuelo.
+        aircraft (Aircraft): Aeronave del vuelo.
+        occupied (iterable): Pares (index, passenger) de los asientos ocupados,
+                             en orden de índice.
+        version (int): Versión del vuelo (número de cambios aplicados).
+    """
+    if isinstance(aircraft, Airbus):
+        kind, extra = _KIND_AIRBUS, aircraft.get_variant()
+    elif isinstance(aircraft, Boeing):
+        kind, extra = _KIND_BOEING, aircraft.get_airline()
+    else:
+        kind, extra = _KIND_AIRCRAFT, ""
+
+    # El mapa cubre la rejilla completa filas x letras: con plantillas no
+    # uniformes num_seats() es menor que el número de índices empaquetados
+    bits = bytearray((aircraft.get_num_rows() * aircraft.get_num_seats_per_row() + 7) // 8)
+    records = []
+    offsets = []
+    position = 0
+    for index, passenger in occupied:
+        bits[index >> 3] |= 1 << (index & 7)
+        record = b"".join(_pack_str(field) for field in passenger)
+        offsets.append(position)
+        records.append(record)
+        position += len(record)
+
+    parts = [
+        MAGIC, _U16.pack(VERSION), _U64.pack(version),
+        _pack_str(number),
+        _U8.pack(kind), _pack_str(aircraft.get_registration()), _pack_str(aircraft.get_model()),
+        _pack_str(extra), _DIMENSIONS.pack(aircraft.get_num_rows(), aircraft.get_num_seats_per_row()),
+        _U32.pack(len(bits)), bytes(bits),
+        _U32.pack(len(offsets)), struct.pack(f"<{len(offsets)}I", *offsets),
+    ]
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(parts))
+        f.write(b"".join(records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(path)
+
+
+def load_snapshot(path):
+    """
+    Lee una instantánea completa, decodificando todos sus pasajeros.
+
+    Args:
+        path (str): Ruta del fichero.
+
+    Returns:
+        tuple: (number, aircraft, indices, passengers, version) con el número
+               de vuelo, la aeronave reconstruida, los índices ocupados en
+               orden, los datos de cada pasajero en el mismo orden y la
+               versión del vuelo.
+
+    Raises:
+        ValueError: Si el fichero no es una instantánea válida.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data:
+        raise ValueError(f"El fichero '{path}' está vacío; no es una instantánea de vuelo.")
+    try:
+        number, aircraft, version, bits, count, _, records = _parse_header(data, path)
+        indices = list(_set_bits(bits))
+        passengers = []
+        offset = records
+        for _ in range(count):
+            name, offset = _unpack_str(data, offset)
+            surname, offset = _unpack_str(data, offset)
+            id_card, offset = _unpack_str(data, offset)
+            passengers.append((name, surname, id_card))
+    except (struct.error, UnicodeDecodeError) as error:
+        raise ValueError(f"La instantánea '{path}' está truncada o dañada: {error}") from error
+    return number, aircraft, indices, passengers, version
+
+
+def open_snapshot(path):
+    """
+    Abre una instantánea sobre un mmap leyendo solo su cabecera: los
+    pasajeros se decodifican después, cuando el motor los consulta.
+
+    Args:
+        path (str): Ruta del fichero.
+
+    Returns:
+        tuple: (number, aircraft, version, factory), donde factory es la
+               factoría (num_rows, seat_letters) -> MappedSeatMap que se pasa
+               a Flight(..., engine=factory).
+
+    Raises:
+        ValueError: Si el fichero no es una instantánea válida.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"El fichero '{path}' está vacío; no es una instantánea de vuelo.")
+        # El mmap mantiene su propio descriptor: el fichero se puede cerrar
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        number, aircraft, version, bits, count, table, records = _parse_header(data, path)
+    except (struct.error, UnicodeDecodeError) as error:
+        data.close()
+        raise ValueError(f"La instantánea '{path}' está truncada o dañada: {error}") from error
+    except ValueError:
+        data.close()
+        raise
+
+    def factory(num_rows, seat_letters):
+        return MappedSeatMap(num_rows, seat_letters, data, bits, count, table, records)
+    return number, aircraft, version, factory
+
+
+class MappedSeatMap(BitmapSeatMap):
+    """
+    Motor de asientos respaldado por una instantánea abierta con mmap. Al
+    crearlo solo se copia el mapa de bits; cada pasajero se decodifica del
+    fichero al consultarlo (su posición sale del número de bits a 1 que le
+    preceden y de la tabla de posiciones). Los cambios posteriores no tocan
+    el fichero: van a _slots, que tiene prioridad sobre la instantánea.
+
+    Es un motor indexado (ver SeatMap.indexed): la ocupación se cuenta con
+    el mapa de bits y el índice de pasajeros {id_card: índice} se construye
+    la primera vez que se busca un pasajero (p.e. en la primera reserva).
+
+    Atributos:
+        _data (mmap): Contenido de la instantánea.
+        _base (bytes): Mapa de bits guardado en la instantánea.
+        _bits (bytearray): Mapa de bits actual (1 = ocupado).
+        _slots (dict): Asientos cambiados desde la carga {índice: pasajero o None}.
+        _num_occupied (int): Asientos ocupados ahora.
+        _table (int): Posición de la tabla de posiciones en el fichero
+                      (None en los formatos 1 y 2, que no la tienen).
+        _records (int): Posición del primer pasajero en el fichero.
+        _ranks (array): Bits a 1 de la instantánea antes de cada byte (perezoso).
+        _offsets (array): Posición de cada pasajero en los formatos sin tabla (perezoso).
+        _ids (dict): Índice {id_card: índice de asiento} (perezoso).
+        _ids_lock (Lock): Evita construir el índice dos veces a la vez.
+    """
+
+    indexed = True
+
+    def __init__(self, num_rows, seat_letters, data, bits, count, table, records):
+        super().__init__(num_rows, seat_letters)
+        if len(bits) != len(self._bits):
+            raise ValueError(f"La instantánea tiene {len(bits) * 8} asientos y la aeronave "
+                             f"{num_rows * self._width}.")
+        self._data = data
+        self._base = bytes(bits)
+        self._bits[:] = bits
+        self._num_occupied = count
+        self._table = table
+        self._records = records
+        self._ranks = None
+        self._offsets = None
+        self._ids = None
+        self._ids_lock = threading.Lock()
+
+    def get(self, index):
+        if not self._bits[index >> 3] & (1 << (index & 7)):
+            return None
+        slots = self._slots
+        if index in slots:
+            return slots[index]
+        name, offset = _unpack_str(self._data, self._record(index))
+        surname, offset = _unpack_str(self._data, offset)
+        id_card, _ = _unpack_str(self._data, offset)
+        return (name, surname, id_card)
+
+    def put(self, index, passenger):
+        ids = self._index()
+        if passenger[2] in ids:
+            raise ValueError(f"El pasajero {passenger[2]} ya tiene asiento en la instantánea.")
+        super().put(index, passenger)
+        self._num_occupied += 1
+        ids[passenger[2]] = index
+
+    def remove(self, index):
+        # Como en put(), el índice se construye antes de cambiar nada: así no
+        # se construye nunca a mitad de una escritura
+        ids = self._index()
+        passenger = self.get(index)
+        if passenger is None:
+            return None
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        self._slots[index] = None
+        self._num_occupied -= 1
+        ids.pop(passenger[2], None)
+        return passenger
+
+    def items(self):
+        get = self.get
+        for index in self._occupied():
+            yield index, get(index)
+
+    def find(self, id_card):
+        return self._index().get(id_card)
+
+    def count(self, row=None, column=None):
+        if row is None and column is None:
+            return self._num_occupied
+        width = self._width
+        rows = range(self._num_rows) if row is None else (row - 1,)
+        columns = range(width) if column is None else (column,)
+        bits = self._bits
+        return sum(1 for r in rows for c in columns
+                   if bits[(r * width + c) >> 3] & (1 << ((r * width + c) & 7)))
+
+    def _record(self, index):
+        """
+        Calcula la posición en el fichero del pasajero guardado en un asiento.
+
+        Args:
+            index (int): Índice empaquetado de un asiento ocupado en la instantánea.
+
+        Returns:
+            int: Posición del registro del pasajero.
+        """
+        base = self._base
+        if self._ranks is None:
+            ranks = array("I", [0]) * (len(base) + 1)
+            for byte_pos, byte in enumerate(base):
+                ranks[byte_pos + 1] = ranks[byte_pos] + bin(byte).count("1")
+            self._ranks = ranks
+        byte_pos = index >> 3
+        rank = self._ranks[byte_pos] + bin(base[byte_pos] & ((1 << (index & 7)) - 1)).count("1")
+        if self._table is not None:
+            return self._records + _U32.unpack_from(self._data, self._table + rank * _U32.size)[0]
+        if self._offsets is None:
+            self._offsets = _scan_records(self._data, self._records, len(self._ranks) and self._ranks[-1])
+        return self._offsets[rank]
+
+    def _index(self):
+        """
+        Devuelve el índice {id_card: índice de asiento}, construyéndolo la
+        primera vez: solo entonces se leen los id_card de la instantánea.
+
+        Returns:
+            dict: El índice de pasajeros.
+        """
+        ids = self._ids
+        if ids is None:
+            with self._ids_lock:
+                if self._ids is None:
+                    self._ids = {passenger[2]: index for index, passenger in self.items()}
+                ids = self._ids
+        return ids
+
+
+def _fsync_directory(path):
+    """
+    Fuerza a disco el directorio de un fichero, para que su renombrado
+    sobreviva a un corte de corriente.
+
+    Args:
+        path (str): Ruta del fichero.
+    """
+    if os.name != "posix":
+        return  # en Windows no se puede abrir un directorio para fsync
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _parse_header(data, path):
+    """
+    Interpreta la cabecera de una instantánea, sin leer los pasajeros.
+
+    Args:
+        data (mmap | bytes): Contenido del fichero.
+        path (str): Ruta del fichero (para los mensajes de error).
+
+    Returns:
+        tuple: (number, aircraft, version, bits, count, table, records): el
+               mapa de bits de ocupación, el número de pasajeros y la posición
+               de la tabla de posiciones (None si el formato no la tiene) y
+               del primer pasajero.
+
+    Raises:
+        ValueError: Si la cabecera o la versión no son válidas.
+    """
+    if data[:4] != MAGIC:
+        raise ValueError(f"El fichero '{path}' no es una instantánea de vuelo (cabecera incorrecta).")
+    (file_version,) = _U16.unpack_from(data, 4)
+    offset = 6
+    if file_version == 1:
+        # Formato 1: sin versión del vuelo
+        version = 0
+    elif file_version in (2, VERSION):
+        (version,) = _U64.unpack_from(data, offset)
+        offset += _U64.size
+    else:
+        raise ValueError(f"Versión de instantánea {file_version} no soportada (se esperaba {VERSION}).")
+
+    number, offset = _unpack_str(data, offset)
+    (kind,) = _U8.unpack_from(data, offset)
+    registration, offset = _unpack_str(data, offset + 1)
+    model, offset = _unpack_str(data, offset)
+    extra, offset = _unpack_str(data, offset)
+    num_rows, seats_per_row = _DIMENSIONS.unpack_from(data, offset)
+    offset += _DIMENSIONS.size
+
+    if kind == _KIND_AIRBUS:
+        aircraft = Airbus(registration, extra)
+    elif kind == _KIND_BOEING:
+        aircraft = Boeing(registration, extra)
+    else:
+        aircraft = Aircraft(registration, model, num_rows, seats_per_row)
+
+    (num_bytes,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    bits = bytes(data[offset:offset + num_bytes])
+    if len(bits) != num_bytes:
+        raise struct.error("mapa de bits fuera de los límites del fichero")
+    offset += num_bytes
+
+    (count,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    occupied = sum(bin(byte).count("1") for byte in bits)
+    if count != occupied:
+        raise ValueError(f"La instantánea tiene {occupied} asientos ocupados y {count} pasajeros.")
+    table = None
+    if file_version >= 3:
+        table = offset
+        offset += count * _U32.size
+        if offset > len(data):
+            raise struct.error("tabla de pasajeros fuera de los límites del fichero")
+    return number, aircraft, version, bits, count, table, offset
+
+
+def _set_bits(bits):
+    """
+    Generador que recorre las posiciones de los bits a 1 de un mapa de bits.
+
+    Args:
+        bits (bytes): Mapa de bits.
+
+    Yields:
+        int: Posición de cada bit a 1, en orden.
+    """
+    for byte_pos, byte in enumerate(bits):
+        if byte:
+            base = byte_pos << 3
+            yield from (base + bit for bit in range(8) if byte & (1 << bit))
+
+
+def _scan_records(data, offset, count):
+    """
+    Calcula la posición de cada pasajero en los formatos sin tabla de
+    posiciones, saltando las cadenas sin decodificarlas.
+
+    Args:
+        data (mmap | bytes): Contenido del fichero.
+        offset (int): Posición del primer pasajero.
+        count (int): Número de pasajeros.
+
+    Returns:
+        array: Posición de cada pasajero en el fichero.
+    """
+    offsets = array("Q")
+    for _ in range(count):
+        offsets.append(offset)
+        for _ in range(3):
+            (length,) = _U16.unpack_from(data, offset)
+            offset += _U16.size + length
+    return offsets
+
+
+def _pack_str(text):
+    """
+    Codifica una cadena como longitud (u16) + UTF-8.
+
+    Args:
+        text (str): Cadena a codificar.
+
+    Returns:
+        bytes: La cadena codificada.
+    """
+    raw = text.encode("utf-8")
+    return _U16.pack(len(raw)) + raw
+
+
+def _unpack_str(data, offset):
+    """
+    Decodifica una cadena escrita con _pack_str.
+
+    Args:
+        data (mmap | bytes): Contenido del fichero.
+        offset (int): Posición de la longitud de la cadena.
+
+    Returns:
+        tuple: (cadena, posición siguiente).
+    """
+    (length,) = _U16.unpack_from(data, offset)
+    start = offset + _U16.size
+    end = start + length
+    if end > len(data):
+        raise struct.error("cadena fuera de los límites del fichero")
+    return str(data[start:end], "utf-8"), end
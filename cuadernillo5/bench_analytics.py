@@ -0,0 +1,65 @@
+# ============================================================================
+# Fichero: bench_analytics.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Tiempo de las estadísticas de ocupación de una flota con NumPy
+# ============================================================================
+
+"""
+Benchmark de FleetAnalytics: crea N vuelos de Boeing 777 (10.000 por defecto)
+con un 80% de ocupación y mide la exportación a arrays y el cálculo de todas
+las estadísticas (por vuelo, por modelo, por letra y mapas de calor).
+
+Uso:
+    python bench_analytics.py [num_vuelos]
+"""
+
+import random
+import sys
+import time
+
+from Aircraft import Boeing
+from Flight import Flight
+from FleetAnalytics import FleetOccupancy
+
+SEATS = [f"{row}{letter}" for row in range(1, 57) for letter in "ABCDEFGHI"]
+
+
+def build(num_flights, load=0.8, seed=1):
+    """
+    Crea la flota con asientos ocupados al azar.
+
+    Returns:
+        list: Los vuelos.
+    """
+    rng = random.Random(seed)
+    flights = []
+    for i in range(num_flights):
+        flight = Flight(f"AF{i % 9998 + 1}", Boeing(f"F-{i}", "Emirates"), engine="bitmap")
+        seats = rng.sample(SEATS, int(len(SEATS) * load))
+        flight.allocate_many([(seat, ("Jack", "Shephard", f"{n:08d}X")) for n, seat in enumerate(seats)])
+        flights.append(flight)
+    return flights
+
+
+def main(argv):
+    num_flights = int(argv[1]) if len(argv) > 1 else 10_000
+    flights = build(num_flights)
+
+    start = time.perf_counter()
+    fleet = FleetOccupancy(flights)
+    exported = time.perf_counter()
+    fleet.load_factor_by_flight()
+    fleet.load_factor_by_model()
+    fleet.load_factor_by_letter()
+    fleet.row_heatmap("Boeing 777")
+    fleet.row_load_factor("Boeing 777")
+    end = time.perf_counter()
+
+    print(f"Vuelos: {num_flights} (factor de ocupación {fleet.load_factor():.1%})")
+    print(f"  exportación:   {exported - start:6.3f} s")
+    print(f"  estadísticas:  {end - exported:6.3f} s")
+    print(f"  total:         {end - start:6.3f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
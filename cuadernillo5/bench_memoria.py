@@ -0,0 +1,166 @@
+# ============================================================================
+# Fichero: bench_memoria.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Comparativa de memoria de las reservas según el motor de asientos
+# ============================================================================
+
+"""
+Benchmark de memoria: reparte N reservas (1.000.000 por defecto) entre vuelos
+de Boeing 777 y mide con tracemalloc la memoria que ocupan con:
+
+    - 'original': el diseño anterior, objetos Passenger con __dict__ más la
+      tupla passenger_data() guardada en el motor de diccionarios por fila.
+    - 'dict': Passenger con __slots__ y el motor de diccionarios por fila.
+    - 'compact': sin objetos Passenger; los datos se guardan en una única
+      PassengerTable compartida y cada asiento guarda un handle entero.
+
+Después mide M vuelos vacíos (10.000 por defecto) con cada motor de asientos
+como comprobación de regresión: los motores compactos ('bitmap', 'compact')
+no pueden ocupar más que el motor 'dict' por defecto. Si alguno lo supera, el
+script termina con código de salida 1.
+
+Uso:
+    python bench_memoria.py [num_reservas] [num_vuelos_vacios]
+"""
+
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+from Aircraft import Boeing
+from Flight import Flight
+from Passenger import Passenger, PassengerTable
+from SeatMap import CompactSeatMap, SEAT_MAP_ENGINES
+
+FIRST_NAMES = ("Jack", "Kate", "James", "John", "Sayid", "Hugo", "Claire", "Charlie", "Sun", "Jin")
+SURNAMES = ("Shephard", "Austen", "Ford", "Locke", "Jarrah", "Reyes", "Littleton", "Pace", "Kwon")
+
+
+class DictPassenger:
+    """
+    Pasajero con __dict__ por instancia, como era Passenger antes de __slots__.
+    """
+
+    def __init__(self, name, surname, id_card):
+        self._name = name
+        self._surname = surname
+        self._id_card = id_card
+
+    def passenger_data(self):
+        return (self._name, self._surname, self._id_card)
+
+
+def passenger_fields(i):
+    """
+    Genera los datos del pasajero i. Las cadenas se construyen en cada llamada,
+    como si llegaran de un fichero, para que el interning tenga efecto.
+    """
+    name = FIRST_NAMES[i % len(FIRST_NAMES)].encode().decode()
+    surname = SURNAMES[i % len(SURNAMES)].encode().decode()
+    return name, surname, f"{i:08d}X"
+
+
+def build(layout, num_bookings):
+    """
+    Construye la flota con num_bookings reservas según el diseño indicado.
+
+    Returns:
+        list: Los objetos que mantienen vivas las reservas.
+    """
+    seats = [f"{row}{letter}" for row in range(1, 57) for letter in "ABCDEFGHI"]
+    if layout == "compact":
+        engine = partial(CompactSeatMap, table=PassengerTable())
+    else:
+        engine = "dict"
+
+    keep = []
+    flight = None
+    for i in range(num_bookings):
+        seat_pos = i % len(seats)
+        if seat_pos == 0:
+            number = f"AF{len(keep) % 9998 + 1}"
+            flight = Flight(number, Boeing(f"F-{len(keep)}", "Emirates"), engine=engine)
+            keep.append(flight)
+        fields = passenger_fields(i)
+        if layout == "original":
+            passenger = DictPassenger(*fields)
+            keep.append(passenger)
+            flight.allocate_passenger(seats[seat_pos], passenger.passenger_data())
+        elif layout == "dict":
+            passenger = Passenger(*fields)
+            keep.append(passenger)
+            flight.allocate_passenger(seats[seat_pos], passenger.passenger_data())
+        else:
+            flight.allocate_passenger(seats[seat_pos], fields)
+    return keep
+
+
+def measure(layout, num_bookings):
+    """
+    Mide la memoria y el tiempo de construcción de un diseño.
+
+    Returns:
+        tuple: (MiB en uso, segundos).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    keep = build(layout, num_bookings)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return current / 2 ** 20, elapsed
+
+
+def measure_empty(engine, num_flights):
+    """
+    Mide la memoria de num_flights vuelos de Boeing 777 sin reservas.
+
+    Returns:
+        float: MiB en uso.
+    """
+    tracemalloc.start()
+    keep = [Flight(f"AF{i % 9998 + 1}", Boeing(f"F-{i}", "Emirates"), engine=engine)
+            for i in range(num_flights)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return current / 2 ** 20
+
+
+def check_empty_flights(num_flights):
+    """
+    Comprobación de regresión: los motores compactos no pueden ocupar más
+    memoria que el motor 'dict' con vuelos vacíos.
+
+    Returns:
+        list: Motores que superan al motor 'dict'.
+    """
+    print(f"Vuelos vacíos: {num_flights}")
+    usage = {engine: measure_empty(engine, num_flights) for engine in SEAT_MAP_ENGINES}
+    for engine, mib in usage.items():
+        print(f"{engine:>9}: {mib:8.1f} MiB ({mib / usage['dict']:5.1%})")
+    return [engine for engine in ("bitmap", "compact") if usage[engine] > usage["dict"]]
+
+
+def main(argv):
+    num_bookings = int(argv[1]) if len(argv) > 1 else 1_000_000
+    num_flights = int(argv[2]) if len(argv) > 2 else 10_000
+    print(f"Reservas: {num_bookings}")
+    baseline = None
+    for layout in ("original", "dict", "compact"):
+        mib, elapsed = measure(layout, num_bookings)
+        baseline = baseline or mib
+        print(f"{layout:>9}: {mib:8.1f} MiB ({mib / baseline:5.1%}) en {elapsed:5.1f} s")
+
+    print()
+    regressions = check_empty_flights(num_flights)
+    if regressions:
+        print(f"REGRESIÓN: {', '.join(regressions)} ocupa(n) más que el motor 'dict' con vuelos vacíos.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
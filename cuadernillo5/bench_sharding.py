@@ -0,0 +1,82 @@
+# ============================================================================
+# Fichero: bench_sharding.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Rendimiento del inventario repartido según el número de procesos
+# ============================================================================
+
+"""
+Benchmark de ShardedInventory: crea una flota de Boeing 777, lanza N reservas
+(200.000 por defecto) en lotes y mide las reservas por segundo con 1, 2, 4...
+procesos trabajadores. El escalado depende de los núcleos disponibles
+(os.cpu_count()); con un solo núcleo no habrá mejora.
+
+Uso:
+    python bench_sharding.py [num_reservas] [max_procesos]
+"""
+
+import os
+import sys
+import time
+
+from Aircraft import Boeing
+from ShardedInventory import ShardedInventory
+
+BATCH_SIZE = 5000
+SEATS = [f"{row}{letter}" for row in range(1, 57) for letter in "ABCDEFGHI"]
+
+
+def commands(num_bookings):
+    """
+    Genera los lotes de reservas, repartidos en vuelos llenos.
+
+    Returns:
+        tuple: (números de vuelo, lista de lotes de comandos).
+    """
+    numbers = [f"AF{i + 1}" for i in range((num_bookings + len(SEATS) - 1) // len(SEATS))]
+    batches = []
+    batch = []
+    for i in range(num_bookings):
+        number = numbers[i // len(SEATS)]
+        batch.append(("allocate", number, SEATS[i % len(SEATS)], ("Jack", "Shephard", f"{i:08d}X")))
+        if len(batch) == BATCH_SIZE:
+            batches.append(batch)
+            batch = []
+    if batch:
+        batches.append(batch)
+    return numbers, batches
+
+
+def measure(num_workers, numbers, batches):
+    """
+    Mide el tiempo de las reservas con num_workers procesos.
+
+    Returns:
+        float: Reservas por segundo.
+    """
+    with ShardedInventory(num_workers) as inventory:
+        inventory.execute([("add_flight", number, Boeing(f"F-{number}", "Emirates")) for number in numbers])
+        start = time.perf_counter()
+        count = 0
+        for batch in batches:
+            count += len(inventory.execute(batch))
+        elapsed = time.perf_counter() - start
+        assert inventory.total_free_seats() == len(numbers) * len(SEATS) - count
+    return count / elapsed
+
+
+def main(argv):
+    num_bookings = int(argv[1]) if len(argv) > 1 else 200_000
+    max_workers = int(argv[2]) if len(argv) > 2 else 4
+    numbers, batches = commands(num_bookings)
+    print(f"Reservas: {num_bookings} en {len(numbers)} vuelos (núcleos: {os.cpu_count()})")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        rate = measure(workers, numbers, batches)
+        baseline = baseline or rate
+        print(f"{workers:>3} procesos: {rate:10.0f} reservas/s (x{rate / baseline:4.2f})")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,376 @@
+# ============================================================================
+# Fichero: benchmark.py
+# Autor: Elena Ruiz De La Blanca
+# Descripción: Batería de benchmarks del modelo de reservas con línea base JSON
+# ============================================================================
+
+"""
+Batería de benchmarks del modelo de reservas. Cada benchmark prepara sus
+datos fuera del tiempo medido, se repite varias veces y se queda con la
+mejor medida. Los resultados se guardan en JSON y se pueden comparar con una
+línea base guardada: si algún benchmark es más lento que la base por encima
+de la tolerancia, el programa termina con código 1.
+
+Uso:
+    python benchmark.py [--output resultados.json] [--baseline base.json]
+                        [--tolerance 0.2] [--repeat 5] [--scale 1.0]
+                        [--filter texto]
+
+    # Guardar una línea base y comprobar después contra ella
+    python benchmark.py --output base.json
+    python benchmark.py --baseline base.json
+
+Funciones:
+    benchmark
+    run_benchmarks
+    compare
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import sys
+import time
+from contextlib import redirect_stdout
+
+from Aircraft import Aircraft, Airbus, Boeing
+from AsyncFlightRegistry import AsyncFlightRegistry
+from Flight import Flight
+from FlightRegistry import FlightRegistry
+from Manifest import write_manifest
+
+# Benchmarks registrados {nombre: función}
+BENCHMARKS = {}
+
+SEATS_777 = [f"{row}{letter}" for row in range(1, 57) for letter in "ABCDEFGHI"]
+
+
+class NullSink:
+    """
+    Destino de escritura que descarta todo (como /dev/null, sin llamadas al sistema).
+    """
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def benchmark(name):
+    """
+    Decorador que registra un benchmark. La función recibe la escala y
+    devuelve (operación, número de operaciones): la operación es una función
+    sin argumentos que se mide, y se llama una vez por repetición.
+
+    Args:
+        name (str): Nombre del benchmark en los resultados.
+    """
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def _passenger(i):
+    return ("Jack", "Shephard", f"{i:08d}X")
+
+
+def _construct(make_aircraft, count, engine="dict"):
+    """
+    Prepara la creación de count vuelos con aeronaves de make_aircraft.
+    """
+    def operation():
+        for i in range(count):
+            Flight(f"BA{i % 9998 + 1}", make_aircraft(i), engine=engine)
+    return operation, count
+
+
+@benchmark("construct.aircraft")
+def bench_construct_aircraft(scale):
+    return _construct(lambda i: Aircraft(f"G-{i}", "Embraer E190", 25, 4), int(10_000 * scale))
+
+
+@benchmark("construct.airbus")
+def bench_construct_airbus(scale):
+    return _construct(lambda i: Airbus(f"G-{i}", "A319-100"), int(10_000 * scale))
+
+
+@benchmark("construct.boeing")
+def bench_construct_boeing(scale):
+    return _construct(lambda i: Boeing(f"F-{i}", "Emirates"), int(10_000 * scale))
+
+
+@benchmark("construct.sparse")
+def bench_construct_sparse(scale):
+    return _construct(lambda i: Boeing(f"F-{i}", "Emirates"), int(10_000 * scale), engine="sparse")
+
+
+@benchmark("allocate_passenger")
+def bench_allocate(scale):
+    num_flights = max(1, int(40 * scale))
+
+    def operation():
+        for n in range(num_flights):
+            flight = Flight("AF72", Boeing(f"F-{n}", "Emirates"))
+            for i, seat in enumerate(SEATS_777):
+                flight.allocate_passenger(seat, _passenger(i))
+    return operation, num_flights * len(SEATS_777)
+
+
+@benchmark("reallocate_passenger")
+def bench_reallocate(scale):
+    flight = Flight("AF72", Boeing("F-GSPS", "Emirates"))
+    half = len(SEATS_777) // 2
+    for i, seat in enumerate(SEATS_777[:half]):
+        flight.allocate_passenger(seat, _passenger(i))
+    rounds = max(1, int(40 * scale))
+
+    def operation():
+        # Ida y vuelta: el vuelo queda como estaba para la siguiente repetición
+        for _ in range(rounds):
+            for from_seat, to_seat in zip(SEATS_777[:half], SEATS_777[half:]):
+                flight.reallocate_passenger(from_seat, to_seat)
+            for from_seat, to_seat in zip(SEATS_777[half:], SEATS_777[:half]):
+                flight.reallocate_passenger(from_seat, to_seat)
+    return operation, rounds * 2 * half
+
+
+@benchmark("cancel_many")
+def bench_cancel_many(scale):
+    num_flights = max(1, int(40 * scale))
+    bookings = [(seat, _passenger(i)) for i, seat in enumerate(SEATS_777)]
+    flights = [Flight("AF72", Boeing(f"F-{n}", "Emirates")) for n in range(num_flights)]
+
+    def operation():
+        # Llenar y vaciar cada vuelo: la ocupación final es la inicial
+        for flight in flights:
+            flight.allocate_many(bookings)
+            flight.cancel_many(SEATS_777)
+    return operation, num_flights * len(SEATS_777)
+
+
+@benchmark("manifest.import")
+def bench_manifest_import(scale):
+    num_flights = max(1, int(40 * scale))
+    numbers = [f"AF{n + 1}" for n in range(num_flights)]
+    # Filas intercaladas entre vuelos, como en un manifiesto de toda la flota
+    rows = [(numbers[n], seat, *_passenger(i))
+            for i, seat in enumerate(SEATS_777) for n in range(num_flights)]
+    sink = io.StringIO()
+    write_manifest(rows, sink)
+    text = sink.getvalue()
+
+    def operation():
+        registry = FlightRegistry(Flight(number, Boeing(f"F-{number}", "Emirates"), engine="bitmap")
+                                  for number in numbers)
+        registry.import_manifest(io.StringIO(text))
+    return operation, len(rows)
+
+
+@benchmark("num_available_seats")
+def bench_num_available_seats(scale):
+    flight = Flight("AF72", Boeing("F-GSPS", "Emirates"))
+    for i, seat in enumerate(SEATS_777[::2]):
+        flight.allocate_passenger(seat, _passenger(i))
+    count = int(200_000 * scale)
+
+    def operation():
+        for _ in range(count):
+            flight.num_available_seats()
+    return operation, count
+
+
+@benchmark("print_boarding_cards")
+def bench_print_boarding_cards(scale):
+    num_flights = max(1, int(20 * scale))
+    flights = []
+    for n in range(num_flights):
+        flight = Flight("AF72", Boeing(f"F-{n}", "Emirates"))
+        flight.allocate_many([(seat, _passenger(i)) for i, seat in enumerate(SEATS_777)])
+        flights.append(flight)
+    sink = NullSink()
+
+    def operation():
+        with redirect_stdout(sink):
+            for flight in flights:
+                flight.print_boarding_cards()
+    return operation, num_flights * len(SEATS_777)
+
+
+@benchmark("async.allocate")
+def bench_async_allocate(scale):
+    num_flights = max(1, int(20 * scale))
+    numbers = [f"AF{n + 1}" for n in range(num_flights)]
+
+    async def allocate_all(registry):
+        # Dos clientes compiten por cada asiento: la mitad de las peticiones falla
+        requests = [registry.allocate(number, seat, ("Jack", "Shephard", f"{number}-{seat}-{client}"))
+                    for number in numbers for seat in SEATS_777 for client in range(2)]
+        await asyncio.gather(*requests, return_exceptions=True)
+
+    def operation():
+        registry = AsyncFlightRegistry(Flight(number, Boeing(f"F-{number}", "Emirates")) for number in numbers)
+        asyncio.run(allocate_all(registry))
+    return operation, num_flights * len(SEATS_777) * 2
+
+
+@benchmark("fleet.registry")
+def bench_fleet_registry(scale):
+    num_flights = max(1, int(1_000 * scale))
+    bookings = [(seat, _passenger(i)) for i, seat in enumerate(SEATS_777[:400])]
+
+    def operation():
+        registry = FlightRegistry()
+        for n in range(num_flights):
+            flight = Flight(f"AF{n % 9998 + 1}", Boeing(f"F-{n}", "Emirates"), engine="bitmap")
+            registry.add_flight(flight)
+            flight.allocate_many(bookings)
+        registry.total_free_seats()
+        registry.flights_with_free_seats(100)
+    return operation, num_flights * len(bookings)
+
+
+@benchmark("fleet.analytics")
+def bench_fleet_analytics(scale):
+    try:
+        from FleetAnalytics import FleetOccupancy
+    except ImportError:
+        return None  # numpy no está instalado
+    num_flights = max(1, int(2_000 * scale))
+    bookings = [(seat, _passenger(i)) for i, seat in enumerate(SEATS_777[:400])]
+    flights = []
+    for n in range(num_flights):
+        flight = Flight(f"AF{n % 9998 + 1}", Boeing(f"F-{n}", "Emirates"), engine="bitmap")
+        flight.allocate_many(bookings)
+        flights.append(flight)
+
+    def operation():
+        fleet = FleetOccupancy(flights)
+        fleet.load_factor_by_model()
+        fleet.load_factor_by_letter()
+        fleet.row_heatmap("Boeing 777")
+    return operation, num_flights
+
+
+def run_benchmarks(names=None, repeat=5, scale=1.0):
+    """
+    Ejecuta los benchmarks.
+
+    Args:
+        names (iterable): Benchmarks a ejecutar (todos si es None).
+        repeat (int): Repeticiones de cada uno; se guarda la mejor.
+        scale (float): Factor de tamaño de los datos (p.e. 0.1 para una pasada rápida).
+
+    Returns:
+        dict: {nombre: {'seconds', 'ops', 'ops_per_sec'}}. Los benchmarks
+              que no se pueden ejecutar (dependencia opcional ausente) no aparecen.
+
+    Raises:
+        ValueError: Si algún nombre no es un benchmark registrado o repeat < 1.
+    """
+    if repeat < 1:
+        raise ValueError(f"El número de repeticiones (repeat={repeat}) debe ser al menos 1.")
+    names = list(BENCHMARKS) if names is None else list(names)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Benchmark '{name}' desconocido (opciones: {', '.join(BENCHMARKS)}).")
+
+    results = {}
+    for name in names:
+        prepared = BENCHMARKS[name](scale)
+        if prepared is None:
+            continue
+        operation, ops = prepared
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = {"seconds": best, "ops": ops, "ops_per_sec": ops / best if best else None}
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compara unos resultados con la línea base. Se compara el tiempo por
+    operación, así que los resultados con otra escala siguen siendo comparables.
+
+    Args:
+        results (dict): Resultados de run_benchmarks().
+        baseline (dict): Resultados guardados de la línea base.
+        tolerance (float): Fracción de empeoramiento admitida (0.2 = 20%).
+
+    Returns:
+        list: Tuplas (nombre, ratio) de los benchmarks más lentos que la base
+              por encima de la tolerancia; ratio = tiempo actual / tiempo base.
+    """
+    regressions = []
+    for name, result in results.items():
+        ratio = _ratio(result, baseline.get(name))
+        if ratio is not None and ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def _ratio(result, base):
+    """
+    Calcula el tiempo por operación de un resultado respecto a la línea base.
+
+    Args:
+        result (dict): Resultado de run_benchmarks().
+        base (dict): Resultado de la línea base, o None si no lo hay.
+
+    Returns:
+        float: Tiempo actual / tiempo base, o None si no se puede calcular
+               (sin base, o con tiempos u operaciones a cero o ausentes).
+    """
+    if not base or not base.get("seconds") or not base.get("ops") or not result["ops"]:
+        return None
+    return (result["seconds"] / result["ops"]) / (base["seconds"] / base["ops"])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks del modelo de reservas.")
+    parser.add_argument("--output", help="fichero JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="fichero JSON con la línea base a comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="empeoramiento admitido (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="repeticiones de cada benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor de tamaño de los datos")
+    parser.add_argument("--filter", default="", help="ejecuta solo los benchmarks cuyo nombre lo contenga")
+    args = parser.parse_args(argv[1:])
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, repeat=args.repeat, scale=args.scale)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    for name, result in results.items():
+        rate = result["ops_per_sec"]
+        rate = "n/a" if rate is None else f"{rate:,.0f}"
+        line = f"{name:<24} {result['seconds']:9.4f} s {rate:>14} ops/s"
+        if name in baseline:
+            ratio = _ratio(result, baseline[name])
+            line += "    n/a base" if ratio is None else f"  x{ratio:5.2f} base"
+        print(line)
+
+    if args.output:
+        report = {"python": platform.python_version(), "machine": platform.machine(),
+                  "scale": args.scale, "results": results}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, ratio in regressions:
+        print(f"REGRESIÓN: {name} es x{ratio:.2f} más lento que la línea base", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -7,13 +7,15 @@
 """
 Módulo principal que define la función make_flights() para crear vuelos de
 ejemplo con distintos tipos de aeronaves (Aircraft, Airbus, Boeing) y asignar
-pasajeros (Passenger) a sus asientos. También se encarga de mostrar la
+pasajeros (Passenger) a sus asientos, y make_registry() para agruparlos en un
+FlightRegistry. También se encarga de mostrar la
 información de cada vuelo.
 """
 
 from Flight import Flight
 from Aircraft import Aircraft, Airbus, Boeing
 from Passenger import Passenger
+from FlightRegistry import FlightRegistry
 
 def make_flights():
     """
@@ -74,6 +76,16 @@ def make_flights():
     return f1, f2, f3
 
 
+def make_registry():
+    """
+    Crea un FlightRegistry con los vuelos de ejemplo de make_flights().
+
+    Returns:
+        FlightRegistry: Registro con los tres vuelos de ejemplo.
+    """
+    return FlightRegistry(make_flights())
+
+
 if __name__ == "__main__":
     f1, f2, f3 = make_flights()
 
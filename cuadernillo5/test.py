@@ -4,13 +4,46 @@
 # Descripción: Conjunto de pruebas unitarias para la aplicación de gestión de vuelos.
 # ============================================================================
 
+import asyncio
+import io
+import json
+import os
+import pickle
+import stat
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
 # Importa las clases que vas a probar.
 # Ajusta los nombres de módulos/clases según tu proyecto.
 from Flight import Flight
 from Aircraft import Aircraft, Airbus, Boeing
-from Passenger import Passenger
+from SeatLayout import SeatLayout
+from contextlib import redirect_stdout
+from functools import partial
+
+from Passenger import Passenger, PassengerTable
+from SeatMap import BitmapSeatMap, CompactSeatMap, DictSeatMap
+from BookingJournal import BookingJournal, read_journal
+from SQLiteSeatStore import SQLiteSeatStore
+from ShardedInventory import ShardedInventory
+from SeatGrid import SeatGrid
+import Snapshot
+import benchmark
+from Metrics import InMemoryMetrics
+from Manifest import ManifestReport, write_manifest
+from AsyncFlightRegistry import AsyncFlightRegistry
+from FlightRegistry import FlightRegistry
+from BoardingCards import write_fleet_boarding_cards
+
+try:
+    import numpy
+    from FleetAnalytics import FleetOccupancy, occupancy_array
+except ImportError:  # numpy es opcional: sus pruebas se saltan
+    numpy = None
 
 
 class TestFlightCreation(unittest.TestCase):
@@ -80,6 +113,40 @@ class TestPassengerAllocation(unittest.TestCase):
             self.flight.allocate_passenger("2E", self.p1.passenger_data())
 
 
+class TestAllocateMany(unittest.TestCase):
+    """Pruebas de la asignación en lote Flight.allocate_many()."""
+
+    def setUp(self):
+        aircraft = Aircraft(registration="G-EUAH", model="Airbus A319", num_rows=5, num_seats_per_row=4)
+        self.flight = Flight(number="BA103", aircraft=aircraft)
+        self.p1 = Passenger("Jack", "Shephard", "85994003S").passenger_data()
+        self.p2 = Passenger("Kate", "Austen", "12589756P").passenger_data()
+        self.p3 = Passenger("James", "Ford", "56278665F").passenger_data()
+
+    def test_allocate_many_valid(self):
+        """Comprueba que se asigna el lote completo."""
+        self.flight.allocate_many([("1A", self.p1), ("1B", self.p2), ("5D", self.p3)])
+        seating = self.flight.get_seating()
+        self.assertEqual(seating[1]["A"], self.p1)
+        self.assertEqual(seating[5]["D"], self.p3)
+        self.assertEqual(self.flight.num_available_seats(), 17)
+        self.assertEqual(self.flight.num_available_seats_in_row(1), 2)
+
+    def test_allocate_many_all_or_nothing(self):
+        """Comprueba que un lote con errores no modifica el vuelo."""
+        self.flight.allocate_passenger("2C", self.p1)
+        bad_batches = [
+            [("1A", self.p2), ("2C", self.p3)],   # asiento ya ocupado
+            [("1A", self.p2), ("1A", self.p3)],   # asiento repetido en el lote
+            [("1A", self.p2), ("9A", self.p3)],   # fila inexistente
+        ]
+        for batch in bad_batches:
+            with self.assertRaises(ValueError):
+                self.flight.allocate_many(batch)
+            self.assertIsNone(self.flight.get_seating()[1]["A"])
+            self.assertEqual(self.flight.num_available_seats(), 19)
+
+
 class TestPassengerReallocation(unittest.TestCase):
     """Pruebas relacionadas con la reasignación de pasajeros."""
 
@@ -113,6 +180,1245 @@ class TestPassengerReallocation(unittest.TestCase):
             self.flight.reallocate_passenger("1A", "2B")
 
 
+class TestPassengerIndex(unittest.TestCase):
+    """Pruebas del índice inverso pasajero -> asiento."""
+
+    def setUp(self):
+        aircraft = Aircraft(registration="G-EUAH", model="Airbus A319", num_rows=3, num_seats_per_row=3)
+        self.flight = Flight(number="BA104", aircraft=aircraft)
+        self.p1 = Passenger("James", "Ford", "56278665F").passenger_data()
+        self.p2 = Passenger("Hugo", "Reyes", "89765432T").passenger_data()
+        self.flight.allocate_passenger("1A", self.p1)
+
+    def test_find_seat(self):
+        """Comprueba que se encuentra el asiento tras asignar y reasignar."""
+        self.assertEqual(self.flight.find_seat("56278665F"), "1A")
+        self.assertIsNone(self.flight.find_seat("89765432T"))
+        self.flight.reallocate_passenger("1A", "3C")
+        self.assertEqual(self.flight.find_seat("56278665F"), "3C")
+
+    def test_reallocate_by_passenger(self):
+        """Comprueba la reasignación a partir del documento del pasajero."""
+        self.flight.reallocate_by_passenger("56278665F", "2B")
+        self.assertEqual(self.flight.get_seating()[2]["B"], self.p1)
+        self.assertIsNone(self.flight.get_seating()[1]["A"])
+        with self.assertRaises(ValueError):
+            self.flight.reallocate_by_passenger("89765432T", "2C")
+
+    def test_reject_double_booking(self):
+        """Comprueba que un pasajero no puede ocupar dos asientos del mismo vuelo."""
+        with self.assertRaises(ValueError):
+            self.flight.allocate_passenger("2A", self.p1)
+        with self.assertRaises(ValueError):
+            self.flight.allocate_many([("2A", self.p2), ("2B", self.p2)])
+        self.assertEqual(self.flight.num_available_seats(), 8)
+
+
+class TestAutoAllocate(unittest.TestCase):
+    """Pruebas de la asignación automática de asientos."""
+
+    def setUp(self):
+        aircraft = Aircraft(registration="G-EUAH", model="Airbus A319", num_rows=3, num_seats_per_row=6)
+        self.flight = Flight(number="BA105", aircraft=aircraft)
+        self.passengers = [("Name", "Surname", f"ID{i}") for i in range(20)]
+
+    def test_auto_allocate_preferences(self):
+        """Comprueba que se elige el mejor asiento libre de cada tipo."""
+        self.assertEqual(self.flight.auto_allocate(self.passengers[0]), "1A")
+        self.assertEqual(self.flight.auto_allocate(self.passengers[1], preference="window"), "1F")
+        self.assertEqual(self.flight.auto_allocate(self.passengers[2], preference="aisle"), "1C")
+        self.assertEqual(self.flight.auto_allocate(self.passengers[3], preference="aisle"), "1D")
+        self.assertEqual(self.flight.auto_allocate(self.passengers[4], preference="window"), "2A")
+        self.assertEqual(self.flight.find_seat("ID4"), "2A")
+
+    def test_auto_allocate_reuses_freed_seat(self):
+        """Comprueba que un asiento liberado vuelve a estar disponible."""
+        self.flight.auto_allocate(self.passengers[0], preference="window")  # 1A
+        self.flight.reallocate_passenger("1A", "3B")
+        self.assertEqual(self.flight.auto_allocate(self.passengers[1], preference="window"), "1A")
+
+    def test_auto_allocate_full(self):
+        """Comprueba que se lanza ValueError cuando no quedan asientos del tipo pedido."""
+        for passenger in self.passengers[:6]:
+            self.flight.auto_allocate(passenger, preference="window")
+        with self.assertRaises(ValueError):
+            self.flight.auto_allocate(self.passengers[6], preference="window")
+        with self.assertRaises(ValueError):
+            self.flight.auto_allocate(self.passengers[6], preference="middle")
+
+    def test_auto_allocate_together(self):
+        """Comprueba que un grupo se sienta junto, en un bloque o cruzando el pasillo."""
+        self.flight.allocate_passenger("1B", self.passengers[0])
+        seats = self.flight.auto_allocate(self.passengers[1:4], together=3)
+        self.assertEqual(seats, ["1D", "1E", "1F"])
+        seats = self.flight.auto_allocate(self.passengers[4:6], together=2, preference="window")
+        self.assertEqual(seats, ["2A", "2B"])
+        seats = self.flight.auto_allocate(self.passengers[6:10], together=4)
+        self.assertEqual(seats, ["2C", "2D", "2E", "2F"])
+        with self.assertRaises(ValueError):
+            self.flight.auto_allocate(self.passengers[10:12], together=3)
+
+
+class TestConcurrentBooking(unittest.TestCase):
+    """Pruebas de estrés del modo concurrente (concurrent=True)."""
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        # Cambios de hilo muy frecuentes para provocar carreras
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def run_threads(self, target, num_threads=8):
+        threads = [threading.Thread(target=target, args=(t,)) for t in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_no_double_booking(self):
+        """Comprueba que varios hilos compitiendo por los mismos asientos nunca los duplican."""
+        for engine in ("dict", "sparse", "bitmap"):
+            flight = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"),
+                            engine=engine, concurrent=True)
+            seats = [f"{row}{letter}" for row in range(1, 57) for letter in "ABCDEFGHI"]
+            booked = []
+
+            def worker(t):
+                for i, seat in enumerate(seats):
+                    try:
+                        flight.allocate_passenger(seat, ("Name", "Surname", f"{t}-{i}"))
+                    except ValueError:
+                        continue
+                    booked.append(seat)
+
+            self.run_threads(worker)
+            self.assertEqual(sorted(booked), sorted(seats))
+            self.assertEqual(flight.num_available_seats(), 0)
+            self.assertEqual(sum(flight.num_available_seats_in_row(r) for r in range(1, 57)), 0)
+
+    def test_same_passenger_in_different_rows(self):
+        """Comprueba que un pasajero que compite por filas distintas solo se sienta una vez."""
+        def slow(seat_map):
+            # Motor que tarda en escribir: todos los hilos pasan la comprobación previa
+            class SlowSeatMap(seat_map):
+                def put(self, index, passenger):
+                    time.sleep(0.001)
+                    super().put(index, passenger)
+            return SlowSeatMap
+
+        for engine in (slow(DictSeatMap), slow(BitmapSeatMap)):
+            flight = Flight(number="BA106", aircraft=Airbus(registration="G-EUPT", variant="A319-100"),
+                            engine=engine, concurrent=True)
+            passenger = ("Jack", "Shephard", "85994003S")
+            booked = []
+
+            def worker(t):
+                try:
+                    flight.allocate_passenger(f"{t + 1}A", passenger)
+                except ValueError:
+                    return
+                booked.append(f"{t + 1}A")
+
+            self.run_threads(worker)
+            self.assertEqual(len(booked), 1)
+            self.assertEqual(flight.find_seat("85994003S"), booked[0])
+            self.assertEqual(flight.num_available_seats(), 23 * 6 - 1)
+            self.assertEqual(flight.changes_since(None)[2], [(booked[0], passenger)])
+            self.assertEqual(flight.render_seating().count("X"), 1)
+
+    def test_passenger_operations_after_move(self):
+        """Comprueba que cancel_passenger y reallocate_by_passenger no actúan sobre quien ocupa el asiento que el pasajero dejó."""
+        class SlowSeatMap(DictSeatMap):
+            def put(self, index, passenger):
+                time.sleep(0.002)
+                super().put(index, passenger)
+
+        operations = (lambda flight: flight.cancel_passenger("85994003S"),
+                      lambda flight: flight.reallocate_by_passenger("85994003S", "3A"))
+        for operation in operations:
+            for _ in range(10):
+                flight = Flight(number="BA1", aircraft=Aircraft(registration="F-1", model="Test",
+                                                                num_rows=3, num_seats_per_row=1),
+                                engine=SlowSeatMap, concurrent=True)
+                flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+                results = []
+
+                def worker(t):
+                    if t == 0:
+                        # Mueve al pasajero y sienta a otro en su antiguo asiento
+                        flight.reallocate_passenger("1A", "2A")
+                        flight.allocate_passenger("1A", ("Kate", "Austen", "12589756P"))
+                        return
+                    time.sleep(0.001)
+                    try:
+                        results.append(operation(flight))
+                    except ValueError:
+                        results.append(None)
+
+                self.run_threads(worker, num_threads=2)
+                self.assertIn(results[0], (None, ("Jack", "Shephard", "85994003S")))
+                self.assertEqual(flight.find_seat("12589756P"), "1A")
+
+    def test_registry_free_index_under_concurrent_bookings(self):
+        """Comprueba que el índice de asientos libres del registro sigue correcto con avisos simultáneos."""
+        for _ in range(20):
+            flights = [Flight(number=f"AF{n}", aircraft=Aircraft(registration=f"F-{n}", model="Test",
+                                                                 num_rows=4, num_seats_per_row=4),
+                              concurrent=True) for n in (1, 2)]
+            registry = FlightRegistry(flights)
+
+            def worker(t):
+                for i in range(4):
+                    try:
+                        flights[0].auto_allocate(("Name", "Surname", f"{t}-{i}"))
+                    except ValueError:
+                        pass
+
+            self.run_threads(worker)
+            self.assertEqual(flights[0].num_available_seats(), 0)
+            self.assertEqual(registry.flights_with_free_seats(0), [flights[0], flights[1]])
+            self.assertEqual(registry.flights_with_free_seats(1), [flights[1]])
+            self.assertEqual(registry.total_free_seats(), 16)
+
+    def test_concurrent_auto_allocate_and_reallocate(self):
+        """Comprueba auto_allocate y reallocate_passenger concurrentes sin perder pasajeros."""
+        flight = Flight(number="BA106", aircraft=Airbus(registration="G-EUPT", variant="A319-100"),
+                        engine="bitmap", concurrent=True)
+        results = []
+
+        def worker(t):
+            for i in range(17):
+                seat = flight.auto_allocate(("Name", "Surname", f"{t}-{i}"))
+                results.append(seat)
+
+        self.run_threads(worker)
+        self.assertEqual(len(set(results)), 8 * 17)
+        self.assertEqual(flight.num_available_seats(), 23 * 6 - 8 * 17)
+
+        free = [f"{row}{letter}" for row in (23,) for letter in "ABCDEF"
+                if flight.get_seating()[row][letter] is None]
+        moved = []
+
+        def mover(t):
+            try:
+                flight.reallocate_by_passenger(f"{t}-0", free[0])
+            except ValueError:
+                return
+            moved.append(t)
+
+        self.run_threads(mover)
+        self.assertEqual(len(moved), 1)
+        self.assertEqual(flight.find_seat(f"{moved[0]}-0"), free[0])
+        self.assertEqual(flight.num_available_seats(), 23 * 6 - 8 * 17)
+
+
+class TestAsyncFlightRegistry(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del registro asíncrono de vuelos con un generador de carga local."""
+
+    async def asyncSetUp(self):
+        # IsolatedAsyncioTestCase activa el modo debug de asyncio, que falsea el rendimiento
+        asyncio.get_running_loop().set_debug(False)
+        self.registry = AsyncFlightRegistry([
+            Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates")),
+            Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100")),
+        ])
+
+    async def test_load_generator(self):
+        """Lanza miles de peticiones concurrentes y comprueba que todas se procesan en orden."""
+        # El ritmo de peticiones se mide en benchmark.py (async.allocate), no aquí
+        requests = []
+        for number, rows, letters in (("AF92", 56, "ABCDEFGHI"), ("BA148", 23, "ABCDEF")):
+            for row in range(1, rows + 1):
+                for letter in letters:
+                    seat = f"{row}{letter}"
+                    # Dos clientes compiten por cada asiento: gana el primero en llegar
+                    for client in range(2):
+                        passenger = ("Name", "Surname", f"{number}-{seat}-{client}")
+                        requests.append(self.registry.allocate(number, seat, passenger))
+        requests += [self.registry.availability("AF92") for _ in range(1000)]
+
+        results = await asyncio.gather(*requests, return_exceptions=True)
+
+        self.assertEqual(len(results), len(requests))
+        allocations = results[:-1000]
+        self.assertEqual(allocations[0::2], [None] * (56 * 9 + 23 * 6))
+        self.assertTrue(all(isinstance(r, ValueError) for r in allocations[1::2]))
+        self.assertEqual(results[-1000:], [0] * 1000)
+        self.assertEqual(self.registry.get_flight("AF92").find_seat("AF92-56I-0"), "56I")
+        self.assertEqual(await self.registry.availability("BA148"), 0)
+
+    async def test_reallocate_and_errors(self):
+        """Comprueba la reasignación y los errores de vuelos desconocidos."""
+        await self.registry.allocate("BA148", "1A", ("Jack", "Shephard", "85994003S"))
+        await self.registry.reallocate("BA148", "1A", "2B")
+        self.assertEqual(self.registry.get_flight("BA148").find_seat("85994003S"), "2B")
+        self.assertEqual(await self.registry.availability("BA148"), 23 * 6 - 1)
+        with self.assertRaises(ValueError):
+            await self.registry.reallocate("BA148", "1A", "3C")
+        with self.assertRaises(ValueError):
+            await self.registry.availability("XX1")
+
+    async def test_bad_request_does_not_block_batch(self):
+        """Comprueba que una petición que lanza otra excepción no bloquea las demás del lote."""
+        bad = self.registry.allocate("BA148", "1A", None)
+        good = self.registry.allocate("BA148", "1A", ("Jack", "Shephard", "85994003S"))
+        free = self.registry.availability("BA148")
+        results = await asyncio.wait_for(asyncio.gather(bad, good, free, return_exceptions=True), 1)
+        self.assertIsInstance(results[0], TypeError)
+        self.assertEqual(results[1:], [None, 23 * 6 - 1])
+
+
+class TestFlightRegistry(unittest.TestCase):
+    """Pruebas del registro de flota FlightRegistry."""
+
+    def setUp(self):
+        self.emirates = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"))
+        self.airbus = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        self.small = Flight(number="BA117", aircraft=Aircraft(registration="G-EUAH", model="Airbus A319",
+                                                              num_rows=2, num_seats_per_row=2))
+        self.registry = FlightRegistry([self.emirates, self.airbus, self.small])
+
+    def test_indexes(self):
+        """Comprueba las búsquedas por número, matrícula, aerolínea y variante."""
+        self.assertIs(self.registry.get_flight("AF92"), self.emirates)
+        self.assertEqual(self.registry.flights_by_registration("G-EUPT"), [self.airbus])
+        self.assertEqual(self.registry.flights_by_airline("Emirates"), [self.emirates])
+        self.assertEqual(self.registry.flights_by_variant("A319-100"), [self.airbus])
+        self.assertEqual(self.registry.flights_by_airline("Iberia"), [])
+        with self.assertRaises(ValueError):
+            self.registry.get_flight("ba117")  # número mal formado
+        with self.assertRaises(ValueError):
+            self.registry.get_flight("BA999")  # no registrado
+        with self.assertRaises(ValueError):
+            self.registry.add_flight(self.small)
+
+    def test_free_seat_index_follows_bookings(self):
+        """Comprueba que el índice de asientos libres sigue las reservas de los vuelos."""
+        self.assertEqual(self.registry.flights_with_free_seats(100), [self.airbus, self.emirates])
+        self.assertEqual(self.registry.flights_with_free_seats(4), [self.small, self.airbus, self.emirates])
+
+        self.small.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        self.assertEqual(self.registry.flights_with_free_seats(4), [self.airbus, self.emirates])
+        self.assertEqual(self.registry.total_free_seats(), 3 + 23 * 6 + 56 * 9)
+
+        self.registry.remove_flight("BA117")
+        self.assertNotIn("BA117", self.registry)
+        self.small.allocate_passenger("1B", ("Kate", "Austen", "12589756P"))
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(self.registry.flights_with_free_seats(0), [self.airbus, self.emirates])
+
+
+class TestBoardingCards(unittest.TestCase):
+    """Pruebas de la generación de tarjetas de embarque por lotes."""
+
+    def setUp(self):
+        self.flight = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        self.flight.allocate_passenger("5F", ("James", "Ford", "56278665F"))
+        self.flight.allocate_passenger("1C", ("John", "Locke", "10265448H"))
+
+    def test_box_format_matches_print(self):
+        """Comprueba que el formato 'box' coincide con print_boarding_cards()."""
+        sink = io.StringIO()
+        self.assertEqual(self.flight.write_boarding_cards(sink), 2)
+        lines = sink.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[1], "|  John Locke 10265448H 1C BA148 Airbus A319  |")
+        self.assertEqual(lines[4], "|  James Ford 56278665F 5F BA148 Airbus A319  |")
+
+    def test_csv_and_jsonl(self):
+        """Comprueba los formatos CSV y JSON lines."""
+        sink = io.StringIO()
+        self.flight.write_boarding_cards(sink, fmt="csv")
+        self.assertEqual(sink.getvalue().splitlines(), [
+            "name,surname,id_card,seat,flight,model",
+            "John,Locke,10265448H,1C,BA148,Airbus A319",
+            "James,Ford,56278665F,5F,BA148,Airbus A319",
+        ])
+        cards = [json.loads(line) for line in self.flight.iter_boarding_cards("jsonl")]
+        self.assertEqual(cards[1]["seat"], "5F")
+        self.assertEqual(cards[1]["model"], "Airbus A319")
+        with self.assertRaises(ValueError):
+            self.flight.write_boarding_cards(sink, fmt="xml")
+
+    def test_fleet_to_binary_sink_in_batches(self):
+        """Comprueba la escritura de una flota en un destino binario, una escritura por lote."""
+        other = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"))
+        other.allocate_many((f"{row}A", ("Name", "Surname", f"ID{row}")) for row in range(1, 11))
+
+        class CountingSink(io.BytesIO):
+            writes = 0
+
+            def write(self, data):
+                CountingSink.writes += 1
+                return super().write(data)
+
+        sink = CountingSink()
+        self.assertEqual(write_fleet_boarding_cards([self.flight, other], sink, fmt="jsonl", batch_size=5), 12)
+        self.assertEqual(CountingSink.writes, 3)
+        self.assertEqual(len(sink.getvalue().decode("utf-8").splitlines()), 12)
+
+
+class TestCompactPassengers(unittest.TestCase):
+    """Pruebas de Passenger con __slots__, PassengerTable y el motor 'compact'."""
+
+    def test_passenger_slots(self):
+        """Comprueba que Passenger no tiene __dict__ por instancia."""
+        passenger = Passenger("Jack", "Shephard", "85994003S")
+        self.assertFalse(hasattr(passenger, "__dict__"))
+        self.assertEqual(passenger.passenger_data(), ("Jack", "Shephard", "85994003S"))
+
+    def test_passenger_table(self):
+        """Comprueba el alta, consulta, baja y reutilización de handles."""
+        table = PassengerTable()
+        h1 = table.add(("Jack", "Shephard", "85994003S"))
+        h2 = table.add(("".join(["Ja", "ck"]), "Austen", "12589756P"))
+        self.assertEqual(table.get(h2), ("Jack", "Austen", "12589756P"))
+        self.assertIs(table.get(h1)[0], table.get(h2)[0])  # nombre internado
+        self.assertEqual(table.remove(h1), ("Jack", "Shephard", "85994003S"))
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.add(("Hugo", "Reyes", "89765432T")), h1)
+
+    def test_compact_engine_with_shared_table(self):
+        """Comprueba dos vuelos con motor 'compact' compartiendo una tabla."""
+        table = PassengerTable()
+        engine = partial(CompactSeatMap, table=table)
+        f1 = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"), engine=engine)
+        f2 = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"), engine="compact")
+        f1.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        f1.allocate_passenger("2B", ("Kate", "Austen", "12589756P"))
+        f2.allocate_passenger("3C", ("James", "Ford", "56278665F"))
+        self.assertEqual(len(table), 2)
+
+        f1.reallocate_passenger("1A", "9I")
+        self.assertEqual(f1.get_seating()[9]["I"], ("Jack", "Shephard", "85994003S"))
+        self.assertEqual(f1.find_seat("85994003S"), "9I")
+        self.assertEqual(len(table), 2)
+        self.assertEqual(f2.num_available_seats(), 23 * 6 - 1)
+
+
+class TestSnapshot(unittest.TestCase):
+    """Pruebas de Flight.save() y Flight.load()."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "flight.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_round_trip(self, flight, engine="dict"):
+        flight.save(self.path)
+        loaded = Flight.load(self.path, engine=engine)
+        self.assertEqual(loaded.get_number(), flight.get_number())
+        self.assertEqual(type(loaded.get_aircraft()), type(flight.get_aircraft()))
+        self.assertEqual(loaded.get_aircraft().get_registration(), flight.get_aircraft().get_registration())
+        self.assertEqual(loaded.get_seating(), flight.get_seating())
+        self.assertEqual(loaded.num_available_seats(), flight.num_available_seats())
+        return loaded
+
+    def test_round_trip_airbus(self):
+        """Comprueba la ida y vuelta de un Airbus con pasajeros."""
+        flight = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        flight.allocate_passenger("5F", ("James", "Ford", "56278665F"))
+        flight.allocate_passenger("23A", ("Sayid", "Jarrah", "15758664M"))
+        loaded = self.assert_round_trip(flight)
+        self.assertEqual(loaded.get_aircraft().get_variant(), "A319-100")
+        self.assertEqual(loaded.find_seat("15758664M"), "23A")
+
+    def test_round_trip_boeing(self):
+        """Comprueba la ida y vuelta de un Boeing lleno, con nombres no ASCII y motor bitmap."""
+        flight = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"),
+                        engine="bitmap")
+        flight.allocate_many((f"{row}{letter}", ("Begoña", "Núñez", f"{row}{letter}X"))
+                             for row in range(1, 57) for letter in "ABCDEFGHI")
+        loaded = self.assert_round_trip(flight, engine="bitmap")
+        self.assertEqual(loaded.get_aircraft().get_airline(), "Emirates")
+        self.assertEqual(loaded.num_available_seats(), 0)
+
+    def test_round_trip_empty_aircraft(self):
+        """Comprueba la ida y vuelta de un vuelo vacío con Aircraft genérico."""
+        aircraft = Aircraft(registration="G-EUAH", model="Airbus A319", num_rows=22, num_seats_per_row=6)
+        loaded = self.assert_round_trip(Flight(number="BA117", aircraft=aircraft))
+        self.assertEqual(loaded.get_aircraft().get_model(), "Airbus A319")
+
+    def test_mmap_load_is_lazy(self):
+        """Comprueba que engine='mmap' no decodifica pasajeros al abrir ni al contar asientos."""
+        flight = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"))
+        flight.allocate_many((f"{row}{letter}", ("Begoña", "Núñez", f"{row}{letter}X"))
+                             for row in range(1, 41) for letter in "ABCDEFGHI")
+        flight.save(self.path)
+        with mock.patch("Snapshot._unpack_str", wraps=Snapshot._unpack_str) as unpack:
+            loaded = Flight.load(self.path, engine="mmap")
+            self.assertEqual(loaded.num_available_seats(), flight.num_available_seats())
+            self.assertEqual(loaded.num_available_seats_in_row(7), 0)
+            self.assertEqual(loaded.num_available_seats_in_row(50), 9)
+            # Solo las cadenas de la cabecera: vuelo, matrícula, modelo y aerolínea
+            self.assertEqual(unpack.call_count, 4)
+        self.assertEqual(loaded.get_version(), flight.get_version())
+        self.assertEqual(loaded.find_seat("40IX"), "40I")
+        self.assertEqual(loaded.get_seating(), flight.get_seating())
+
+    def test_mmap_changes_do_not_touch_the_file(self):
+        """Comprueba las reservas y cancelaciones sobre una instantánea abierta con mmap."""
+        flight = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        flight.allocate_passenger("5F", ("James", "Ford", "56278665F"))
+        flight.allocate_passenger("23A", ("Sayid", "Jarrah", "15758664M"))
+        flight.save(self.path)
+
+        loaded = Flight.load(self.path, engine="mmap")
+        with self.assertRaises(ValueError):
+            loaded.allocate_passenger("1A", ("Sayid", "Jarrah", "15758664M"))
+        loaded.cancel_passenger("56278665F")
+        loaded.allocate_passenger("5F", ("Kate", "Austen", "12589756P"))
+        loaded.reallocate_passenger("23A", "1A")
+        self.assertEqual(loaded.find_seat("12589756P"), "5F")
+        self.assertIsNone(loaded.find_seat("56278665F"))
+        self.assertEqual(loaded.find_seat("15758664M"), "1A")
+        self.assertEqual(loaded.num_available_seats(), flight.num_available_seats())
+        self.assertEqual(Flight.load(self.path).get_seating(), flight.get_seating())
+
+        # Guardar sobre el fichero mapeado sustituye la instantánea
+        loaded.save(self.path)
+        self.assert_round_trip(loaded, engine="mmap")
+
+    def test_mmap_load_format_2(self):
+        """Comprueba que engine='mmap' lee instantáneas del formato 2 (sin tabla de posiciones)."""
+        flight = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        flight.allocate_many([("2B", ("Kate", "Austen", "12589756P")),
+                              ("3C", ("James", "Ford", "56278665F")),
+                              ("23F", ("Hugo", "Reyes", "89765432T"))])
+        flight.save(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        _, _, _, _, _, table, records = Snapshot._parse_header(data, self.path)
+        with open(self.path, "wb") as f:
+            f.write(data[:4] + (2).to_bytes(2, "little") + data[6:table] + data[records:])
+        self.assert_round_trip(flight, engine="mmap")
+        self.assert_round_trip(flight)
+
+    def test_load_invalid_file(self):
+        """Comprueba que se rechazan ficheros que no son instantáneas."""
+        with open(self.path, "wb") as f:
+            f.write(b"no es un vuelo")
+        with self.assertRaises(ValueError):
+            Flight.load(self.path)
+
+
+class TestBookingJournal(unittest.TestCase):
+    """Pruebas del diario de reservas y la recuperación tras una caída."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmp.name, "flight.snap")
+        self.journal_path = os.path.join(self.tmp.name, "flight.journal")
+        self.flight = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        self.flight.save(self.snapshot)
+        self.journal = BookingJournal(self.journal_path, group_size=4)
+        self.flight.attach_journal(self.journal)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp.cleanup()
+
+    def test_recover_from_snapshot_and_journal(self):
+        """Comprueba que snapshot + diario reconstruyen el vuelo."""
+        self.flight.allocate_many([("2B", ("Kate", "Austen", "12589756P")),
+                                   ("3C", ("James", "Ford", "56278665F"))])
+        self.flight.reallocate_passenger("1A", "9F")
+        self.flight.auto_allocate(("Hugo", "Reyes", "89765432T"), preference="window")
+        self.journal.sync()
+
+        recovered = Flight.recover(self.snapshot, self.journal_path)
+        self.assertEqual(recovered.get_seating(), self.flight.get_seating())
+        self.assertEqual(recovered.get_version(), self.flight.get_version())
+        self.assertEqual(recovered.find_seat("85994003S"), "9F")
+
+    def test_group_commit_and_truncated_tail(self):
+        """Comprueba la escritura por grupos y que se ignora un registro final incompleto."""
+        for i in range(5):
+            self.flight.allocate_passenger(f"{i + 2}A", ("Name", "Surname", f"ID{i}"))
+        # Con group_size=4 solo el primer grupo está en disco
+        self.assertEqual(len(list(read_journal(self.journal_path))), 4)
+        self.journal.sync()
+        with open(self.journal_path, "ab") as f:
+            f.write(b"\x20\x00\x00\x00\x01")  # registro a medias
+        recovered = Flight.recover(self.snapshot, self.journal_path)
+        self.assertEqual(recovered.num_available_seats(), self.flight.num_available_seats())
+
+    def test_compaction(self):
+        """Comprueba que la compactación vacía el diario sin perder cambios ni duplicarlos."""
+        self.flight.allocate_passenger("2A", ("Kate", "Austen", "12589756P"))
+        self.flight.compact_journal(self.snapshot)
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+        self.flight.allocate_passenger("3A", ("James", "Ford", "56278665F"))
+        self.journal.sync()
+
+        recovered = Flight.recover(self.snapshot, self.journal_path)
+        self.assertEqual(recovered.get_seating(), self.flight.get_seating())
+        # Reaplicar el mismo diario otra vez no cambia nada
+        self.assertEqual(recovered.replay_journal(self.journal_path), 0)
+
+    def test_compaction_is_durable_before_truncating(self):
+        """Comprueba que la instantánea y su directorio llegan a disco antes de vaciar el diario."""
+        events = []
+        real_fsync, real_replace = os.fsync, os.replace
+
+        def fsync(fd):
+            events.append("fsync dir" if stat.S_ISDIR(os.fstat(fd).st_mode) else "fsync file")
+            real_fsync(fd)
+
+        def replace(src, dst):
+            events.append("replace")
+            real_replace(src, dst)
+
+        def truncate():
+            events.append("truncate")
+            real_truncate()
+
+        real_truncate = self.journal.truncate
+        self.flight.allocate_passenger("2A", ("Kate", "Austen", "12589756P"))
+        with mock.patch("os.fsync", fsync), mock.patch("os.replace", replace), \
+                mock.patch.object(self.journal, "truncate", truncate):
+            self.flight.compact_journal(self.snapshot)
+        start = events.index("replace") - 1
+        expected = ["fsync file", "replace", "truncate"]
+        if os.name == "posix":
+            expected.insert(2, "fsync dir")
+        self.assertEqual(events[start:start + len(expected)], expected)
+
+
+class TestSQLiteSeatStore(unittest.TestCase):
+    """Pruebas del motor de asientos persistente en SQLite."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "seats.db")
+        self.store = SQLiteSeatStore(self.path)
+        self.aircraft = Airbus(registration="G-EUPT", variant="A319-100")
+        self.flight = Flight(number="BA148", aircraft=self.aircraft, engine=self.store.seat_map("BA148"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_flight_api_over_sqlite(self):
+        """Comprueba la API de Flight con los asientos en SQLite."""
+        self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        self.flight.allocate_many([("2B", ("Kate", "Austen", "12589756P")),
+                                   ("3C", ("James", "Ford", "56278665F"))])
+        self.flight.reallocate_passenger("1A", "23F")
+        seating = self.flight.get_seating()
+        self.assertIsNone(seating[1]["A"])
+        self.assertEqual(seating[23]["F"], ("Jack", "Shephard", "85994003S"))
+        self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 3)
+        with self.assertRaises(ValueError):
+            self.flight.allocate_passenger("2B", ("Hugo", "Reyes", "89765432T"))
+
+    def test_reopen_and_shared_database(self):
+        """Comprueba que otra conexión ve las reservas y que la base de datos impide duplicarlas."""
+        self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+
+        with SQLiteSeatStore(self.path) as other_store:
+            # Otro "proceso" abre el mismo vuelo: los contadores se reconstruyen
+            other = Flight(number="BA148", aircraft=self.aircraft, engine=other_store.seat_map("BA148"))
+            self.assertEqual(other.num_available_seats(), 23 * 6 - 1)
+            self.assertEqual(other.find_seat("85994003S"), "1A")
+
+            other.allocate_passenger("2A", ("Kate", "Austen", "12589756P"))
+            # La ocupación y los pasajeros se leen siempre de la base de datos
+            self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 2)
+            self.assertEqual(self.flight.find_seat("12589756P"), "2A")
+            with self.assertRaises(ValueError):
+                self.flight.allocate_passenger("2A", ("Hugo", "Reyes", "89765432T"))
+            with self.assertRaises(ValueError):
+                self.flight.allocate_many([("4A", ("Sayid", "Jarrah", "15758664M")),
+                                           ("5A", ("Kate", "Austen", "12589756P"))])
+            # El lote fallido se deshace entero
+            self.assertIsNone(other.get_seating()[4]["A"])
+            self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 2)
+
+    def test_cancel_and_reallocate_across_connections(self):
+        """Comprueba cancelaciones y reasignaciones sobre reservas hechas desde otra conexión."""
+        with SQLiteSeatStore(self.path) as other_store:
+            other = Flight(number="BA148", aircraft=self.aircraft, engine=other_store.seat_map("BA148"))
+            self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+            self.flight.allocate_passenger("3A", ("Kate", "Austen", "12589756P"))
+
+            self.assertEqual(other.cancel("1A"), ("Jack", "Shephard", "85994003S"))
+            other.reallocate_passenger("3A", "4A")
+            self.assertIsNone(self.flight.find_seat("85994003S"))
+            self.assertEqual(self.flight.find_seat("12589756P"), "4A")
+            self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 1)
+            self.assertEqual(self.flight.num_available_seats_in_row(4), 5)
+            self.assertEqual(self.flight.num_available_seats_by_letter("A"), 22)
+            self.assertEqual(self.flight.render_seating().count("X"), 1)
+
+            # Sobre asientos que la otra conexión ya cambió: error y nada se toca
+            with self.assertRaises(ValueError):
+                self.flight.cancel("1A")
+            self.flight.allocate_passenger("5A", ("Hugo", "Reyes", "89765432T"))
+            with self.assertRaises(ValueError):
+                other.reallocate_passenger("4A", "5A")
+            self.assertEqual(other.find_seat("12589756P"), "4A")
+            self.assertEqual(other.num_available_seats(), 23 * 6 - 2)
+
+            # auto_allocate encuentra los asientos que liberó la otra conexión
+            full = Flight(number="BA149", aircraft=Aircraft(registration="F-1", model="Test",
+                                                            num_rows=1, num_seats_per_row=2),
+                          engine=self.store.seat_map("BA149"))
+            remote = Flight(number="BA149", aircraft=full.get_aircraft(), engine=other_store.seat_map("BA149"))
+            full.auto_allocate(("Sayid", "Jarrah", "15758664M"))
+            full.auto_allocate(("Ben", "Linus", "11111111H"))
+            remote.cancel("1A")
+            self.assertEqual(full.auto_allocate(("John", "Locke", "22222222J")), "1A")
+
+    def test_layout_mismatch(self):
+        """Comprueba que no se puede abrir un vuelo existente con otra distribución."""
+        with self.assertRaises(ValueError):
+            Flight(number="BA148", aircraft=Boeing(registration="F-GSPS", airline="Emirates"),
+                   engine=self.store.seat_map("BA148"))
+
+
+class TestShardedInventory(unittest.TestCase):
+    """Pruebas del inventario repartido entre procesos."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.inventory = ShardedInventory(num_workers=2)
+        cls.inventory.execute([("add_flight", "BA117", Airbus(registration="G-EUPT", variant="A319-100")),
+                               ("add_flight", "AF72", Boeing(registration="F-GSPS", airline="Emirates"))])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.inventory.close()
+
+    def test_batch_routing_and_errors(self):
+        """Comprueba que un lote se reparte, conserva el orden y devuelve los errores sin abortar."""
+        results = self.inventory.execute([
+            ("allocate", "BA117", "1A", ("Jack", "Shephard", "85994003S")),
+            ("allocate", "AF72", "1A", ("Jack", "Shephard", "85994003S")),
+            ("allocate", "BA117", "1A", ("Kate", "Austen", "12589756P")),
+            ("allocate", "XX999", "1A", ("Kate", "Austen", "12589756P")),
+            ("reallocate", "AF72", "1A", "2B"),
+            ("availability", "BA117"),
+        ])
+        self.assertIsNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertIsInstance(results[2], ValueError)
+        self.assertIsInstance(results[3], ValueError)
+        self.assertIsNone(results[4])
+        self.assertEqual(results[5], 23 * 6 - 1)
+
+    def test_fan_out_queries(self):
+        """Comprueba las consultas sobre todos los procesos."""
+        self.inventory.allocate("BA117", "5C", ("Hugo", "Reyes", "89765432T"))
+        self.inventory.allocate("AF72", "7D", ("Hugo", "Reyes", "89765432T"))
+        self.assertEqual(self.inventory.find_passenger("89765432T"), [("AF72", "7D"), ("BA117", "5C")])
+        total = self.inventory.availability("BA117") + self.inventory.availability("AF72")
+        self.assertEqual(self.inventory.total_free_seats(), total)
+        with self.assertRaises(ValueError):
+            self.inventory.add_flight("BA117", Airbus(registration="G-EUPT", variant="A319-100"))
+        with self.assertRaises(ValueError):
+            self.inventory.execute([("cancel", "BA117")])
+
+    def test_malformed_commands_keep_worker_alive(self):
+        """Comprueba que un comando mal formado no mata al proceso ni al resto del lote."""
+        results = self.inventory.execute([
+            ("allocate", "BA117", "9A", None),
+            ("allocate", "BA117", "9B"),
+            ("allocate", "BA117", "9C", ("Kate", "Austen", "12589756P")),
+        ])
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsNone(results[2])
+        self.assertEqual(self.inventory.execute([("availability", "BA117")]),
+                         [self.inventory.availability("BA117")])
+        self.assertEqual(self.inventory.find_passenger("12589756P"), [("BA117", "9C")])
+
+
+class TestSeatGrid(unittest.TestCase):
+    """Pruebas del plano de asientos con caché por fila."""
+
+    def setUp(self):
+        self.aircraft = Airbus(registration="G-EUPT", variant="A319-100")
+        self.flight = Flight(number="BA117", aircraft=self.aircraft)
+
+    def test_render_and_invalidation(self):
+        """Comprueba el plano tras reservas, cambios de asiento y carga de lotes."""
+        self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        lines = self.flight.render_seating().splitlines()
+        self.assertEqual(lines[0], "   ABC DEF")
+        self.assertEqual(lines[1], " 1 X.. ...")
+        self.assertEqual(len(lines), 1 + 23)
+
+        self.flight.reallocate_passenger("1A", "12E")
+        self.flight.allocate_many([("23F", ("Kate", "Austen", "12589756P"))])
+        lines = self.flight.render_seating().splitlines()
+        self.assertEqual(lines[1], " 1 ... ...")
+        self.assertEqual(lines[12], "12 ... .X.")
+        self.assertEqual(lines[23], "23 ... ..X")
+
+    def test_only_changed_rows_are_redrawn(self):
+        """Comprueba que tras una reserva solo se vuelve a dibujar su fila."""
+        grid = SeatGrid(self.aircraft.get_layout())
+        seats = {}
+        calls = []
+
+        def get(index):
+            calls.append(index)
+            return seats.get(index)
+
+        first = grid.render(get)
+        self.assertEqual(len(calls), 23 * 6)
+        calls.clear()
+        self.assertIs(grid.render(get), first)
+        self.assertEqual(calls, [])
+
+        seats[6 * 4 + 2] = ("Jack", "Shephard", "85994003S")
+        grid.invalidate(5)
+        self.assertIn(" 5 ..X ...", grid.render(get))
+        self.assertEqual(calls, list(range(24, 30)))
+
+    def test_print_formats(self):
+        """Comprueba los formatos de print_seating()."""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.flight.print_seating()
+            self.flight.print_seating(fmt="pprint")
+        self.assertTrue(out.getvalue().startswith("   ABC DEF\n 1 ... ...\n"))
+        self.assertIn("{'A': None", out.getvalue())
+        with self.assertRaises(ValueError):
+            self.flight.print_seating(fmt="html")
+
+
+@unittest.skipIf(numpy is None, "numpy no está instalado")
+class TestFleetAnalytics(unittest.TestCase):
+    """Pruebas de las estadísticas de ocupación con NumPy."""
+
+    def setUp(self):
+        self.airbus = Flight(number="BA117", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        self.boeing1 = Flight(number="AF72", aircraft=Boeing(registration="F-GSPS", airline="Emirates"),
+                              engine="bitmap")
+        self.boeing2 = Flight(number="AF73", aircraft=Boeing(registration="F-GSPT", airline="Emirates"))
+        self.airbus.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        self.airbus.allocate_passenger("2A", ("Kate", "Austen", "12589756P"))
+        self.boeing1.allocate_passenger("1A", ("James", "Ford", "56278665F"))
+        self.boeing2.allocate_passenger("56I", ("Hugo", "Reyes", "89765432T"))
+        self.fleet = FleetOccupancy([self.airbus, self.boeing1, self.boeing2])
+
+    def test_occupancy_array(self):
+        """Comprueba la exportación de la ocupación a un array (vuelos, filas, asientos)."""
+        occupancy = occupancy_array([self.boeing1, self.boeing2])
+        self.assertEqual(occupancy.shape, (2, 56, 9))
+        self.assertEqual(int(occupancy.sum()), 2)
+        self.assertTrue(occupancy[0, 0, 0])
+        self.assertTrue(occupancy[1, 55, 8])
+        with self.assertRaises(ValueError):
+            occupancy_array([self.airbus, self.boeing1])
+
+    def test_load_factors(self):
+        """Comprueba los factores de ocupación por vuelo, modelo y letra."""
+        numpy.testing.assert_allclose(self.fleet.load_factor_by_flight(), [2 / 138, 1 / 504, 1 / 504])
+        by_model = self.fleet.load_factor_by_model()
+        self.assertAlmostEqual(by_model["Airbus A319"], 2 / 138)
+        self.assertAlmostEqual(by_model["Boeing 777"], 2 / 1008)
+        by_letter = self.fleet.load_factor_by_letter()
+        self.assertAlmostEqual(by_letter["A"], 3 / (23 + 2 * 56))
+        self.assertAlmostEqual(by_letter["I"], 1 / 112)
+        self.assertEqual(by_letter["E"], 0.0)
+        self.assertAlmostEqual(self.fleet.load_factor(), 4 / (138 + 1008))
+
+    def test_heatmaps(self):
+        """Comprueba el mapa de calor y la ocupación por fila de un modelo."""
+        heatmap = self.fleet.row_heatmap("Boeing 777")
+        self.assertEqual(heatmap.shape, (56, 9))
+        self.assertEqual(heatmap[0, 0], 0.5)
+        self.assertEqual(heatmap[55, 8], 0.5)
+        rows = self.fleet.row_load_factor("Airbus A319")
+        self.assertAlmostEqual(rows[0], 1 / 6)
+        self.assertEqual(rows[2], 0.0)
+        with self.assertRaises(ValueError):
+            self.fleet.row_heatmap("Concorde")
+
+
+class TestBenchmark(unittest.TestCase):
+    """Pruebas de la batería de benchmarks y la comparación con la línea base."""
+
+    def test_run_and_compare(self):
+        """Comprueba una pasada mínima y la detección de regresiones."""
+        results = benchmark.run_benchmarks(["num_available_seats", "reallocate_passenger"],
+                                           repeat=1, scale=0.01)
+        self.assertEqual(set(results), {"num_available_seats", "reallocate_passenger"})
+        self.assertEqual(results["num_available_seats"]["ops"], 2000)
+
+        baseline = {"a": {"seconds": 1.0, "ops": 100}, "b": {"seconds": 1.0, "ops": 100}}
+        current = {"a": {"seconds": 0.55, "ops": 50},    # x1.10: dentro de la tolerancia
+                   "b": {"seconds": 1.5, "ops": 100},    # x1.50: regresión
+                   "c": {"seconds": 9.0, "ops": 1}}      # sin línea base
+        self.assertEqual(benchmark.compare(current, baseline, tolerance=0.2), [("b", 1.5)])
+        with self.assertRaises(ValueError):
+            benchmark.run_benchmarks(["no_existe"])
+
+    def test_baseline_without_time(self):
+        """Comprueba que una línea base con tiempo cero o ausente se informa como n/a."""
+        baseline = {"a": {"seconds": 0.0, "ops": 100}, "b": {"seconds": None, "ops": 100},
+                    "num_available_seats": {"seconds": 0.0, "ops": 2000}}
+        current = {"a": {"seconds": 1.0, "ops": 100}, "b": {"seconds": 1.0, "ops": 100}}
+        self.assertEqual(benchmark.compare(current, baseline), [])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "base.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"results": baseline}, f)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                code = benchmark.main(["benchmark.py", "--baseline", path, "--filter", "num_available_seats",
+                                       "--repeat", "1", "--scale", "0.01"])
+        self.assertEqual(code, 0)
+        self.assertIn("n/a base", output.getvalue())
+
+
+class TestMetrics(unittest.TestCase):
+    """Pruebas de la instrumentación opcional de Flight."""
+
+    def setUp(self):
+        self.metrics = InMemoryMetrics()
+        self.flight = Flight(number="BA117", aircraft=Airbus(registration="G-EUPT", variant="A319-100"),
+                             metrics=self.metrics)
+
+    def test_counters_and_errors_by_reason(self):
+        """Comprueba las llamadas, los errores por causa y las latencias."""
+        self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        self.flight.reallocate_passenger("1A", "2B")
+        self.flight.num_available_seats()
+        for seat, reason in (("2B", "occupied"), ("1Z", "bad_letter"), ("40A", "bad_row"), ("xA", "bad_row")):
+            with self.assertRaises(ValueError) as context:
+                self.flight.allocate_passenger(seat, ("Kate", "Austen", "12589756P"))
+            self.assertEqual(context.exception.reason, reason)
+
+        get = self.metrics.get_counter
+        self.assertEqual(get("flight.allocate_passenger.calls"), 5)
+        self.assertEqual(get("flight.allocate_passenger.errors.occupied"), 1)
+        self.assertEqual(get("flight.allocate_passenger.errors.bad_letter"), 1)
+        self.assertEqual(get("flight.allocate_passenger.errors.bad_row"), 2)
+        self.assertEqual(get("flight.parse_seat.calls"), 7)
+        self.assertEqual(get("flight.parse_seat.errors.bad_row"), 2)
+        self.assertEqual(get("flight.reallocate_passenger.calls"), 1)
+        self.assertEqual(get("flight.num_available_seats.calls"), 1)
+        histogram = self.metrics.get_histogram("flight.allocate_passenger")
+        self.assertEqual(histogram["count"], 5)
+        self.assertIsNotNone(self.metrics.percentile("flight.allocate_passenger", 0.99))
+
+    def test_batch_paths_parse_seats(self):
+        """Comprueba que allocate_many y allocate_rows cuentan el análisis de sus asientos."""
+        self.flight.allocate_many([("1A", ("Jack", "Shephard", "85994003S")),
+                                   ("2B", ("Kate", "Austen", "12589756P"))])
+        report = ManifestReport()
+        self.flight.allocate_rows([(2, "3C", ("James", "Ford", "56278665F")),
+                                   (3, "1Z", ("Hugo", "Reyes", "89765432T"))], report)
+        get = self.metrics.get_counter
+        self.assertEqual(get("flight.parse_seat.calls"), 4)
+        self.assertEqual(get("flight.parse_seat.errors.bad_letter"), 1)
+
+    def test_disabled(self):
+        """Comprueba que sin sink se usan los métodos de la clase sin envolver."""
+        self.flight.set_metrics(None)
+        self.assertIsNone(self.flight.get_metrics())
+        self.assertNotIn("allocate_passenger", vars(self.flight))
+        self.flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        self.assertEqual(self.metrics.get_counter("flight.allocate_passenger.calls"), 0)
+
+
+class TestOverbooking(unittest.TestCase):
+    """Pruebas de la sobreventa y la lista de espera."""
+
+    def setUp(self):
+        # Avión de 2 asientos con un 100% de sobreventa: 2 plazas en espera
+        self.aircraft = Aircraft(registration="EC-ABC", model="Test", num_rows=1, num_seats_per_row=2)
+        self.aircraft.set_overbooking_ratio(1.0)
+        self.flight = Flight(number="IB100", aircraft=self.aircraft)
+        self.jack = ("Jack", "Shephard", "85994003S")
+        self.kate = ("Kate", "Austen", "12589756P")
+        self.james = ("James", "Ford", "56278665F")
+        self.hugo = ("Hugo", "Reyes", "89765432T")
+
+    def test_book_and_waitlist(self):
+        """Comprueba que con el vuelo lleno se entra en espera hasta el límite."""
+        self.assertEqual(self.flight.book(self.jack), "1A")
+        self.assertEqual(self.flight.book(self.kate, preference="window"), "1B")
+        self.assertIsNone(self.flight.book(self.james, fare_class="Y", timestamp=1.0))
+        self.assertIsNone(self.flight.book(self.hugo, fare_class="J", timestamp=2.0))
+        self.assertEqual(self.flight.get_waitlist(), [self.hugo, self.james])
+        with self.assertRaises(ValueError) as context:
+            self.flight.book(("Sayid", "Jarrah", "15758664M"))
+        self.assertEqual(context.exception.reason, "full")
+        for passenger, fare in ((self.james, "Y"), (self.jack, "Y"), (("Sun", "Kwon", "1X"), "Z")):
+            with self.assertRaises(ValueError):
+                self.flight.book(passenger, fare_class=fare)
+        with self.assertRaises(ValueError):
+            self.aircraft.set_overbooking_ratio(-0.1)
+
+    def test_cancel_promotes_by_fare_and_time(self):
+        """Comprueba que al cancelar se sienta al primero de la espera (tarifa y llegada)."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        journal_path = os.path.join(tmp.name, "IB100.journal")
+        self.flight.attach_journal(BookingJournal(journal_path, fsync=False))
+        self.flight.book(self.jack)
+        self.flight.book(self.kate)
+        self.flight.book(self.james, fare_class="Y", timestamp=1.0)
+        self.flight.book(self.hugo, fare_class="Y", timestamp=2.0)
+
+        self.assertEqual(self.flight.cancel("1A"), self.jack)
+        self.assertEqual(self.flight.find_seat(self.james[2]), "1A")
+        self.assertEqual(self.flight.get_waitlist(), [self.hugo])
+        self.assertEqual(self.flight.num_available_seats(), 0)
+        with self.assertRaises(ValueError):
+            self.flight.cancel("2A")
+
+        self.flight.cancel("1B")
+        self.assertEqual(self.flight.find_seat(self.hugo[2]), "1B")
+        self.assertEqual(self.flight.num_waitlisted(), 0)
+
+        # El diario refleja cancelaciones y promociones
+        self.flight.detach_journal().close()
+        replayed = Flight(number="IB100", aircraft=self.aircraft)
+        replayed.replay_journal(journal_path)
+        self.assertEqual(replayed.get_seating(), self.flight.get_seating())
+
+
+class TestCancellation(unittest.TestCase):
+    """Pruebas de las cancelaciones y de la sincronización de las estructuras derivadas."""
+
+    def setUp(self):
+        self.flight = Flight(number="BA117", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        self.registry = FlightRegistry([self.flight])
+        self.passengers = [("Jack", "Shephard", "85994003S"), ("Kate", "Austen", "12589756P"),
+                           ("James", "Ford", "56278665F"), ("Hugo", "Reyes", "89765432T")]
+        self.flight.allocate_many(zip(["1A", "1B", "2C", "3D"], self.passengers))
+
+    def test_cancel_and_cancel_passenger(self):
+        """Comprueba que una cancelación actualiza contadores, índice, plano y registro."""
+        self.flight.render_seating()
+        self.assertEqual(self.flight.cancel("1A"), self.passengers[0])
+        self.assertEqual(self.flight.cancel_passenger("12589756P"), self.passengers[1])
+        self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 2)
+        self.assertEqual(self.flight.num_available_seats_in_row(1), 6)
+        self.assertEqual(self.flight.num_available_seats_by_letter("A"), 23)
+        self.assertIsNone(self.flight.find_seat("85994003S"))
+        self.assertEqual(self.flight.render_seating().splitlines()[1], " 1 ... ...")
+        self.assertEqual(self.registry.total_free_seats(), 23 * 6 - 2)
+        # El asiento liberado vuelve a estar disponible para auto_allocate
+        self.assertEqual(self.flight.auto_allocate(("Sayid", "Jarrah", "15758664M")), "1A")
+        # Un pasajero ya cancelado puede volver a reservar
+        self.flight.allocate_passenger("5E", self.passengers[0])
+        with self.assertRaises(ValueError):
+            self.flight.cancel_passenger("00000000X")
+        with self.assertRaises(ValueError):
+            self.flight.cancel("1B")
+
+    def test_cancel_many_all_or_nothing(self):
+        """Comprueba que un lote con algún asiento vacío o repetido no cancela nada."""
+        for seats in (["1A", "4F"], ["1A", "1A"], ["1A", "99A"]):
+            with self.assertRaises(ValueError):
+                self.flight.cancel_many(seats)
+        self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 4)
+
+        self.assertEqual(self.flight.cancel_many(["3D", "1A", "2C"]),
+                         [self.passengers[3], self.passengers[0], self.passengers[2]])
+        self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 1)
+        self.assertEqual(self.flight.find_seat("12589756P"), "1B")
+        self.assertEqual(self.registry.total_free_seats(), 23 * 6 - 1)
+        self.assertEqual(self.flight.cancel_many([]), [])
+
+    def test_cancel_waitlisted_passenger(self):
+        """Comprueba que cancelar a un pasajero en espera lo retira de la lista."""
+        aircraft = Aircraft(registration="EC-ABC", model="Test", num_rows=1, num_seats_per_row=1)
+        aircraft.set_overbooking_ratio(2.0)
+        flight = Flight(number="IB100", aircraft=aircraft)
+        flight.book(self.passengers[0])
+        flight.book(self.passengers[1])
+        flight.book(self.passengers[2])
+        self.assertEqual(flight.cancel_passenger("12589756P"), self.passengers[1])
+        self.assertEqual(flight.get_waitlist(), [self.passengers[2]])
+        flight.cancel_many(["1A"])
+        self.assertEqual(flight.find_seat("56278665F"), "1A")
+        self.assertEqual(flight.num_waitlisted(), 0)
+
+    def test_cancel_many_over_sqlite(self):
+        """Comprueba la cancelación en lote con el motor SQLite (una sola transacción)."""
+        with tempfile.TemporaryDirectory() as tmp, SQLiteSeatStore(os.path.join(tmp, "seats.db")) as store:
+            flight = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"),
+                            engine=store.seat_map("BA148"))
+            flight.allocate_many(zip(["1A", "1B", "2C"], self.passengers))
+            self.assertEqual(flight.cancel_many(["1A", "2C"]), [self.passengers[0], self.passengers[2]])
+            reopened = Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100"),
+                              engine=store.seat_map("BA148"))
+            self.assertEqual(reopened.num_available_seats(), 23 * 6 - 1)
+
+
+class TestManifest(unittest.TestCase):
+    """Pruebas de la importación y exportación de manifiestos por lotes."""
+
+    def setUp(self):
+        self.flight = Flight(number="BA117", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        self.other = Flight(number="AF72", aircraft=Boeing(registration="F-GSPS", airline="Emirates"))
+        self.registry = FlightRegistry([self.flight, self.other])
+
+    def test_import_csv_reports_bad_rows(self):
+        """Comprueba que las filas incorrectas se anotan con su línea y el resto se importa."""
+        source = io.StringIO(
+            "seat,name,surname,id_card\n"
+            "1A,Jack,Shephard,85994003S\n"
+            "99A,Kate,Austen,12589756P\n"   # fila inexistente
+            "1A,James,Ford,56278665F\n"     # asiento ya ocupado
+            "2B,,Reyes,89765432T\n"         # nombre vacío
+            "2C,Sayid,Jarrah,85994003S\n"   # pasajero repetido
+            "3D,Kate,Austen,12589756P\n")
+        report = self.flight.import_manifest(source, batch_size=2)
+        self.assertEqual(report.get_imported(), 2)
+        self.assertEqual(sorted(line for line, _ in report.get_errors()), [3, 4, 5, 6])
+        self.assertEqual(self.flight.find_seat("12589756P"), "3D")
+        self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 2)
+        self.assertEqual(self.registry.total_free_seats(), 23 * 6 - 2 + 56 * 9)
+
+    def test_import_jsonl_and_round_trip(self):
+        """Comprueba la importación JSONL y que exportar e importar conserva las reservas."""
+        source = io.BytesIO(
+            b'{"seat": "1A", "name": "Jack", "surname": "Shephard", "id_card": "85994003S"}\n'
+            b'no es json\n'
+            b'\n'
+            b'{"flight": "AF72", "seat": "2B", "name": "Kate", "surname": "Austen", "id_card": "12589756P"}\n'
+            b'{"seat": "2B", "name": "Hugo", "surname": "Reyes", "id_card": "89765432T"}\n')
+        report = self.flight.import_manifest(source, fmt="jsonl")
+        self.assertEqual(report.get_imported(), 2)
+        self.assertEqual([line for line, _ in report.get_errors()], [2, 4])
+        self.assertFalse(source.closed)
+
+        for fmt in ("csv", "jsonl"):
+            sink = io.StringIO()
+            self.assertEqual(self.flight.export_manifest(sink, fmt=fmt), 2)
+            copy = Flight(number="BA117", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+            sink.seek(0)
+            self.assertEqual(copy.import_manifest(sink, fmt=fmt).num_errors(), 0)
+            self.assertEqual(copy.get_seating(), self.flight.get_seating())
+
+    def test_fleet_import_in_batches(self):
+        """Comprueba que el registro reparte las filas por vuelo en lotes acotados."""
+        rows = [("BA117" if i % 2 else "AF72", f"{i // 6 + 1}{'ABCDEF'[i % 6]}",
+                 "Jack", "Shephard", f"{i:08d}X") for i in range(60)]
+        rows.append(("XX1", "1A", "Kate", "Austen", "12589756P"))   # vuelo inexistente
+        rows.append(("", "1B", "Kate", "Austen", "12589756P"))      # sin vuelo
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.csv")
+            self.assertEqual(write_manifest(rows, path), 62)
+            report = self.registry.import_manifest(path, batch_size=7)
+        self.assertEqual(report.get_imported(), 60)
+        self.assertEqual([line for line, _ in report.get_errors()], [62, 63])
+        self.assertEqual(self.flight.num_available_seats(), 23 * 6 - 30)
+        self.assertEqual(self.other.num_available_seats(), 56 * 9 - 30)
+
+        sink = io.BytesIO()
+        self.assertEqual(self.registry.export_manifest(sink, fmt="jsonl", batch_size=16), 60)
+        self.assertEqual(len(sink.getvalue().splitlines()), 60)
+
+    def test_errors_are_capped(self):
+        """Comprueba que el informe guarda como mucho max_errors errores con detalle."""
+        report = ManifestReport(max_errors=2)
+        source = io.StringIO("seat,name,surname,id_card\n" + "99A,Jack,Shephard,85994003S\n" * 5)
+        self.flight.import_manifest(source, report=report)
+        self.assertEqual(report.num_errors(), 5)
+        self.assertEqual(len(report.get_errors()), 2)
+        with self.assertRaises(ValueError):
+            self.flight.import_manifest(io.StringIO("seat,name\n1A,Jack\n"))
+        with self.assertRaises(ValueError):
+            self.flight.import_manifest(io.StringIO(""), fmt="xml")
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Pruebas del registro de cambios incremental (changes_since)."""
+
+    def setUp(self):
+        self.flight = Flight(number="BA117", aircraft=Airbus(registration="G-EUPT", variant="A319-100"),
+                             feed_size=8)
+        self.passengers = [("Jack", "Shephard", "85994003S"), ("Kate", "Austen", "12589756P"),
+                           ("James", "Ford", "56278665F")]
+
+    def apply(self, view, version):
+        """Aplica los cambios a una vista {asiento: pasajero} como haría un consumidor."""
+        version, full, changes = self.flight.changes_since(version)
+        if full:
+            view.clear()
+        for seat, passenger in changes:
+            if passenger is None:
+                view.pop(seat, None)
+            else:
+                view[seat] = passenger
+        return version, full
+
+    def expected(self):
+        return {f"{row}{letter}": passenger
+                for row, seats in enumerate(self.flight.get_seating()) if seats
+                for letter, passenger in seats.items() if passenger is not None}
+
+    def test_incremental_changes(self):
+        """Comprueba que un consumidor al día recibe solo los cambios, en orden."""
+        view = {}
+        version, full = self.apply(view, None)
+        self.assertEqual((version, full, view), (0, True, {}))
+
+        self.flight.allocate_many(zip(["1A", "2B"], self.passengers))
+        self.flight.reallocate_passenger("1A", "3C")
+        self.flight.cancel("2B")
+        # Cada asiento aparece una vez, con su ocupante actual
+        self.assertEqual(self.flight.changes_since(version),
+                         (4, False, [("1A", None), ("2B", None), ("3C", self.passengers[0])]))
+        version, full = self.apply(view, version)
+        self.assertFalse(full)
+        self.assertEqual(view, self.expected())
+        self.assertEqual(self.flight.changes_since(version), (version, False, []))
+        with self.assertRaises(ValueError):
+            self.flight.changes_since(version + 1)
+
+    def test_snapshot_when_too_far_behind(self):
+        """Comprueba que un consumidor que se ha quedado atrás recibe una foto completa."""
+        view = {}
+        version, _ = self.apply(view, None)
+        for i in range(6):
+            seat = self.flight.auto_allocate(("Name", "Surname", f"ID{i}"))
+            self.flight.reallocate_passenger(seat, f"{i + 10}F")
+        recent = self.flight.get_version() - 2
+        version, full = self.apply(view, version)
+        self.assertTrue(full)
+        self.assertEqual(view, self.expected())
+        self.assertFalse(self.flight.changes_since(recent)[1])
+        with self.assertRaises(ValueError):
+            Flight(number="BA118", aircraft=Airbus(registration="G-EUPT", variant="A319-100"), feed_size=-1)
+
+    def test_disabled_by_default(self):
+        """Comprueba que sin feed_size el registro no guarda nada y se responde con la foto completa."""
+        flight = Flight(number="BA118", aircraft=Airbus(registration="G-EUPT", variant="A319-100"))
+        flight.allocate_passenger("1A", self.passengers[0])
+        flight.allocate_passenger("2B", self.passengers[1])
+        self.assertEqual(flight.changes_since(1), (2, True, [("1A", self.passengers[0]),
+                                                            ("2B", self.passengers[1])]))
+
+    def test_load_restarts_feed(self):
+        """Comprueba que un vuelo cargado de una instantánea empieza el registro en su versión."""
+        self.flight.allocate_many(zip(["1A", "2B"], self.passengers))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "flight.snap")
+            self.flight.save(path)
+            loaded = Flight.load(path, feed_size=8)
+        self.assertEqual(loaded.changes_since(2), (2, False, []))
+        self.assertTrue(loaded.changes_since(1)[1])
+        loaded.cancel("1A")
+        self.assertEqual(loaded.changes_since(2), (3, False, [("1A", None)]))
+
+
 class TestNumAvailableSeats(unittest.TestCase):
     """Pruebas para el método num_available_seats()."""
 
@@ -138,6 +1444,227 @@ class TestNumAvailableSeats(unittest.TestCase):
         self.assertEqual(flight.num_available_seats(), 2)
 
 
+    def test_available_seats_by_row_and_letter(self):
+        """Comprueba los contadores de asientos libres por fila, letra, ventanilla y pasillo."""
+        aircraft = Aircraft(registration="G-EUAH", model="Airbus A319", num_rows=3, num_seats_per_row=6)
+        flight = Flight(number="BA113", aircraft=aircraft)
+        self.assertEqual(aircraft.window_seats(), "AF")
+        self.assertEqual(aircraft.aisle_seats(), "CD")
+        self.assertEqual(flight.num_available_window_seats(), 6)
+
+        flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        flight.allocate_passenger("1C", ("Kate", "Austen", "12589756P"))
+        self.assertEqual(flight.num_available_seats_in_row(1), 4)
+        self.assertEqual(flight.num_available_seats_in_row(2), 6)
+        self.assertEqual(flight.num_available_seats_by_letter("A"), 2)
+        self.assertEqual(flight.num_available_window_seats(), 5)
+        self.assertEqual(flight.num_available_aisle_seats(), 5)
+
+        # Al reasignar, los contadores se mueven con el pasajero
+        flight.reallocate_passenger("1A", "3B")
+        self.assertEqual(flight.num_available_seats(), 16)
+        self.assertEqual(flight.num_available_seats_in_row(1), 5)
+        self.assertEqual(flight.num_available_seats_in_row(3), 5)
+        self.assertEqual(flight.num_available_window_seats(), 6)
+
+        with self.assertRaises(ValueError):
+            flight.num_available_seats_in_row(4)
+        with self.assertRaises(ValueError):
+            flight.num_available_seats_by_letter("G")
+
+    def test_boeing_seat_blocks(self):
+        """Comprueba la distribución 3-3-3 del Boeing 777."""
+        boeing = Boeing(registration="F-GSPS", airline="Emirates")
+        self.assertEqual(boeing.seat_blocks(), ("ABC", "DEF", "GHI"))
+        self.assertEqual(boeing.window_seats(), "AI")
+        self.assertEqual(boeing.aisle_seats(), "CDFG")
+
+
+class TestBitmapEngine(unittest.TestCase):
+    """Pruebas del motor de asientos compacto (engine='bitmap')."""
+
+    def setUp(self):
+        self.flight = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"),
+                             engine="bitmap")
+        self.p1 = Passenger("Jack", "Shephard", "85994003S")
+        self.p2 = Passenger("Kate", "Austen", "12589756P")
+
+    def test_allocate_and_view(self):
+        """Comprueba que get_seating() devuelve la vista de diccionarios por fila."""
+        self.flight.allocate_passenger("56I", self.p1.passenger_data())
+        seating = self.flight.get_seating()
+        self.assertIsNone(seating[0])
+        self.assertEqual(len(seating), 57)
+        self.assertEqual(seating[56]["I"], self.p1.passenger_data())
+        self.assertIsNone(seating[56]["H"])
+
+    def test_allocate_occupied_and_reallocate(self):
+        """Comprueba las validaciones y la reasignación sobre el bitmap."""
+        self.flight.allocate_passenger("1A", self.p1.passenger_data())
+        with self.assertRaises(ValueError):
+            self.flight.allocate_passenger("1A", self.p2.passenger_data())
+        self.flight.reallocate_passenger("1A", "9C")
+        seating = self.flight.get_seating()
+        self.assertIsNone(seating[1]["A"])
+        self.assertEqual(seating[9]["C"], self.p1.passenger_data())
+        with self.assertRaises(ValueError):
+            self.flight.reallocate_passenger("1A", "2A")
+
+    def test_num_available_seats(self):
+        """Comprueba el recuento de asientos libres con el motor bitmap."""
+        self.assertEqual(self.flight.num_available_seats(), 56 * 9)
+        self.flight.allocate_passenger("3E", self.p1.passenger_data())
+        self.flight.allocate_passenger("30B", self.p2.passenger_data())
+        self.assertEqual(self.flight.num_available_seats(), 56 * 9 - 2)
+
+    def test_unknown_engine(self):
+        """Comprueba que se rechaza un motor desconocido."""
+        with self.assertRaises(ValueError):
+            Flight(number="AF93", aircraft=Boeing(registration="F-GSPT", airline="Emirates"), engine="xml")
+
+
+class TestSparseEngine(unittest.TestCase):
+    """Pruebas del motor disperso (engine='sparse'), que solo guarda los asientos ocupados."""
+
+    def setUp(self):
+        self.flight = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"),
+                             engine="sparse")
+        self.passengers = [("Jack", "Shephard", "85994003S"), ("Kate", "Austen", "12589756P"),
+                           ("James", "Ford", "56278665F")]
+
+    def test_allocate_and_view(self):
+        """Comprueba que la vista por filas se construye al pedirla y refleja las reservas."""
+        self.flight.allocate_many(zip(["56I", "1A", "9C"], self.passengers))
+        self.flight.reallocate_passenger("9C", "10D")
+        self.assertEqual(self.flight.cancel("1A"), self.passengers[1])
+        seating = self.flight.get_seating()
+        self.assertIsNone(seating[0])
+        self.assertEqual(len(seating), 57)
+        self.assertEqual(seating[56]["I"], self.passengers[0])
+        self.assertEqual(seating[10]["D"], self.passengers[2])
+        self.assertIsNone(seating[1]["A"])
+        self.assertEqual(self.flight.num_available_seats(), 56 * 9 - 2)
+        self.assertEqual(self.flight.render_seating().splitlines()[10], "10 ... X.. ...")
+
+    def test_boarding_cards_in_seat_order(self):
+        """Comprueba que los asientos ocupados se recorren en orden aunque se reserven desordenados."""
+        self.flight.allocate_many(zip(["30B", "2A", "2C"], self.passengers))
+        sink = io.StringIO()
+        self.flight.export_manifest(sink)
+        self.assertEqual([line.split(",")[1] for line in sink.getvalue().splitlines()[1:]],
+                         ["2A", "2C", "30B"])
+
+
+class TestSeatLayout(unittest.TestCase):
+    """Pruebas de la distribución de asientos compartida y su parser."""
+
+    def test_layout_shared_between_aircraft(self):
+        """Comprueba que las aeronaves con las mismas dimensiones comparten distribución."""
+        b1 = Boeing(registration="F-GSPS", airline="Emirates")
+        b2 = Boeing(registration="F-GSPT", airline="Air France")
+        self.assertIs(b1.get_layout(), b2.get_layout())
+
+        layout = b1.get_layout()
+        self.assertEqual(layout.get_letter_set(), frozenset("ABCDEFGHI"))
+        self.assertEqual(layout.get_columns()["C"], 2)
+        self.assertEqual(layout.get_num_rows(), 56)
+        with self.assertRaises(TypeError):
+            layout.get_columns()["Z"] = 9
+
+    def test_parse_seat(self):
+        """Comprueba el análisis de asientos válidos e inválidos."""
+        layout = Airbus(registration="G-EUPT", variant="A319-100").get_layout()
+        self.assertEqual(layout.parse("12C"), (12, 2))
+        self.assertEqual(layout.parse("12C"), (12, 2))  # segunda vez desde la caché
+        self.assertEqual(layout.seat_name(layout.seat_index("23F")), "23F")
+        for seat in ("C", "12G", "1-C", "0A", "24A"):
+            with self.assertRaises(ValueError):
+                layout.seat_index(seat)
+
+
+class TestLayoutTemplates(unittest.TestCase):
+    """Pruebas de las plantillas de asientos por modelo y las cabinas no uniformes."""
+
+    def setUp(self):
+        # A321 ficticio: fila 1 con 4 asientos, 12 de salida y 12C bloqueado
+        self.layout = SeatLayout.register_template("Airbus A321neo", 30, "ABCDEF",
+                                                   row_letters={1: "ACDF"}, exit_rows=(12, 13),
+                                                   blocked=("12C",))
+        self.addCleanup(SeatLayout.unregister_template, "Airbus A321neo")
+        self.aircraft = Aircraft.from_template("G-NEOA", "Airbus A321neo")
+        self.flight = Flight(number="BA300", aircraft=self.aircraft)
+
+    def test_template_shared(self):
+        """Comprueba que las aeronaves de un modelo comparten la plantilla."""
+        self.assertIs(self.aircraft.get_layout(), self.layout)
+        self.assertIs(Aircraft("G-NEOB", "Airbus A321neo", 30, 6).get_layout(), self.layout)
+        self.assertIs(Boeing(registration="F-GSPS", airline="Emirates").get_layout(),
+                      SeatLayout.template("Boeing 777"))
+        self.assertIs(pickle.loads(pickle.dumps(self.aircraft)).get_layout(), self.layout)
+        with self.assertRaises(ValueError):
+            Aircraft.from_template("G-NEOC", "Concorde")
+
+    def test_unpickle_does_not_register(self):
+        """Comprueba que recibir una plantilla que aquí no existe no la registra."""
+        data = pickle.dumps(self.aircraft)
+        SeatLayout.unregister_template("Airbus A321neo")
+        layout = pickle.loads(data).get_layout()
+        self.assertIsNone(SeatLayout.template("Airbus A321neo"))
+        self.assertEqual(layout.get_model(), "Airbus A321neo")
+        self.assertEqual(layout.get_row_letters(1), "ACDF")
+        self.assertEqual(layout.get_exit_rows(), frozenset({12, 13}))
+
+    def test_non_uniform_cabin(self):
+        """Comprueba los asientos que no existen, los bloqueados y las capacidades."""
+        self.assertEqual(self.aircraft.num_seats(), 30 * 6 - 2 - 1)
+        self.assertEqual(self.layout.get_exit_rows(), frozenset({12, 13}))
+        self.assertEqual(self.layout.get_row_letters(1), "ACDF")
+        for seat in ("1B", "1E", "12C"):
+            with self.assertRaises(ValueError):
+                self.flight.allocate_passenger(seat, ("Jack", "Shephard", "85994003S"))
+
+        self.assertEqual(self.flight.num_available_seats(), 177)
+        self.assertEqual(self.flight.num_available_seats_in_row(1), 4)
+        self.assertEqual(self.flight.num_available_seats_in_row(12), 5)
+        self.assertEqual(self.flight.num_available_seats_by_letter("B"), 29)
+        self.assertEqual(self.flight.num_available_seats_by_letter("C"), 29)
+
+        # auto_allocate no propone asientos inexistentes ni bloqueados
+        self.assertEqual(self.flight.auto_allocate(("Kate", "Austen", "12589756P")), "1A")
+        self.assertEqual(self.flight.auto_allocate(("James", "Ford", "56278665F")), "1C")
+        group = [("Hugo", "Reyes", "89765432T"), ("Sayid", "Jarrah", "15758664M")]
+        self.assertEqual(self.flight.auto_allocate(group, together=2), ["2A", "2B"])
+
+        lines = self.flight.render_seating().splitlines()
+        self.assertEqual(lines[1], " 1 X X . .")
+        self.assertEqual(lines[12], "12 ..# ...")
+
+    def test_snapshot_keeps_template(self):
+        """Comprueba que una instantánea recupera la plantilla del modelo."""
+        self.flight.allocate_passenger("30F", ("Jack", "Shephard", "85994003S"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "BA300.flt")
+            self.flight.save(path)
+            loaded = Flight.load(path)
+        self.assertIs(loaded.get_aircraft().get_layout(), self.layout)
+        self.assertEqual(loaded.num_available_seats(), 176)
+
+    def test_snapshot_last_seat_of_sparse_template(self):
+        """Comprueba que se guarda el último asiento aunque falten muchos asientos delante."""
+        layout = SeatLayout.register_template("Embraer E195", 30, "ABCDEF",
+                                              row_letters={1: "AF", 2: "AF", 3: "AF"})
+        self.addCleanup(SeatLayout.unregister_template, "Embraer E195")
+        flight = Flight(number="BA301", aircraft=Aircraft.from_template("G-EMBA", "Embraer E195"))
+        flight.allocate_passenger("30F", ("Jack", "Shephard", "85994003S"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "BA301.flt")
+            flight.save(path)
+            loaded = Flight.load(path)
+        self.assertIs(loaded.get_aircraft().get_layout(), layout)
+        self.assertEqual(loaded.find_seat("85994003S"), "30F")
+        self.assertEqual(loaded.num_available_seats(), 30 * 6 - 12 - 1)
+
+
 # Si ejecutas este fichero directamente (python test.py), se lanzarán todos los tests.
 if __name__ == '__main__':
     unittest.main()